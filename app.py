@@ -1,25 +1,15 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
 from plotly.subplots import make_subplots
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-from sklearn.preprocessing import StandardScaler
-import xgboost as xgb
-import lightgbm as lgb
-from catboost import CatBoostClassifier
-import ta
-import joblib
-import os
-from datetime import datetime, timedelta
+from datetime import datetime
 import warnings
+import ui_cache
+from strategy_analyzer import FuturesStrategyAnalyzer
+from profiling import hot_spots, setup_logging
+from config import LOGGING_CONFIG, RISK_CONFIG, SEARCH_CONFIG, UI_CONFIG
 warnings.filterwarnings('ignore')
+setup_logging()
 
 # 设置页面配置
 st.set_page_config(
@@ -61,355 +51,12 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-class FuturesStrategyAnalyzer:
-    def __init__(self):
-        self.data = None
-        self.features = None
-        self.target = None
-        self.model = None
-        self.scaler = StandardScaler()
-        self.column_mapping = {}
-        
-    def load_data(self, file, column_mapping):
-        """加载并处理CSV数据"""
-        try:
-            df = pd.read_csv(file)
-            
-            # 重命名列
-            df = df.rename(columns=column_mapping)
-            
-            # 确保必要的列存在（支持多种列名格式）
-            required_column_mappings = {
-                'date': ['date', '交易日', 'Date', 'DATE'],
-                'contract': ['contract', 'symbol', '合约', 'Contract', 'CONTRACT'],
-                'open': ['open', '开盘价', 'Open', 'OPEN'],
-                'high': ['high', '最高价', 'High', 'HIGH'],
-                'low': ['low', '最低价', 'Low', 'LOW'],
-                'close': ['close', '收盘价', 'Close', 'CLOSE'],
-                'volume': ['volume', '成交量', 'Volume', 'VOLUME'],
-                'open_interest': ['open_interest', '持仓量', 'Open_Interest', 'OPEN_INTEREST']
-            }
-            
-            # 检查并映射列名
-            missing_columns = []
-            column_rename_mapping = {}
-            
-            for required_col, possible_names in required_column_mappings.items():
-                found = False
-                for possible_name in possible_names:
-                    if possible_name in df.columns:
-                        if possible_name != required_col:
-                            column_rename_mapping[possible_name] = required_col
-                        found = True
-                        break
-                
-                if not found:
-                    missing_columns.append(required_col)
-            
-            if missing_columns:
-                raise ValueError(f"缺少必要的列: {missing_columns}")
-            
-            # 重命名列以匹配系统内部期望的列名
-            if column_rename_mapping:
-                df = df.rename(columns=column_rename_mapping)
-            
-            # 处理日期列
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.sort_values('date')
-            
-            # 确保数值列为数值类型
-            numeric_columns = ['open', 'high', 'low', 'close', 'volume', 'open_interest']
-            for col in numeric_columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # 处理可选列（如果存在）
-            optional_columns = {
-                'turnover': '成交金额',
-                'settle': '结算价', 
-                'pre_settle': '前结算价',
-                'variety': '品种'
-            }
-            
-            for eng_col, chn_col in optional_columns.items():
-                if chn_col in df.columns and eng_col not in df.columns:
-                    df[eng_col] = pd.to_numeric(df[chn_col], errors='coerce')
-                elif eng_col in df.columns:
-                    df[eng_col] = pd.to_numeric(df[eng_col], errors='coerce')
-            
-            # 删除缺失值（只删除关键列的缺失值）
-            df = df.dropna(subset=['open', 'high', 'low', 'close', 'volume', 'open_interest'])
-            
-            # 对于可选列，用0填充缺失值
-            optional_numeric_columns = ['turnover', 'settle', 'pre_settle']
-            for col in optional_numeric_columns:
-                if col in df.columns:
-                    df[col] = df[col].fillna(0)
-            
-            self.data = df
-            return True, "数据加载成功！"
-            
-        except Exception as e:
-            return False, f"数据加载失败: {str(e)}"
-    
-    def create_features(self):
-        """创建技术指标特征"""
-        if self.data is None:
-            return False, "请先加载数据"
-        
-        try:
-            df = self.data.copy()
-            
-            # 基础价格特征
-            df['price_change'] = df['close'].pct_change()
-            df['high_low_ratio'] = df['high'] / df['low']
-            df['open_close_ratio'] = df['open'] / df['close']
-            
-            # 移动平均线
-            df['ma_5'] = df['close'].rolling(window=5).mean()
-            df['ma_10'] = df['close'].rolling(window=10).mean()
-            df['ma_20'] = df['close'].rolling(window=20).mean()
-            df['ma_50'] = df['close'].rolling(window=50).mean()
-            
-            # 价格相对于移动平均线的位置
-            df['price_vs_ma5'] = df['close'] / df['ma_5'] - 1
-            df['price_vs_ma10'] = df['close'] / df['ma_10'] - 1
-            df['price_vs_ma20'] = df['close'] / df['ma_20'] - 1
-            df['price_vs_ma50'] = df['close'] / df['ma_50'] - 1
-            
-            # 技术指标
-            df['rsi'] = ta.momentum.RSIIndicator(df['close']).rsi()
-            df['macd'] = ta.trend.MACD(df['close']).macd()
-            df['macd_signal'] = ta.trend.MACD(df['close']).macd_signal()
-            df['bb_upper'] = ta.volatility.BollingerBands(df['close']).bollinger_hband()
-            df['bb_lower'] = ta.volatility.BollingerBands(df['close']).bollinger_lband()
-            df['bb_width'] = df['bb_upper'] - df['bb_lower']
-            
-            # 成交量指标
-            df['volume_ma'] = df['volume'].rolling(window=20).mean()
-            df['volume_ratio'] = df['volume'] / df['volume_ma']
-            
-            # 成交金额指标（如果存在）
-            if 'turnover' in df.columns:
-                df['turnover_ma'] = df['turnover'].rolling(window=20).mean()
-                df['turnover_ratio'] = df['turnover'] / df['turnover_ma']
-                df['avg_price'] = df['turnover'] / df['volume']  # 平均成交价
-            
-            # 结算价指标（如果存在）
-            if 'settle' in df.columns:
-                df['settle_change'] = df['settle'].pct_change()
-                df['close_vs_settle'] = df['close'] / df['settle'] - 1
-                
-            if 'pre_settle' in df.columns:
-                df['settle_vs_pre_settle'] = df['settle'] / df['pre_settle'] - 1
-            
-            # 波动率指标
-            df['volatility'] = df['close'].rolling(window=20).std()
-            df['atr'] = ta.volatility.AverageTrueRange(df['high'], df['low'], df['close']).average_true_range()
-            
-            # 趋势指标
-            df['adx'] = ta.trend.ADXIndicator(df['high'], df['low'], df['close']).adx()
-            df['cci'] = ta.trend.CCIIndicator(df['high'], df['low'], df['close']).cci()
-            
-            # 删除包含NaN的行（只删除关键特征的NaN）
-            key_features = ['price_change', 'rsi', 'macd', 'volume_ratio']
-            df = df.dropna(subset=key_features)
-            
-            self.features = df
-            return True, "特征创建成功！"
-            
-        except Exception as e:
-            return False, f"特征创建失败: {str(e)}"
-    
-    def create_target(self, lookforward_days=5, profit_threshold=0.02, loss_threshold=-0.01):
-        """创建目标变量（未来价格变动）"""
-        if self.features is None:
-            return False, "请先创建特征"
-        
-        try:
-            df = self.features.copy()
-            
-            # 计算未来价格变动
-            df['future_return'] = df['close'].shift(-lookforward_days) / df['close'] - 1
-            
-            # 创建目标变量
-            # 1: 做多信号 (未来上涨超过阈值)
-            # 0: 持有 (未来变动在阈值内)
-            # -1: 做空信号 (未来下跌超过阈值)
-            
-            conditions = [
-                df['future_return'] > profit_threshold,
-                df['future_return'] < loss_threshold
-            ]
-            choices = [1, -1]
-            df['target'] = np.select(conditions, choices, default=0)
-            
-            # 删除最后几行（没有未来数据）
-            df = df.dropna(subset=['target'])
-            
-            self.target = df
-            return True, "目标变量创建成功！"
-            
-        except Exception as e:
-            return False, f"目标变量创建失败: {str(e)}"
-    
-    def train_model(self, model_type='random_forest', test_size=0.2):
-        """训练机器学习模型"""
-        if self.target is None:
-            return False, "请先创建目标变量"
-        
-        try:
-            df = self.target.copy()
-            
-            # 选择特征列
-            feature_columns = [
-                'price_change', 'high_low_ratio', 'open_close_ratio',
-                'price_vs_ma5', 'price_vs_ma10', 'price_vs_ma20', 'price_vs_ma50',
-                'rsi', 'macd', 'macd_signal', 'bb_width', 'volume_ratio',
-                'volatility', 'atr', 'adx', 'cci'
-            ]
-            
-            # 添加可选特征（如果存在）
-            optional_features = [
-                'turnover_ratio', 'avg_price', 'settle_change', 
-                'close_vs_settle', 'settle_vs_pre_settle'
-            ]
-            
-            for feature in optional_features:
-                if feature in df.columns:
-                    feature_columns.append(feature)
-            
-            # 确保所有特征列都存在
-            available_features = [col for col in feature_columns if col in df.columns]
-            
-            X = df[available_features]
-            y = df['target']
-            
-            # 分割数据
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size, random_state=42, stratify=y
-            )
-            
-            # 标准化特征
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
-            
-            # 选择模型
-            if model_type == 'random_forest':
-                self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-            elif model_type == 'gradient_boosting':
-                self.model = GradientBoostingClassifier(random_state=42)
-            elif model_type == 'logistic_regression':
-                self.model = LogisticRegression(random_state=42, max_iter=1000)
-            elif model_type == 'xgboost':
-                self.model = xgb.XGBClassifier(random_state=42)
-            elif model_type == 'lightgbm':
-                self.model = lgb.LGBMClassifier(random_state=42)
-            elif model_type == 'catboost':
-                self.model = CatBoostClassifier(random_state=42, verbose=False)
-            
-            # 训练模型
-            self.model.fit(X_train_scaled, y_train)
-            
-            # 评估模型
-            y_pred = self.model.predict(X_test_scaled)
-            accuracy = accuracy_score(y_test, y_pred)
-            
-            return True, f"模型训练成功！测试集准确率: {accuracy:.4f}"
-            
-        except Exception as e:
-            return False, f"模型训练失败: {str(e)}"
-    
-    def predict_strategy(self, latest_data):
-        """预测交易策略"""
-        if self.model is None:
-            return False, "请先训练模型"
-        
-        try:
-            # 使用相同的特征创建方法处理最新数据
-            df = latest_data.copy()
-            
-            # 创建特征（使用与训练时相同的方法）
-            # 这里简化处理，实际应用中需要与create_features方法保持一致
-            feature_columns = [
-                'price_change', 'high_low_ratio', 'open_close_ratio',
-                'price_vs_ma5', 'price_vs_ma10', 'price_vs_ma20', 'price_vs_ma50',
-                'rsi', 'macd', 'macd_signal', 'bb_width', 'volume_ratio',
-                'volatility', 'atr', 'adx', 'cci'
-            ]
-            
-            # 添加可选特征（如果存在）
-            optional_features = [
-                'turnover_ratio', 'avg_price', 'settle_change', 
-                'close_vs_settle', 'settle_vs_pre_settle'
-            ]
-            
-            for feature in optional_features:
-                if feature in df.columns:
-                    feature_columns.append(feature)
-            
-            available_features = [col for col in feature_columns if col in df.columns]
-            X_latest = df[available_features].iloc[-1:].values
-            
-            # 标准化
-            X_latest_scaled = self.scaler.transform(X_latest)
-            
-            # 预测
-            prediction = self.model.predict(X_latest_scaled)[0]
-            probabilities = self.model.predict_proba(X_latest_scaled)[0]
-            
-            # 获取当前价格
-            current_price = df['close'].iloc[-1]
-            
-            # 计算止损止盈价格（基于ATR）
-            atr = df['atr'].iloc[-1] if 'atr' in df.columns else current_price * 0.02
-            
-            if prediction == 1:  # 做多
-                stop_loss = current_price - atr * 2
-                take_profit = current_price + atr * 3
-                action = "做多"
-            elif prediction == -1:  # 做空
-                stop_loss = current_price + atr * 2
-                take_profit = current_price - atr * 3
-                action = "做空"
-            else:  # 持有
-                stop_loss = None
-                take_profit = None
-                action = "持有"
-            
-            # 计算成功率（基于概率）
-            success_rate = max(probabilities) * 100
-            
-            # 计算盈亏比
-            if stop_loss and take_profit:
-                if prediction == 1:
-                    risk = current_price - stop_loss
-                    reward = take_profit - current_price
-                else:
-                    risk = stop_loss - current_price
-                    reward = current_price - take_profit
-                profit_loss_ratio = reward / risk if risk > 0 else 0
-            else:
-                profit_loss_ratio = 0
-            
-            result = {
-                'action': action,
-                'current_price': current_price,
-                'stop_loss': stop_loss,
-                'take_profit': take_profit,
-                'success_rate': success_rate,
-                'profit_loss_ratio': profit_loss_ratio,
-                'prediction': prediction,
-                'probabilities': probabilities
-            }
-            
-            return True, result
-            
-        except Exception as e:
-            return False, f"策略预测失败: {str(e)}"
-
 # 初始化分析器
 if 'analyzer' not in st.session_state:
     st.session_state.analyzer = FuturesStrategyAnalyzer()
+    # 模型库中有保存的模型时，创建目标变量后可以直接进行策略分析，不需要重新训练
+    if st.session_state.analyzer.model_registry.latest_version() is not None:
+        st.session_state.model_trained = True
 
 # 主界面
 st.markdown('<h1 class="main-header">📈 期货交易策略分析系统</h1>', unsafe_allow_html=True)
@@ -419,12 +66,20 @@ st.sidebar.title("功能菜单")
 
 # 数据导入部分
 st.sidebar.header("📊 数据导入")
-uploaded_file = st.sidebar.file_uploader("选择CSV文件", type=['csv'])
+# 内存压缩模式（默认关闭）：之后读取的数据和创建的特征、目标变量使用 float32、category 等紧凑类型
+st.session_state.analyzer.compact_memory = st.sidebar.checkbox(
+    "内存压缩模式", value=st.session_state.analyzer.compact_memory,
+    help="使用 float32、category 等紧凑类型并在各阶段共享列，内存占用更小，模型结果可能略有差异；请在导入数据前设置"
+)
+
+uploaded_file = st.sidebar.file_uploader("选择数据文件（CSV / Parquet / Feather）",
+                                         type=UI_CONFIG['supported_file_types'])
 
 if uploaded_file is not None:
-    # 读取CSV文件的前几行来显示列名
-    df_preview = pd.read_csv(uploaded_file, nrows=5)
-    st.sidebar.write("CSV文件列名:")
+    # 读取文件的前几行来显示列名（按文件内容哈希缓存）
+    file_key = ui_cache.uploaded_file_key(uploaded_file)
+    df_preview = ui_cache.file_preview(file_key, uploaded_file)
+    st.sidebar.write("文件列名:")
     st.sidebar.write(list(df_preview.columns))
     
     # 列映射配置
@@ -487,7 +142,9 @@ if uploaded_file is not None:
     }
     
     if st.sidebar.button("导入数据", type="primary"):
-        success, message = st.session_state.analyzer.load_data(uploaded_file, column_mapping)
+        analyzer = st.session_state.analyzer
+        success, message = ui_cache.run_stage(analyzer, 'load', analyzer.source_key(file_key, column_mapping),
+                                              analyzer.load_data, uploaded_file, column_mapping)
         
         if success:
             st.sidebar.markdown(f'<div class="success-message">{message}</div>', unsafe_allow_html=True)
@@ -495,8 +152,39 @@ if uploaded_file is not None:
         else:
             st.sidebar.markdown(f'<div class="error-message">{message}</div>', unsafe_allow_html=True)
 
+# 内存映射数据集（由 convert_data.py --store 生成，按需读取）
+store_path = st.sidebar.text_input("或输入内存映射数据集目录")
+if store_path and st.sidebar.button("打开数据集"):
+    success, message = st.session_state.analyzer.open_store(store_path)
+    
+    if success:
+        st.sidebar.markdown(f'<div class="success-message">{message}</div>', unsafe_allow_html=True)
+        st.session_state.data_loaded = True
+    else:
+        st.sidebar.markdown(f'<div class="error-message">{message}</div>', unsafe_allow_html=True)
+
+# 模型库
+st.sidebar.header("💾 模型库")
+model_versions = st.session_state.analyzer.model_registry.versions()
+if model_versions:
+    selected_version = st.sidebar.selectbox(
+        "已保存的模型", [meta['version'] for meta in reversed(model_versions)],
+        format_func=lambda v: next(f"v{v:04d} {meta['model_type']} "
+                                   f"{datetime.fromtimestamp(meta['created']).strftime('%Y-%m-%d %H:%M')}"
+                                   for meta in model_versions if meta['version'] == v)
+    )
+    if st.sidebar.button("加载模型"):
+        success, message = st.session_state.analyzer.load_model(selected_version)
+        if success:
+            st.sidebar.markdown(f'<div class="success-message">{message}</div>', unsafe_allow_html=True)
+            st.session_state.model_trained = True
+        else:
+            st.sidebar.markdown(f'<div class="error-message">{message}</div>', unsafe_allow_html=True)
+else:
+    st.sidebar.caption("还没有保存的模型")
+
 # 主内容区域
-tab1, tab2, tab3, tab4 = st.tabs(["📊 数据概览", "🔧 特征工程", "🤖 模型训练", "📈 策略分析"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 数据概览", "🔧 特征工程", "🤖 模型训练", "📈 策略分析", "⏱️ 性能"])
 
 with tab1:
     st.header("数据概览")
@@ -504,53 +192,73 @@ with tab1:
     if hasattr(st.session_state, 'data_loaded') and st.session_state.data_loaded:
         analyzer = st.session_state.analyzer
         
+        if analyzer.store is not None:
+            # 数据集概要只读取索引
+            summary = analyzer.store.summary()
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("数据集行数", summary['rows'])
+            
+            with col2:
+                st.metric("合约数量", summary['contracts'])
+            
+            with col3:
+                st.metric("日期范围", f"{summary['start_date'].strftime('%Y-%m-%d')} 至 {summary['end_date'].strftime('%Y-%m-%d')}")
+            
+            st.subheader("选择合约和日期范围")
+            selected_contracts = st.multiselect("合约", analyzer.store.contracts,
+                                                default=analyzer.store.contracts[:5])
+            date_range = st.date_input("日期范围", value=(summary['start_date'].date(), summary['end_date'].date()))
+            start_date = date_range[0] if len(date_range) > 0 else None
+            end_date = date_range[1] if len(date_range) > 1 else None
+            
+            # 走势图只调入所选合约和日期范围的收盘价
+            store_key = analyzer.store_key(selected_contracts, start_date, end_date)
+            fig = ui_cache.store_price_chart(store_key, tuple(selected_contracts), start_date, end_date, analyzer.store)
+            st.plotly_chart(fig, use_container_width=True)
+            
+            if st.button("载入所选数据", type="primary"):
+                success, message = ui_cache.run_stage(analyzer, 'select', store_key, analyzer.select_data,
+                                                      selected_contracts, start_date, end_date)
+                if success:
+                    st.success(message)
+                else:
+                    st.error(message)
+        
         if analyzer.data is not None:
+            # 概览、走势图和统计信息按数据键缓存，界面重新运行时不重新计算
+            data_key = analyzer.data_fingerprint()
+            overview = ui_cache.data_overview(data_key, analyzer.data)
+            
             # 显示基本信息
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                st.metric("数据行数", len(analyzer.data))
+                st.metric("数据行数", overview['rows'])
             
             with col2:
-                st.metric("合约数量", analyzer.data['contract'].nunique())
+                st.metric("合约数量", overview['contracts'])
             
             with col3:
-                st.metric("日期范围", f"{analyzer.data['date'].min().strftime('%Y-%m-%d')} 至 {analyzer.data['date'].max().strftime('%Y-%m-%d')}")
+                st.metric("日期范围", f"{overview['start_date'].strftime('%Y-%m-%d')} 至 {overview['end_date'].strftime('%Y-%m-%d')}")
             
             with col4:
-                st.metric("数据完整性", f"{(1 - analyzer.data.isnull().sum().sum() / (len(analyzer.data) * len(analyzer.data.columns))) * 100:.1f}%")
+                st.metric("数据完整性", f"{overview['completeness'] * 100:.1f}%")
             
             # 显示数据表格
             st.subheader("数据预览")
-            st.dataframe(analyzer.data.head(10))
+            st.dataframe(overview['head'])
             
-            # 价格走势图
+            # 价格走势图（只显示前5个合约）
             st.subheader("价格走势图")
-            fig = go.Figure()
-            
-            # 按合约分组显示
-            for contract in analyzer.data['contract'].unique()[:5]:  # 只显示前5个合约
-                contract_data = analyzer.data[analyzer.data['contract'] == contract]
-                fig.add_trace(go.Scatter(
-                    x=contract_data['date'],
-                    y=contract_data['close'],
-                    mode='lines',
-                    name=contract
-                ))
-            
-            fig.update_layout(
-                title="收盘价走势",
-                xaxis_title="日期",
-                yaxis_title="价格",
-                height=500
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(ui_cache.price_chart(data_key, analyzer.data), use_container_width=True)
             
             # 统计信息
             st.subheader("统计信息")
-            st.dataframe(analyzer.data.describe())
+            st.dataframe(overview['describe'])
             
-        else:
+        elif analyzer.store is None:
             st.warning("请先导入数据")
     else:
         st.info("请先导入CSV数据文件")
@@ -561,12 +269,13 @@ with tab2:
     if hasattr(st.session_state, 'data_loaded') and st.session_state.data_loaded:
         analyzer = st.session_state.analyzer
         
-        if analyzer.data is not None:
+        if analyzer.data is not None or analyzer.store is not None:
             col1, col2 = st.columns(2)
             
             with col1:
                 if st.button("创建技术指标特征", type="primary"):
-                    success, message = analyzer.create_features()
+                    success, message = ui_cache.run_stage(analyzer, 'features', analyzer.features_key(),
+                                                          analyzer.create_features)
                     if success:
                         st.success(message)
                         st.session_state.features_created = True
@@ -580,7 +289,10 @@ with tab2:
                         profit_threshold = st.slider("盈利阈值", 0.01, 0.05, 0.02, 0.01)
                         loss_threshold = st.slider("亏损阈值", -0.05, -0.01, -0.01, 0.01)
                         
-                        success, message = analyzer.create_target(lookforward, profit_threshold, loss_threshold)
+                        success, message = ui_cache.run_stage(
+                            analyzer, 'target', analyzer.target_key(lookforward, profit_threshold, loss_threshold),
+                            analyzer.create_target, lookforward, profit_threshold, loss_threshold
+                        )
                         if success:
                             st.success(message)
                             st.session_state.target_created = True
@@ -593,36 +305,41 @@ with tab2:
             if hasattr(st.session_state, 'features_created') and st.session_state.features_created:
                 if analyzer.features is not None:
                     st.subheader("特征概览")
+                    features_key = analyzer.features_key()
+                    feature_overview = ui_cache.feature_overview(features_key, analyzer.features)
                     
                     # 显示特征统计
-                    feature_stats = analyzer.features.describe()
-                    st.dataframe(feature_stats)
+                    st.dataframe(feature_overview['describe'])
                     
                     # 特征相关性热力图
                     st.subheader("特征相关性")
-                    numeric_features = analyzer.features.select_dtypes(include=[np.number])
-                    correlation_matrix = numeric_features.corr()
-                    
-                    fig, ax = plt.subplots(figsize=(12, 8))
-                    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, ax=ax)
-                    plt.title("特征相关性热力图")
-                    st.pyplot(fig)
+                    st.image(feature_overview['heatmap'])
                     
                     # 目标变量分布
                     if hasattr(st.session_state, 'target_created') and st.session_state.target_created:
                         if analyzer.target is not None:
                             st.subheader("目标变量分布")
+                            import plotly.express as px
                             
-                            target_counts = analyzer.target['target'].value_counts()
+                            target_counts = ui_cache.target_counts(analyzer.target_key(), analyzer.target)
                             fig = px.pie(
                                 values=target_counts.values,
-                                names=['做空', '持有', '做多'],
+                                names=target_counts.index.map({-1: '做空', 0: '持有', 1: '做多'}),
                                 title="目标变量分布"
                             )
                             st.plotly_chart(fig, use_container_width=True)
                             
                             st.write("目标变量统计:")
                             st.write(target_counts)
+                    
+                    # 内存占用
+                    with st.expander("内存占用"):
+                        report = ui_cache.memory_usage((analyzer.data_fingerprint(), features_key,
+                                                        analyzer.target_key()), analyzer)
+                        st.dataframe((report[['baseline_bytes', 'actual_bytes', 'saved_bytes']] / 1024 / 1024)
+                                     .round(2).rename(columns={'baseline_bytes': '未压缩(MB)',
+                                                               'actual_bytes': '实际(MB)',
+                                                               'saved_bytes': '节省(MB)'}))
         else:
             st.warning("请先导入数据")
     else:
@@ -635,6 +352,11 @@ with tab3:
         analyzer = st.session_state.analyzer
         
         if analyzer.target is not None:
+            # 训练相关的模块（scikit-learn 等）和图表库在进入模型训练后才导入，首次打开页面更快
+            import plotly.express as px
+            from hyperparameter_search import SEARCH_METHODS
+            from model_factory import MODEL_TYPES
+            
             # 模型选择
             model_type = st.selectbox(
                 "选择模型类型",
@@ -649,11 +371,99 @@ with tab3:
                 }[x]
             )
             
+            evaluation = st.radio("评估方式", ['holdout', 'walk_forward', 'all_models', 'search'], horizontal=True,
+                                  format_func=lambda x: {'holdout': '按时间切分测试集',
+                                                         'walk_forward': '前推验证',
+                                                         'all_models': '多模型对比',
+                                                         'search': '超参数搜索'}[x])
+            
+            if evaluation == 'search':
+                search_method = st.selectbox("搜索方式", SEARCH_METHODS,
+                                             index=SEARCH_METHODS.index(SEARCH_CONFIG['method']),
+                                             format_func=lambda x: {'random': '随机搜索',
+                                                                    'halving': '逐次减半',
+                                                                    'hyperband': 'Hyperband'}[x])
+                n_trials = st.slider("参数组合数", 5, 100, SEARCH_CONFIG['n_trials'], 5)
+                search_splits = st.slider("交叉验证折数", 2, 10, SEARCH_CONFIG['n_splits'])
+                
+                if st.button("开始搜索", type="primary"):
+                    progress_bar = st.progress(0.0)
+                    with st.spinner("正在并行评估参数组合..."):
+                        success, message = analyzer.tune_model(
+                            model_type, method=search_method, n_trials=n_trials, n_splits=search_splits,
+                            progress=lambda done, total: progress_bar.progress(min(1.0, done / total))
+                        )
+                    
+                    if success:
+                        st.success(message)
+                        st.session_state.model_trained = True
+                        
+                        st.subheader("最佳参数")
+                        st.json(analyzer.best_params)
+                        st.subheader("试验结果")
+                        st.dataframe(analyzer.search_results)
+                        fig = px.scatter(analyzer.search_results, x='fraction', y='score', color='bracket',
+                                         hover_data=['trial', 'params'], log_x=True,
+                                         title="各轮数据比例下的交叉验证准确率")
+                        st.plotly_chart(fig, use_container_width=True)
+                    else:
+                        st.error(message)
+            
+            if evaluation == 'all_models':
+                selected_models = st.multiselect("参与对比的模型", MODEL_TYPES, default=MODEL_TYPES)
+                compare_test_size = st.slider("对比测试集比例", 0.1, 0.5, 0.2, 0.05)
+                
+                if st.button("并行训练全部模型", type="primary"):
+                    with st.spinner("正在并行训练模型..."):
+                        success, message = analyzer.train_all_models(selected_models, compare_test_size)
+                    
+                    if success:
+                        st.success(message)
+                        st.session_state.model_trained = True
+                        
+                        st.subheader("模型排行榜")
+                        st.dataframe(analyzer.leaderboard)
+                        fig = px.bar(analyzer.leaderboard.reset_index(), x='model_type', y='accuracy',
+                                     hover_data=['fit_time', 'single_predict_ms'], title="测试集准确率")
+                        st.plotly_chart(fig, use_container_width=True)
+                    else:
+                        st.error(message)
+            
+            if evaluation == 'walk_forward':
+                n_splits = st.slider("折数", 2, 10, 5)
+                window_mode = st.selectbox("训练窗口", ['expanding', 'rolling'],
+                                           format_func=lambda x: {'expanding': '扩展窗口',
+                                                                  'rolling': '滚动窗口'}[x])
+                train_window = None
+                if window_mode == 'rolling':
+                    train_window = st.number_input("滚动窗口交易日数", min_value=20, value=250, step=10)
+                
+                if st.button("前推验证", type="primary"):
+                    with st.spinner("正在并行训练各折..."):
+                        success, message = analyzer.walk_forward_train(
+                            model_type, n_splits=n_splits, mode=window_mode, train_window=train_window
+                        )
+                    
+                    if success:
+                        st.success(message)
+                        st.session_state.model_trained = True
+                        
+                        st.subheader("各折表现")
+                        results = analyzer.walk_forward_results
+                        st.dataframe(results)
+                        fig = px.line(results.reset_index(), x='test_start', y=['accuracy', 'f1_macro'],
+                                      markers=True, title="各折测试期指标")
+                        st.plotly_chart(fig, use_container_width=True)
+                    else:
+                        st.error(message)
+            
             test_size = st.slider("测试集比例", 0.1, 0.5, 0.2, 0.05)
             
-            if st.button("训练模型", type="primary"):
+            if evaluation == 'holdout' and st.button("训练模型", type="primary"):
                 with st.spinner("正在训练模型..."):
-                    success, message = analyzer.train_model(model_type, test_size)
+                    success, message = ui_cache.run_stage(analyzer, 'model',
+                                                          ui_cache.model_key(analyzer, model_type, test_size),
+                                                          analyzer.train_model, model_type, test_size)
                     
                     if success:
                         st.success(message)
@@ -669,6 +479,19 @@ with tab3:
                             
                     else:
                         st.error(message)
+            
+            # 保存当前模型，重启后不需要重新训练
+            if analyzer.model_info is not None:
+                st.subheader("保存模型")
+                info = analyzer.model_info
+                version = f"v{info['version']:04d}" if info['version'] else "未保存"
+                st.caption(f"当前模型: {info['model_type']}（{version}）")
+                if st.button("保存到模型库"):
+                    success, message = analyzer.save_model()
+                    if success:
+                        st.success(message)
+                    else:
+                        st.error(message)
         else:
             st.warning("请先创建目标变量")
     else:
@@ -681,12 +504,15 @@ with tab4:
         analyzer = st.session_state.analyzer
         
         if analyzer.model is not None and analyzer.target is not None:
+            import plotly.express as px
+            
             # 策略预测
             st.subheader("实时策略预测")
             
             if st.button("生成交易策略", type="primary"):
                 with st.spinner("正在分析..."):
-                    success, result = analyzer.predict_strategy(analyzer.target)
+                    # 特征表包含每个合约最新的K线；目标变量表中没有未来收益的行由 _training_frame 在训练、回测时排除
+                    success, result = analyzer.predict_strategy(analyzer.features)
                     
                     if success:
                         # 显示策略结果
@@ -757,19 +583,178 @@ with tab4:
                     else:
                         st.error(result)
             
+            # 全部合约信号
+            st.subheader("全部合约信号")
+            
+            if st.button("生成全部合约信号"):
+                with st.spinner("正在批量预测..."):
+                    success, signals = analyzer.predict_signals(latest_only=True)
+                
+                if success:
+                    counts = signals['action'].value_counts()
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("做多", int(counts.get('做多', 0)))
+                    with col2:
+                        st.metric("做空", int(counts.get('做空', 0)))
+                    with col3:
+                        st.metric("持有", int(counts.get('持有', 0)))
+                    st.dataframe(signals.sort_values('success_rate', ascending=False))
+                else:
+                    st.error(signals)
+            
             # 历史回测
             st.subheader("历史回测分析")
             
+            min_date = analyzer.target['date'].min().date()
+            max_date = analyzer.target['date'].max().date()
+            col1, col2 = st.columns(2)
+            with col1:
+                backtest_range = st.date_input("回测日期范围", value=(min_date, max_date),
+                                               min_value=min_date, max_value=max_date)
+            with col2:
+                holding_days = st.number_input("最长持有天数", min_value=1, max_value=60,
+                                               value=analyzer.lookforward_days or 5)
+            st.caption("训练期内的K线为样本内预测，评估策略时应选择测试期的日期范围")
+            # 只选了开始日期时回测到最后
+            dates = tuple(backtest_range) if isinstance(backtest_range, (tuple, list)) else (backtest_range,)
+            start_date, end_date = dates[0], dates[1] if len(dates) > 1 else None
+            
             if st.button("运行历史回测"):
                 with st.spinner("正在回测..."):
-                    # 这里可以添加历史回测逻辑
-                    st.info("历史回测功能正在开发中...")
+                    success, message = analyzer.run_backtest(start_date, end_date, int(holding_days))
+                
+                if success:
+                    st.success(message)
+                    stats = analyzer.backtest_results['stats']
+                    equity = analyzer.backtest_results['equity']
+                    
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.metric("胜率", f"{stats['hit_rate']:.1f}%")
+                    with col2:
+                        st.metric("实际盈亏比", f"{stats['profit_loss_ratio']:.2f}")
+                    with col3:
+                        st.metric("总收益", f"{stats['total_return']:.2%}")
+                    with col4:
+                        st.metric("最大回撤", f"{stats['max_drawdown']:.2%}")
+                    
+                    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3],
+                                        subplot_titles=("资金曲线", "回撤"))
+                    fig.add_trace(go.Scatter(x=equity.index, y=equity['equity'], name="资金"), row=1, col=1)
+                    fig.add_trace(go.Scatter(x=equity.index, y=equity['drawdown'], name="回撤",
+                                             fill='tozeroy'), row=2, col=1)
+                    fig.update_layout(height=600)
+                    st.plotly_chart(fig, use_container_width=True)
+                    
+                    st.subheader("交易明细")
+                    st.write(f"止损 {stats['stop_exits']} 笔，止盈 {stats['take_profit_exits']} 笔，"
+                             f"到期平仓 {stats['time_exits']} 笔，平均持有 {stats['avg_holding_days']:.1f} 天")
+                    st.dataframe(analyzer.backtest_results['trades'].tail(1000))
+                else:
+                    st.error(message)
+            
+            # 组合风险模拟（使用上面的回测日期范围和持有天数）
+            st.subheader("组合风险模拟")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                max_position_size = st.slider("单合约最大仓位", 0.01, 0.5, float(RISK_CONFIG['max_position_size']), 0.01)
+            with col2:
+                risk_per_trade = st.slider("单笔止损风险", 0.001, 0.05, float(RISK_CONFIG['risk_per_trade']), 0.001,
+                                           format="%.3f")
+            with col3:
+                max_daily_loss = st.slider("最大日亏损", 0.005, 0.2, float(RISK_CONFIG['max_daily_loss']), 0.005)
+            with col4:
+                max_drawdown = st.slider("最大回撤", 0.05, 0.5, float(RISK_CONFIG['max_drawdown']), 0.01)
+            
+            # 信号已缓存，调整风控参数后立即重新模拟
+            if st.toggle("启用组合风险模拟"):
+                success, message = analyzer.simulate_risk(
+                    start_date, end_date, int(holding_days), max_position_size=max_position_size,
+                    risk_per_trade=risk_per_trade, max_daily_loss=max_daily_loss, max_drawdown=max_drawdown
+                )
+                
+                if success:
+                    st.success(message)
+                    stats = analyzer.risk_results['stats']
+                    equity = analyzer.risk_results['equity']
+                    
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.metric("胜率", f"{stats['hit_rate']:.1f}%")
+                    with col2:
+                        st.metric("最差单日", f"{stats['worst_day']:.2%}")
+                    with col3:
+                        st.metric("日亏损触发次数", stats['daily_loss_events'])
+                    with col4:
+                        st.metric("最大总仓位", f"{stats['max_gross_exposure']:.2f}")
+                    
+                    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, row_heights=[0.5, 0.25, 0.25],
+                                        subplot_titles=("资金曲线", "回撤", "总仓位"))
+                    fig.add_trace(go.Scatter(x=equity.index, y=equity['equity'], name="资金"), row=1, col=1)
+                    fig.add_trace(go.Scatter(x=equity.index, y=equity['drawdown'], name="回撤",
+                                             fill='tozeroy'), row=2, col=1)
+                    fig.add_trace(go.Scatter(x=equity.index, y=equity['gross_exposure'], name="总仓位"), row=3, col=1)
+                    fig.update_layout(height=700)
+                    st.plotly_chart(fig, use_container_width=True)
+                    
+                    if len(analyzer.risk_results['events']):
+                        st.subheader("风控事件")
+                        st.dataframe(analyzer.risk_results['events'])
+                else:
+                    st.error(message)
         else:
             st.warning("请先训练模型")
     else:
         st.info("请先完成模型训练")
 
 # 页脚
+with tab5:
+    st.header("性能")
+    profiler = st.session_state.analyzer.profiler
+    records = profiler.to_frame()
+    
+    if records.empty:
+        st.info("还没有执行过分析步骤（从缓存读取的步骤不会重新执行，也不会记录）")
+    else:
+        # 各阶段汇总
+        st.subheader("各阶段耗时")
+        summary = profiler.summary()
+        st.dataframe(summary.round(2).rename(columns={'calls': '调用次数', 'total_ms': '总耗时(ms)',
+                                                       'mean_ms': '平均耗时(ms)', 'cpu_ms': 'CPU时间(ms)',
+                                                       'max_peak_rss_delta_mb': '最大峰值内存增量(MB)'}))
+        fig = go.Figure([
+            go.Bar(x=summary.index, y=summary['total_ms'], name="墙钟时间"),
+            go.Bar(x=summary.index, y=summary['cpu_ms'], name="CPU时间")
+        ])
+        fig.update_layout(barmode='group', yaxis_title="毫秒", height=400)
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # 每次调用的记录（最新的在前）
+        st.subheader("调用记录")
+        columns = [col for col in ['started', 'stage', 'ok', 'wall_ms', 'cpu_ms', 'rows_in', 'rows_out',
+                                   'rss_mb', 'rss_delta_mb', 'peak_rss_mb', 'peak_rss_delta_mb',
+                                   'alloc_mb', 'alloc_peak_mb', 'message'] if col in records.columns]
+        st.dataframe(records[columns].iloc[::-1], use_container_width=True)
+        
+        # cProfile 热点函数
+        if 'profile' in records.columns and records['profile'].notna().any():
+            st.subheader("热点函数")
+            profiled = records[records['profile'].notna()].iloc[::-1]
+            selected = st.selectbox("阶段", profiled.index,
+                                    format_func=lambda i: f"{profiled.loc[i, 'started']:%H:%M:%S} "
+                                                          f"{profiled.loc[i, 'stage']}")
+            st.text(hot_spots(profiled.loc[selected, 'profile']))
+        
+        if st.button("清空记录"):
+            profiler.clear()
+            st.rerun()
+    
+    st.caption("设置 PERFORMANCE_CONFIG['profile_tracemalloc'] 统计内存分配，"
+               "设置 PERFORMANCE_CONFIG['profile_dir'] 保存每个阶段的 cProfile 结果；"
+               f"每次调用同时写入日志 {LOGGING_CONFIG['file'] or '（标准错误）'}")
+
 st.markdown("---")
 st.markdown("""
 <div style="text-align: center; color: #666;">
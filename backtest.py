@@ -0,0 +1,158 @@
+"""
+向量化历史回测
+
+对每个有信号（1 做多 / -1 做空）的K线按收盘价开仓，止损、止盈与 predict_strategy 相同
+（STRATEGY_CONFIG 中的 ATR 倍数），之后最多持有 holding_days 个交易日：
+逐个向前偏移 k（1..holding_days）对所有未平仓交易同时检查第 k 根K线的最高/最低价，
+先触及止损或止盈即平仓（同一根K线两者都触及时按止损处理，跳空越过时按开盘价成交），
+到期未触及则按第 holding_days 根K线的收盘价平仓。循环次数只与持有天数有关，与K线数无关。
+每根有信号的K线视为一笔独立交易（同一合约的持仓可以重叠），与目标变量的定义一致。
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import STRATEGY_CONFIG
+from indicators import SegmentIndex
+
+EXIT_TIME, EXIT_STOP, EXIT_TAKE = 0, 1, 2
+EXIT_REASONS = ['到期', '止损', '止盈']
+
+
+def simulate_trades(df, signals, holding_days=5, stop_multiplier=None, take_multiplier=None):
+    """
+    模拟每个信号的交易，返回逐笔交易DataFrame
+
+    df 需要 date、contract、high、low、close 列，可选 open（跳空成交价）和 atr
+    （缺失时与 predict_strategy 一样取收盘价的 2%）；signals 与 df 的行一一对应。
+    """
+    stop_multiplier = STRATEGY_CONFIG['atr_multiplier_stop_loss'] if stop_multiplier is None else stop_multiplier
+    take_multiplier = STRATEGY_CONFIG['atr_multiplier_take_profit'] if take_multiplier is None else take_multiplier
+
+    # 按 (合约, 日期) 排序，每个合约成为一段连续的行，向前偏移 k 即第 k 根后续K线
+    contract_codes, contract_names = pd.factorize(df['contract'], sort=True)
+    dates = df['date'].to_numpy()
+    order = np.lexsort((dates, contract_codes))
+    segments = SegmentIndex(contract_codes[order])
+    remaining = segments.lengths[segments.ids] - segments.position - 1
+
+    close = df['close'].to_numpy(dtype=np.float64)[order]
+    high = df['high'].to_numpy(dtype=np.float64)[order]
+    low = df['low'].to_numpy(dtype=np.float64)[order]
+    open_ = df['open'].to_numpy(dtype=np.float64)[order] if 'open' in df.columns else None
+    atr = df['atr'].to_numpy(dtype=np.float64)[order] if 'atr' in df.columns else np.full(len(df), np.nan)
+    atr = np.where(np.isfinite(atr), atr, close * 0.02)
+    signals = np.asarray(signals)[order]
+
+    entries = np.flatnonzero((signals != 0) & (remaining > 0))
+    direction = np.sign(signals[entries]).astype(np.int8)
+    entry_price = close[entries]
+    stop = entry_price - direction * stop_multiplier * atr[entries]
+    take = entry_price + direction * take_multiplier * atr[entries]
+
+    # 默认到期平仓：合约剩余K线不足 holding_days 时在最后一根K线平仓
+    n_bars = np.minimum(remaining[entries], holding_days)
+    exit_offset = n_bars.copy()
+    exit_price = close[entries + n_bars]
+    reason = np.full(len(entries), EXIT_TIME, dtype=np.int8)
+
+    is_open = np.ones(len(entries), dtype=bool)
+    for k in range(1, holding_days + 1):
+        active = np.flatnonzero(is_open & (n_bars >= k))
+        if not len(active):
+            break
+        rows = entries[active] + k
+        long = direction[active] > 0
+        hit_stop = np.where(long, low[rows] <= stop[active], high[rows] >= stop[active])
+        hit_take = np.where(long, high[rows] >= take[active], low[rows] <= take[active]) & ~hit_stop
+        hit = hit_stop | hit_take
+        if not hit.any():
+            continue
+
+        closed = active[hit]
+        fill = np.where(hit_stop[hit], stop[closed], take[closed])
+        if open_ is not None:
+            # 开盘跳空越过止损/止盈价时按开盘价成交
+            bar_open = open_[rows[hit]]
+            worse = np.where(long[hit], np.minimum(fill, bar_open), np.maximum(fill, bar_open))
+            better = np.where(long[hit], np.maximum(fill, bar_open), np.minimum(fill, bar_open))
+            fill = np.where(hit_stop[hit], worse, better)
+        exit_offset[closed] = k
+        exit_price[closed] = fill
+        reason[closed] = np.where(hit_stop[hit], EXIT_STOP, EXIT_TAKE)
+        is_open[closed] = False
+
+    exit_rows = entries + exit_offset
+    sorted_dates = dates[order]
+    trades = pd.DataFrame({
+        'contract': pd.Categorical.from_codes(contract_codes[order][entries], categories=contract_names),
+        'entry_date': sorted_dates[entries],
+        'exit_date': sorted_dates[exit_rows],
+        'direction': direction,
+        'entry_price': entry_price,
+        'stop_loss': stop,
+        'take_profit': take,
+        'exit_price': exit_price,
+        'exit_reason': pd.Categorical.from_codes(reason, categories=EXIT_REASONS),
+        'holding_days': exit_offset,
+        'return': direction * (exit_price - entry_price) / entry_price
+    })
+    return trades.sort_values(['entry_date', 'contract'], kind='mergesort').reset_index(drop=True)
+
+
+def equity_curve(trades, dates, position_size, initial_capital=1.0):
+    """
+    按平仓日汇总收益得到资金曲线
+
+    每笔交易占用 position_size 比例的资金，当日收益为当日平仓交易收益之和乘以 position_size。
+    dates 为回测期间的全部交易日，没有平仓的交易日收益为 0。
+    """
+    all_dates = np.unique(np.asarray(dates))
+    exit_day = np.searchsorted(all_dates, trades['exit_date'].to_numpy())
+    daily_return = np.bincount(exit_day, weights=trades['return'].to_numpy(), minlength=len(all_dates))
+    daily_return *= position_size
+
+    equity = initial_capital * np.cumprod(1 + daily_return)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    return pd.DataFrame({'daily_return': daily_return, 'equity': equity, 'drawdown': drawdown},
+                        index=pd.Index(all_dates, name='date'))
+
+
+def summarize_trades(trades, equity):
+    """回测统计：交易数、胜率、实际盈亏比、总收益、最大回撤等"""
+    returns = trades['return'].to_numpy()
+    wins = returns[returns > 0]
+    losses = returns[returns <= 0]
+    avg_win = float(wins.mean()) if len(wins) else 0.0
+    avg_loss = float(losses.mean()) if len(losses) else 0.0
+    reasons = trades['exit_reason'].value_counts()
+    return {
+        'trades': len(trades),
+        'hit_rate': len(wins) / len(trades) * 100 if len(trades) else 0.0,
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'profit_loss_ratio': avg_win / -avg_loss if avg_loss < 0 else 0.0,
+        'total_return': float(np.prod(1 + equity['daily_return'].to_numpy()) - 1),
+        'max_drawdown': float(equity['drawdown'].min()) if len(equity) else 0.0,
+        'avg_holding_days': float(trades['holding_days'].mean()) if len(trades) else 0.0,
+        'stop_exits': int(reasons.get('止损', 0)),
+        'take_profit_exits': int(reasons.get('止盈', 0)),
+        'time_exits': int(reasons.get('到期', 0))
+    }
+
+
+def run_backtest(df, signals, holding_days=5, stop_multiplier=None, take_multiplier=None,
+                 position_size=None, initial_capital=None):
+    """
+    运行回测，返回 {'trades': 逐笔交易, 'equity': 资金曲线, 'stats': 统计}
+
+    position_size 为每笔交易占用的资金比例，默认按合约数平均分配（1 / 合约数）。
+    """
+    if position_size is None:
+        position_size = 1 / max(1, df['contract'].nunique())
+    if initial_capital is None:
+        initial_capital = STRATEGY_CONFIG['initial_capital']
+
+    trades = simulate_trades(df, signals, holding_days, stop_multiplier, take_multiplier)
+    equity = equity_curve(trades, df['date'], position_size, initial_capital)
+    return {'trades': trades, 'equity': equity, 'stats': summarize_trades(trades, equity)}
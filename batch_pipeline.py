@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+命令行批处理：对目录中的每个行情文件（或内存映射数据集）无交互地执行完整流程
+读取数据 → 创建特征 → 创建目标变量 → 训练模型 → 生成信号，
+把各文件的信号和一份汇总表按 EXPORT_CONFIG 的格式写入输出目录。
+文件在多个工作进程中并行处理，CPU核在进程之间平均分配。
+任何文件处理失败时以非零状态退出，便于定时任务报警。
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import EXPORT_CONFIG, MODEL_CONFIG, TARGET_CONFIG, UI_CONFIG
+from market_store import is_market_store
+
+# 输出格式 -> 扩展名
+FORMAT_EXTENSIONS = {'csv': '.csv', 'xlsx': '.xlsx', 'json': '.json'}
+
+
+def find_sources(paths):
+    """展开输入路径：目录中的行情文件和内存映射数据集（按名称排序），文件原样保留"""
+    extensions = tuple(f'.{ext}' for ext in UI_CONFIG['supported_file_types'])
+    sources = []
+    for path in paths:
+        if is_market_store(path) or not os.path.isdir(path):
+            sources.append(path)
+            continue
+        for name in sorted(os.listdir(path)):
+            entry = os.path.join(path, name)
+            if is_market_store(entry) or (os.path.isfile(entry) and name.lower().endswith(extensions)):
+                sources.append(entry)
+    return sources
+
+
+def output_path(output_dir, name, file_format, timestamp=None, compression=None):
+    """输出文件路径：<名称>[_<时间戳>].<格式>[.gz]"""
+    compression = EXPORT_CONFIG['compression'] if compression is None else compression
+    suffix = f'_{timestamp}' if timestamp else ''
+    path = os.path.join(output_dir, f'{name}{suffix}{FORMAT_EXTENSIONS[file_format]}')
+    if compression and file_format != 'xlsx':
+        path += '.gz'
+    return path
+
+
+def write_table(df, path, file_format):
+    """按格式写出表格（路径以 .gz 结尾时压缩）"""
+    compression = 'gzip' if path.endswith('.gz') else None
+    if file_format == 'csv':
+        df.to_csv(path, index=False, compression=compression)
+    elif file_format == 'json':
+        df.to_json(path, orient='records', date_format='iso', force_ascii=False, compression=compression)
+    elif file_format == 'xlsx':
+        df.to_excel(path, index=False)
+    else:
+        raise ValueError(f"不支持的输出格式: {file_format}")
+
+
+def process_file(source, output_dir, model_type='random_forest', lookforward_days=None, profit_threshold=None,
+                 loss_threshold=None, test_size=0.2, file_format=None, latest_only=True, save_model=False,
+                 timestamp=None, threads=None, compact_memory=None):
+    """
+    对一个行情文件执行完整流程并写出信号，返回汇总信息字典
+
+    threads 为本进程可用的线程数（模型训练和 NumPy / BLAS 的线程都不超过它）。
+    compact_memory 为 None 时使用 PERFORMANCE_CONFIG['compact_memory']。
+    每个步骤失败时停止，status 为 'failed'，message 为失败原因。
+    """
+    from threadpoolctl import threadpool_limits
+    from profiling import setup_logging
+    from strategy_analyzer import FuturesStrategyAnalyzer
+
+    # 工作进程各自配置日志，各阶段的性能记录写入同一个日志文件
+    setup_logging()
+
+    lookforward_days = lookforward_days or TARGET_CONFIG['default_lookforward_days']
+    profit_threshold = TARGET_CONFIG['default_profit_threshold'] if profit_threshold is None else profit_threshold
+    loss_threshold = TARGET_CONFIG['default_loss_threshold'] if loss_threshold is None else loss_threshold
+    file_format = file_format or EXPORT_CONFIG['default_format']
+    name = os.path.splitext(os.path.basename(os.path.normpath(source)))[0]
+    summary = {'source': source, 'status': 'failed', 'message': '', 'rows': 0, 'contracts': 0,
+               'accuracy': None, 'signals': 0, 'model_version': None, 'output': None, 'seconds': 0.0}
+
+    start = time.perf_counter()
+    analyzer = None
+    try:
+        with threadpool_limits(limits=threads):
+            analyzer = FuturesStrategyAnalyzer()
+            if compact_memory is not None:
+                analyzer.compact_memory = compact_memory
+            if is_market_store(source):
+                steps = [lambda: analyzer.open_store(source), analyzer.select_data]
+            else:
+                steps = [lambda: analyzer.load_data(source, {})]
+            steps += [
+                analyzer.create_features,
+                lambda: analyzer.create_target(lookforward_days, profit_threshold, loss_threshold),
+                lambda: analyzer.train_model(model_type, test_size, n_jobs=threads),
+            ]
+            for step in steps:
+                success, message = step()
+                if not success:
+                    summary['message'] = message
+                    return summary
+
+            summary['rows'] = len(analyzer.data)
+            summary['contracts'] = analyzer.data['contract'].nunique()
+            summary['accuracy'] = analyzer.model_info['metrics'].get('accuracy')
+            if save_model:
+                success, message = analyzer.save_model()
+                if not success:
+                    summary['message'] = message
+                    return summary
+                summary['model_version'] = analyzer.model_info['version']
+
+            # 最新信号使用特征表（目标变量表最后几根K线没有未来收益）
+            success, signals = analyzer.predict_signals(analyzer.features, latest_only=latest_only)
+            if not success:
+                summary['message'] = signals
+                return summary
+
+            path = output_path(output_dir, f'{name}_signals', file_format, timestamp)
+            write_table(signals, path, file_format)
+            summary.update(status='ok', message=message, signals=len(signals), output=path)
+            return summary
+
+    except Exception as e:
+        summary['message'] = f"处理失败: {e}"
+        return summary
+    finally:
+        summary['seconds'] = round(time.perf_counter() - start, 3)
+        # 各阶段耗时（毫秒，同一阶段多次调用时累加）
+        for record in analyzer.profiler.records if analyzer is not None else []:
+            if record.get('depth') == 0:
+                column = f"{record['stage']}_ms"
+                summary[column] = round(summary.get(column, 0) + record['wall_ms'], 3)
+
+
+def run_batch(sources, output_dir, workers=None, progress=None, **options):
+    """
+    并行处理多个文件，返回汇总表（与 sources 顺序相同）
+
+    workers 为工作进程数（默认 min(文件数, CPU核数)），options 传给 process_file；
+    progress(summary) 在每个文件完成后调用。
+    """
+    from joblib import Parallel, delayed
+
+    os.makedirs(output_dir, exist_ok=True)
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(len(sources), workers or cpu_count))
+    threads = max(1, cpu_count // workers)
+
+    summaries = []
+    results = Parallel(n_jobs=workers, return_as='generator')(
+        delayed(process_file)(source, output_dir, threads=threads, **options) for source in sources
+    )
+    for summary in results:
+        summaries.append(summary)
+        if progress is not None:
+            progress(summary)
+    return pd.DataFrame(summaries)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="批处理：读取数据 → 特征 → 目标变量 → 训练 → 信号")
+    parser.add_argument('inputs', nargs='+', help="行情文件、内存映射数据集或包含它们的目录")
+    parser.add_argument('--output-dir', default='batch_output', help="输出目录")
+    parser.add_argument('--model', choices=list(MODEL_CONFIG), default='random_forest', help="模型类型")
+    parser.add_argument('--lookforward', type=int, default=TARGET_CONFIG['default_lookforward_days'],
+                        help="目标变量的预测天数")
+    parser.add_argument('--profit-threshold', type=float, default=TARGET_CONFIG['default_profit_threshold'],
+                        help="盈利阈值")
+    parser.add_argument('--loss-threshold', type=float, default=TARGET_CONFIG['default_loss_threshold'],
+                        help="亏损阈值")
+    parser.add_argument('--test-size', type=float, default=0.2, help="测试集比例（按时间切分）")
+    parser.add_argument('--format', choices=EXPORT_CONFIG['supported_formats'],
+                        default=EXPORT_CONFIG['default_format'], help="输出格式")
+    parser.add_argument('--all-bars', action='store_true', help="输出每根K线的信号（默认只输出各合约最新K线）")
+    parser.add_argument('--save-model', action='store_true', help="把每个文件训练的模型保存到模型库")
+    parser.add_argument('--workers', type=int, help="并行进程数（默认 min(文件数, CPU核数)）")
+    parser.add_argument('--compact-memory', action='store_true',
+                        help="内存压缩模式：使用 float32、category 等紧凑类型（结果可能与默认模式略有差异）")
+    args = parser.parse_args()
+
+    if args.format == 'xlsx' and importlib.util.find_spec('openpyxl') is None:
+        print("❌ 输出 xlsx 需要安装 openpyxl")
+        sys.exit(1)
+
+    sources = find_sources(args.inputs)
+    if not sources:
+        print("❌ 没有找到行情文件")
+        sys.exit(1)
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S') if EXPORT_CONFIG['include_timestamp'] else None
+
+    print("=" * 60)
+    print(f"📊 批处理: {len(sources)} 个文件, 模型 {args.model}, 输出 {args.format} → {args.output_dir}")
+    print("=" * 60)
+
+    def progress(summary):
+        if summary['status'] == 'ok':
+            print(f"✅ {summary['source']}: {summary['message']}，{summary['signals']} 条信号，"
+                  f"用时 {summary['seconds']:.1f} 秒", flush=True)
+        else:
+            print(f"❌ {summary['source']}: {summary['message']}", flush=True)
+
+    start = time.perf_counter()
+    summary = run_batch(sources, args.output_dir, workers=args.workers, progress=progress,
+                        model_type=args.model, lookforward_days=args.lookforward,
+                        profit_threshold=args.profit_threshold, loss_threshold=args.loss_threshold,
+                        test_size=args.test_size, file_format=args.format, latest_only=not args.all_bars,
+                        save_model=args.save_model, timestamp=timestamp,
+                        compact_memory=args.compact_memory or None)
+    summary_path = output_path(args.output_dir, 'summary', args.format, timestamp)
+    write_table(summary, summary_path, args.format)
+
+    failed = int((summary['status'] != 'ok').sum())
+    print("=" * 60)
+    print(f"📊 完成 {len(summary) - failed}/{len(summary)} 个文件，用时 {time.perf_counter() - start:.1f} 秒")
+    print(f"💾 汇总表: {summary_path}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+导入时间基准：用 python -X importtime 在新进程中测量各入口模块的冷启动导入时间，
+与预算比较，并检查不需要的重型库（scikit-learn、各模型库、绘图库、Streamlit）没有被导入
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 入口模块 -> 导入时间预算（毫秒，单核机器上的冷启动时间）
+IMPORT_BUDGETS = {
+    'strategy_analyzer': 700,
+    'scoring_service': 700,
+    'convert_data': 700,
+    'ui_cache': 1500,
+}
+
+# 只在训练、加载模型、绘图或运行界面时才应导入的库
+HEAVY_MODULES = ['sklearn', 'scipy', 'xgboost', 'lightgbm', 'catboost', 'matplotlib', 'seaborn',
+                 'plotly.express', 'ta', 'joblib', 'streamlit']
+
+# 各入口允许导入的重型库
+ALLOWED_MODULES = {
+    'ui_cache': ['streamlit'],
+}
+
+
+def measure_imports(module, python=None):
+    """
+    在新进程中导入 module，返回 (总耗时毫秒, {顶层包: 耗时毫秒})
+
+    -X importtime 输出每个模块自身的导入时间，按顶层包汇总（如 pandas.core.frame 计入 pandas）。
+    """
+    result = subprocess.run([python or sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败: {result.stderr.strip().splitlines()[-1]}")
+
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_time, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_time) / 1000
+    return sum(packages.values()), packages
+
+
+def loaded_modules(module, python=None):
+    """在新进程中导入 module 后 sys.modules 中的模块名"""
+    code = f'import sys, {module}; print("\\n".join(sys.modules))'
+    result = subprocess.run([python or sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败: {result.stderr.strip().splitlines()[-1]}")
+    return set(result.stdout.split())
+
+
+def heavy_imports(module, python=None):
+    """导入 module 时被导入的重型库（不含该入口允许的库）"""
+    names = loaded_modules(module, python)
+    allowed = ALLOWED_MODULES.get(module, [])
+    return [heavy for heavy in HEAVY_MODULES if heavy in names and heavy not in allowed]
+
+
+def run_benchmark(modules, repeat=3, scale=1.0):
+    """测量各入口的导入时间（取 repeat 次中的最小值），返回结果列表"""
+    results = []
+    for module in modules:
+        runs = [measure_imports(module) for _ in range(repeat)]
+        total, breakdown = min(runs, key=lambda run: run[0])
+        budget = IMPORT_BUDGETS.get(module)
+        budget = budget * scale if budget is not None else None
+        results.append({
+            'module': module,
+            'import_ms': round(total, 1),
+            'budget_ms': budget,
+            'within_budget': budget is None or total <= budget,
+            'heavy_imports': heavy_imports(module),
+            'slowest': sorted(breakdown.items(), key=lambda item: -item[1])[:5]
+        })
+    return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="导入时间基准")
+    parser.add_argument('modules', nargs='*', default=list(IMPORT_BUDGETS), help="入口模块（默认全部）")
+    parser.add_argument('--repeat', type=int, default=3, help="每个模块测量次数（取最小值）")
+    parser.add_argument('--scale', type=float, default=1.0, help="预算倍数（较慢的机器上放宽预算）")
+    parser.add_argument('--output', help="把结果写入JSON文件")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("📊 导入时间基准")
+    print("=" * 60)
+
+    results = run_benchmark(args.modules, args.repeat, args.scale)
+    failed = False
+    for result in results:
+        ok = result['within_budget'] and not result['heavy_imports']
+        failed = failed or not ok
+        budget = f"{result['budget_ms']:.0f} ms" if result['budget_ms'] is not None else "无"
+        print(f"{'✅' if ok else '❌'} {result['module']:20s} {result['import_ms']:8.1f} ms   预算 {budget}")
+        if result['heavy_imports']:
+            print(f"     导入了重型库: {', '.join(result['heavy_imports'])}")
+        print("     最慢的导入: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in result['slowest']))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.output}")
+
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
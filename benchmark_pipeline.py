@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+分析流程基准：用模拟行情在不同规模（默认 1 万到 1000 万行）和合约数下，
+测量读取数据、创建特征、创建目标变量，以及每种模型的训练、批量预测、历史回测的耗时和内存，
+结果写入JSON，并与保存的基准结果比较，耗时明显变慢的阶段视为性能回退（以非零状态退出）。
+
+每个规模默认在独立的新进程中运行，内存峰值互不影响；各阶段的耗时取自分析器的阶段记录（profiling）。
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import PERFORMANCE_CONFIG
+from synthetic_data import generate_futures_data
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_CONTRACTS = [10, 100]
+DEFAULT_MODELS = ['logistic_regression', 'random_forest', 'lightgbm']
+
+# 每个合约至少需要的交易日数（指标预热期之后还要有足够的K线训练）
+MIN_DAYS = 100
+
+# 超过该行数的规模只运行一次
+MAX_REPEAT_ROWS = 1_000_000
+
+# 默认只在不超过该行数的规模上训练模型（单核上随机森林训练 10 万行约需 1.5 分钟）
+MAX_TRAIN_ROWS = 100_000
+
+# 基准运行期间的配置：不限制行数、不使用特征缓存、不加载模型库中的模型
+BENCHMARK_CONFIG = {
+    'max_data_rows': 0,
+    'enable_feature_cache': False,
+    'load_latest_model': False,
+    'profile_stages': True,
+    'profile_tracemalloc': False,
+    'profile_dir': None,
+}
+
+# 结果中用于与基准结果对应的字段
+KEY_FIELDS = ('rows', 'contracts', 'stage', 'model')
+
+
+def environment():
+    """运行环境（不同机器的结果不能直接比较）"""
+    import sklearn
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+
+def _stage_record(analyzer, stage, model=None):
+    """分析器最近一次调用的最外层阶段记录"""
+    record = next(record for record in reversed(analyzer.profiler.records) if record['depth'] == 0)
+    return {
+        'stage': stage,
+        'model': model,
+        'ok': record['ok'],
+        'message': record.get('message'),
+        'wall_ms': record['wall_ms'],
+        'cpu_ms': record['cpu_ms'],
+        'peak_rss_mb': record['peak_rss_mb'],
+        'peak_rss_delta_mb': record['peak_rss_delta_mb'],
+        'rows_in': record['rows_in'],
+        'rows_out': record['rows_out'],
+    }
+
+
+def _run_once(path, models, train):
+    """对一份数据执行一遍完整流程，返回各阶段记录"""
+    from strategy_analyzer import FuturesStrategyAnalyzer
+
+    analyzer = FuturesStrategyAnalyzer()
+    analyzer.model_registry = None
+    records = []
+
+    steps = [
+        ('load_data', None, lambda: analyzer.load_data(path, {})),
+        ('create_features', None, analyzer.create_features),
+        ('create_target', None, analyzer.create_target),
+    ]
+    if train:
+        for model_type in models:
+            steps += [
+                ('train_model', model_type, lambda model_type=model_type: analyzer.train_model(model_type)),
+                ('predict_signals', model_type,
+                 lambda: analyzer.predict_signals(analyzer.target, latest_only=False)),
+                ('run_backtest', model_type, analyzer.run_backtest),
+            ]
+
+    for stage, model, step in steps:
+        success, _ = step()
+        records.append(_stage_record(analyzer, stage, model))
+        # 数据准备失败时后面的阶段没有意义；某个模型失败时继续测量其他模型
+        if not success and model is None:
+            break
+    return records
+
+
+def run_case(rows, contracts, models=None, repeat=1, seed=42, max_train_rows=MAX_TRAIN_ROWS):
+    """
+    测量一个规模：生成 rows 行、contracts 个合约的模拟行情（Parquet），
+    执行 repeat 遍流程，每个阶段取最快的一遍，返回结果列表
+
+    rows 超过 max_train_rows 时只测量数据准备阶段（读取数据、特征、目标变量）。
+    """
+    models = DEFAULT_MODELS if models is None else models
+    days = int(np.ceil(rows / contracts))
+    train = rows <= max_train_rows
+    repeat = repeat if rows <= MAX_REPEAT_ROWS else 1
+
+    saved = {key: PERFORMANCE_CONFIG[key] for key in BENCHMARK_CONFIG}
+    PERFORMANCE_CONFIG.update(BENCHMARK_CONFIG)
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, 'market.parquet')
+        generate_futures_data(contracts, days=days, seed=seed).to_parquet(path, index=False)
+
+        runs = [_run_once(path, models, train) for _ in range(repeat)]
+    finally:
+        PERFORMANCE_CONFIG.update(saved)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = []
+    for attempts in zip(*runs):
+        best = min(attempts, key=lambda record: record['wall_ms'] if record['ok'] else float('inf'))
+        results.append({'rows': rows, 'contracts': contracts, 'days': days, 'repeat': len(attempts), **best})
+    return results
+
+
+def run_suite(rows_list, contracts_list, models=None, repeat=1, seed=42, max_train_rows=MAX_TRAIN_ROWS,
+              isolate=True, progress=None):
+    """
+    按规模从小到大测量全部组合，返回结果列表
+
+    isolate 为 True 时每个规模在新进程中运行（spawn），内存峰值和已导入的库互不影响，
+    进程异常退出（通常是内存不足）时该规模记录为一条失败结果，继续测量后面的规模；
+    progress(results) 在每个规模完成后调用。
+    """
+    results = []
+    for rows in sorted(rows_list):
+        for contracts in sorted(contracts_list):
+            if rows / contracts < MIN_DAYS:
+                continue
+            if isolate:
+                try:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                        case = pool.submit(run_case, rows, contracts, models, repeat, seed, max_train_rows).result()
+                except BrokenProcessPool:
+                    case = [{'rows': rows, 'contracts': contracts, 'days': int(np.ceil(rows / contracts)),
+                             'repeat': 0, 'stage': 'run_case', 'model': None, 'ok': False,
+                             'message': "进程异常退出（可能内存不足）", 'wall_ms': None, 'cpu_ms': None,
+                             'peak_rss_mb': None, 'peak_rss_delta_mb': None, 'rows_in': None, 'rows_out': None}]
+            else:
+                case = run_case(rows, contracts, models, repeat, seed, max_train_rows)
+            results.extend(case)
+            if progress is not None:
+                progress(case)
+    return results
+
+
+def _key(result):
+    return tuple(result[field] for field in KEY_FIELDS)
+
+
+def compare_results(results, baseline, tolerance=0.25, min_ms=10.0):
+    """
+    与基准结果比较，返回 (回退列表, 改进列表)
+
+    耗时超过基准的 (1 + tolerance) 倍且多出 min_ms 毫秒以上时为回退（min_ms 过滤小阶段的计时噪声），
+    快于基准的 1 / (1 + tolerance) 时为改进；基准中成功而本次失败的阶段也算回退。
+    """
+    previous = {_key(result): result for result in baseline}
+    regressions, improvements = [], []
+    for result in results:
+        before = previous.get(_key(result))
+        if before is None or not before['ok']:
+            continue
+        entry = {**{field: result[field] for field in KEY_FIELDS},
+                 'baseline_ms': before['wall_ms'], 'current_ms': result['wall_ms']}
+        if not result['ok']:
+            regressions.append({**entry, 'ratio': None, 'message': result['message']})
+            continue
+        ratio = result['wall_ms'] / before['wall_ms'] if before['wall_ms'] else float('inf')
+        entry['ratio'] = round(ratio, 3)
+        if ratio > 1 + tolerance and result['wall_ms'] - before['wall_ms'] > min_ms:
+            regressions.append(entry)
+        elif ratio < 1 / (1 + tolerance) and before['wall_ms'] - result['wall_ms'] > min_ms:
+            improvements.append(entry)
+    return regressions, improvements
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_results(path, report):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def _label(entry):
+    model = f" [{entry['model']}]" if entry['model'] else ''
+    return f"{entry['rows']:>11,} 行 {entry['contracts']:>4} 合约  {entry['stage']}{model}"
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="分析流程基准")
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS, help="数据行数（可多个）")
+    parser.add_argument('--contracts', type=int, nargs='+', default=DEFAULT_CONTRACTS, help="合约数量（可多个）")
+    parser.add_argument('--models', nargs='+', default=DEFAULT_MODELS, help="模型类型（all 为全部）")
+    parser.add_argument('--repeat', type=int, default=3, help=f"每个规模运行次数（取最快；超过 {MAX_REPEAT_ROWS:,} 行只运行一次）")
+    parser.add_argument('--seed', type=int, default=42, help="模拟行情的随机种子")
+    parser.add_argument('--max-train-rows', type=int, default=MAX_TRAIN_ROWS,
+                        help="只在不超过该行数的规模上训练模型")
+    parser.add_argument('--in-process', action='store_true', help="在当前进程中运行（不隔离各规模）")
+    parser.add_argument('--output', default='benchmark_results.json', help="结果JSON文件")
+    parser.add_argument('--baseline', help="与该基准结果比较")
+    parser.add_argument('--save-baseline', help="同时把本次结果保存为基准结果")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="允许的变慢比例")
+    parser.add_argument('--min-ms', type=float, default=10.0, help="小于该毫秒数的变化视为噪声")
+    args = parser.parse_args()
+
+    if args.models == ['all']:
+        from model_factory import MODEL_TYPES
+        args.models = MODEL_TYPES
+
+    print("=" * 60)
+    print(f"📊 分析流程基准: {', '.join(f'{rows:,}' for rows in sorted(args.rows))} 行 × "
+          f"{', '.join(map(str, sorted(args.contracts)))} 个合约, 模型 {', '.join(args.models)}")
+    print("=" * 60)
+
+    def progress(case):
+        for entry in case:
+            if entry['ok']:
+                print(f"✅ {_label(entry):60s} {entry['wall_ms']:10.1f} ms   "
+                      f"内存峰值 {entry['peak_rss_mb'] or 0:.0f} MB", flush=True)
+            else:
+                print(f"❌ {_label(entry):60s} {entry['message']}", flush=True)
+
+    start = time.perf_counter()
+    results = run_suite(args.rows, args.contracts, args.models, args.repeat, args.seed, args.max_train_rows,
+                        isolate=not args.in_process, progress=progress)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'settings': {'rows': sorted(args.rows), 'contracts': sorted(args.contracts), 'models': args.models,
+                     'repeat': args.repeat, 'seed': args.seed, 'max_train_rows': args.max_train_rows},
+        'results': results,
+    }
+    save_results(args.output, report)
+    if args.save_baseline:
+        save_results(args.save_baseline, report)
+    print(f"\n用时 {time.perf_counter() - start:.1f} 秒，结果已写入 {args.output}")
+
+    failed = any(not entry['ok'] for entry in results)
+    if args.baseline:
+        baseline = load_results(args.baseline)
+        if baseline['environment'] != report['environment']:
+            print("⚠️ 基准结果来自不同的运行环境，比较结果仅供参考")
+        regressions, improvements = compare_results(results, baseline['results'], args.tolerance, args.min_ms)
+        print(f"\n与基准结果比较（{args.baseline}，{baseline['created']}）:")
+        for entry in improvements:
+            print(f"🚀 {_label(entry):60s} {entry['baseline_ms']:10.1f} → {entry['current_ms']:10.1f} ms")
+        for entry in regressions:
+            if entry['ratio'] is None:
+                print(f"❌ {_label(entry):60s} 失败: {entry['message']}")
+            else:
+                print(f"❌ {_label(entry):60s} {entry['baseline_ms']:10.1f} → {entry['current_ms']:10.1f} ms "
+                      f"({entry['ratio']:.2f}x)")
+        if not regressions:
+            print("✅ 没有性能回退")
+        failed = failed or bool(regressions)
+
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+实时打分服务压测：用模拟行情训练模型，在独立进程中启动本地打分服务，
+按日期顺序逐根回放后续K线，统计进程内打分与 HTTP 请求的 p50 / p99 延迟和吞吐量
+"""
+
+import argparse
+import http.client
+import json
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import sys
+import os
+
+import numpy as np
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_factory import MODEL_TYPES
+from model_registry import ModelRegistry
+from synthetic_data import generate_futures_data
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """通过 Unix socket 发送 HTTP 请求"""
+
+    def __init__(self, path):
+        super().__init__('localhost')
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+def percentiles(latencies):
+    latencies = np.asarray(latencies) * 1000
+    return {'p50': np.percentile(latencies, 50), 'p99': np.percentile(latencies, 99), 'mean': latencies.mean()}
+
+
+def report(name, latencies, elapsed):
+    stats = percentiles(latencies)
+    print(f"{name:18s} p50 {stats['p50']:7.3f} ms   p99 {stats['p99']:7.3f} ms   "
+          f"平均 {stats['mean']:7.3f} ms   吞吐 {len(latencies) / elapsed:8.0f} 根/秒")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(connect, process, timeout=120):
+    """等待服务进程可以响应 /health"""
+    deadline = time.time() + timeout
+    while time.time() < deadline and process.poll() is None:
+        try:
+            conn = connect()
+            conn.request('GET', '/health')
+            ready = conn.getresponse().status == 200
+            conn.close()
+            if ready:
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def replay_http(connect, bars, clients):
+    """clients 个连接并发回放（按合约分配，保证同一合约的K线按顺序到达）"""
+    groups = [[] for _ in range(clients)]
+    for bar in bars:
+        groups[hash(bar['contract']) % clients].append(json.dumps(bar).encode('utf-8'))
+    latencies, errors = [], []
+
+    def run(bodies):
+        conn = connect()
+        for body in bodies:
+            start = time.perf_counter()
+            conn.request('POST', '/score', body, {'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            payload = response.read()
+            latencies.append(time.perf_counter() - start)
+            if response.status != 200:
+                errors.append(payload.decode('utf-8'))
+        conn.close()
+
+    threads = [threading.Thread(target=run, args=(group,)) for group in groups]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start, errors
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="实时打分服务压测")
+    parser.add_argument('--model', choices=MODEL_TYPES, default='logistic_regression', help="模型类型")
+    parser.add_argument('--contracts', type=int, default=50, help="合约数量")
+    parser.add_argument('--days', type=int, default=400, help="历史交易日数")
+    parser.add_argument('--feed-days', type=int, default=20, help="回放的交易日数")
+    parser.add_argument('--clients', type=int, default=1, help="并发连接数")
+    parser.add_argument('--unix', action='store_true', help="通过 Unix socket 而不是 TCP 连接")
+    args = parser.parse_args()
+
+    from strategy_analyzer import FuturesStrategyAnalyzer
+    from scoring_service import ScoringService
+
+    data = generate_futures_data(args.contracts, days=args.days + args.feed_days, seed=42)
+    dates = np.sort(data['date'].unique())
+    history = data[data['date'] < dates[args.days]].reset_index(drop=True)
+    feed = data[data['date'] >= dates[args.days]]
+    bars = [{**bar, 'date': bar['date'].strftime('%Y-%m-%d')} for bar in feed.to_dict('records')]
+
+    print("=" * 60)
+    print(f"📊 打分服务压测: {args.model}, {args.contracts} 个合约, 回放 {len(bars)} 根K线")
+    print("=" * 60)
+
+    analyzer = FuturesStrategyAnalyzer()
+    analyzer.feature_cache = None
+    analyzer.data = history
+    for step in (analyzer.create_features, analyzer.create_target, lambda: analyzer.train_model(args.model)):
+        success, message = step()
+        if not success:
+            print(f"❌ {message}")
+            sys.exit(1)
+
+    # 进程内：特征更新 + 打分
+    service = ScoringService(analyzer)
+    latencies = []
+    start = time.perf_counter()
+    for bar in bars:
+        begin = time.perf_counter()
+        service.score(bar)
+        latencies.append(time.perf_counter() - begin)
+    report("进程内打分", latencies, time.perf_counter() - start)
+
+    # 其中特征更新部分
+    stream = ScoringService(analyzer).stream
+    latencies = []
+    start = time.perf_counter()
+    for bar in bars:
+        begin = time.perf_counter()
+        stream.update_bar(bar['contract'], bar['date'], bar)
+        latencies.append(time.perf_counter() - begin)
+    report("  其中特征更新", latencies, time.perf_counter() - start)
+
+    # HTTP：保存模型和历史数据后在独立进程中启动 scoring_service.py（与实际部署相同）
+    workdir = tempfile.mkdtemp()
+    history_file = os.path.join(workdir, 'history.csv')
+    history.to_csv(history_file, index=False)
+    analyzer.model_registry = ModelRegistry(os.path.join(workdir, 'models'))
+    analyzer.save_model()
+
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_service.py'),
+               history_file, '--registry', analyzer.model_registry.root]
+    if args.unix:
+        socket_path = os.path.join(workdir, 'scoring.sock')
+        command += ['--socket', socket_path]
+        connect = lambda: UnixHTTPConnection(socket_path)
+    else:
+        port = free_port()
+        command += ['--port', str(port)]
+        connect = lambda: http.client.HTTPConnection('127.0.0.1', port)
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_ready(connect, process):
+            print("❌ 打分服务启动失败")
+            sys.exit(1)
+        latencies, elapsed, errors = replay_http(connect, bars, args.clients)
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+    report("Unix socket 请求" if args.unix else "HTTP 请求", latencies, elapsed)
+    if errors:
+        print(f"❌ {len(errors)} 个请求失败，例如: {errors[0]}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
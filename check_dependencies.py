@@ -19,7 +19,8 @@ def check_dependencies():
         'joblib': 'joblib',
         'xgboost': 'xgboost',
         'lightgbm': 'lightgbm',
-        'catboost': 'catboost'
+        'catboost': 'catboost',
+        'pyarrow': 'pyarrow'
     }
     
     print("🔍 检查依赖包...")
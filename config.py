@@ -60,20 +60,75 @@ MODEL_CONFIG = {
         'n_estimators': 100,
         'learning_rate': 0.1,
         'max_depth': 3,
-        'random_state': 42
+        'random_state': 42,
+        'tree_method': 'hist'    # 直方图算法
     },
     'lightgbm': {
         'n_estimators': 100,
         'learning_rate': 0.1,
         'max_depth': 3,
-        'random_state': 42
+        'random_state': 42,
+        'max_bin': 255,          # 直方图分桶数，越小越快
+        'verbose': -1
     },
     'catboost': {
         'iterations': 100,
         'learning_rate': 0.1,
         'depth': 3,
         'random_state': 42,
-        'verbose': False
+        'verbose': False,
+        'allow_writing_files': False
+    }
+}
+
+# 超参数搜索配置
+SEARCH_CONFIG = {
+    'method': 'hyperband',          # random / halving / hyperband
+    'n_trials': 20,                 # 采样的参数组合数
+    'n_splits': 3,                  # 时间序列交叉验证折数
+    'min_fraction': 1 / 9,          # 逐次减半第一轮使用的训练数据比例（最近的交易日）
+    'reduction_factor': 3,          # 每轮保留 1/reduction_factor 的参数组合
+    'early_stopping_rounds': 20,    # XGBoost / LightGBM / CatBoost 早停轮数
+    'validation_size': 0.2,         # 早停验证集占训练窗口交易日的比例
+    'cache_dir': '.search_cache',   # 已完成试验的缓存目录（中断后可继续）
+    'random_state': 42,
+    # 搜索空间：('int', 下限, 上限)、('float', 下限, 上限)、('log', 下限, 上限)、('choice', [候选值])
+    'spaces': {
+        'random_forest': {
+            'n_estimators': ('int', 50, 400),
+            'max_depth': ('choice', [None, 5, 10, 20]),
+            'min_samples_leaf': ('int', 1, 20),
+            'max_features': ('choice', ['sqrt', 'log2', 0.5])
+        },
+        'gradient_boosting': {
+            'n_estimators': ('int', 50, 300),
+            'learning_rate': ('log', 0.01, 0.3),
+            'max_depth': ('int', 2, 6),
+            'subsample': ('float', 0.6, 1.0)
+        },
+        'logistic_regression': {
+            'C': ('log', 0.001, 100.0)
+        },
+        'xgboost': {
+            'n_estimators': ('int', 100, 1000),
+            'learning_rate': ('log', 0.01, 0.3),
+            'max_depth': ('int', 2, 8),
+            'subsample': ('float', 0.6, 1.0),
+            'colsample_bytree': ('float', 0.5, 1.0)
+        },
+        'lightgbm': {
+            'n_estimators': ('int', 100, 1000),
+            'learning_rate': ('log', 0.01, 0.3),
+            'num_leaves': ('int', 7, 127),
+            'min_child_samples': ('int', 5, 100),
+            'colsample_bytree': ('float', 0.5, 1.0)
+        },
+        'catboost': {
+            'iterations': ('int', 100, 1000),
+            'learning_rate': ('log', 0.01, 0.3),
+            'depth': ('int', 3, 8),
+            'l2_leaf_reg': ('log', 1.0, 10.0)
+        }
     }
 }
 
@@ -81,6 +136,7 @@ MODEL_CONFIG = {
 STRATEGY_CONFIG = {
     'atr_multiplier_stop_loss': 2.0,
     'atr_multiplier_take_profit': 3.0,
+    'initial_capital': 1000000,  # 回测初始资金
     'success_rate_thresholds': {
         'high': 70,      # 高成功率阈值
         'medium': 50     # 中等成功率阈值
@@ -98,7 +154,7 @@ UI_CONFIG = {
     'layout': 'wide',
     'initial_sidebar_state': 'expanded',
     'max_upload_size': 200,  # MB
-    'supported_file_types': ['csv']
+    'supported_file_types': ['csv', 'parquet', 'feather', 'arrow']
 }
 
 # 可视化配置
@@ -122,10 +178,19 @@ RISK_CONFIG = {
     'max_position_size': 0.1,  # 最大仓位比例
     'max_daily_loss': 0.05,    # 最大日亏损比例
     'max_drawdown': 0.2,       # 最大回撤比例
+    'risk_per_trade': 0.01,    # 单笔交易止损时亏损的资金比例（用于计算仓位）
     'stop_loss_atr_multiplier': 2.0,
     'take_profit_atr_multiplier': 3.0
 }
 
+# 实时打分服务配置
+SERVICE_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8765,
+    'socket_path': None,       # 设置后改为监听 Unix socket
+    'single_thread_predict': True  # 单根K线预测时模型只用一个线程（避免线程池调度开销）
+}
+
 # 日志配置
 LOGGING_CONFIG = {
     'level': 'INFO',
@@ -136,9 +201,21 @@ LOGGING_CONFIG = {
 # 性能配置
 PERFORMANCE_CONFIG = {
     'max_data_rows': 100000,  # 最大数据行数
-    'chunk_size': 1000,       # 数据处理块大小
+    'chunk_size': 100000,     # 数据处理块大小（CSV分块读取的行数）
     'cache_ttl': 3600,        # 缓存过期时间（秒）
-    'parallel_processing': True
+    'parallel_processing': True,
+    'model_n_jobs': -1,       # 模型训练使用的CPU核数（-1 为全部），映射到各库的线程参数
+    'enable_feature_cache': True,           # 是否启用特征磁盘缓存
+    'feature_cache_dir': '.feature_cache',  # 特征缓存目录
+    'feature_cache_max_mb': 1024,           # 特征缓存总大小上限（MB）
+    'compact_memory': False,                # 内存压缩模式：数据/特征/目标变量使用 float32、category 等紧凑类型并共享列
+    'model_registry_dir': 'models',         # 模型库目录（每个版本一个子目录）
+    'model_compress': 0,                    # joblib 压缩级别，0 时以内存映射方式加载
+    'load_latest_model': True,              # 启动时（首次使用模型时）加载模型库中的最新版本
+    'profile_stages': True,                 # 记录各阶段的耗时和内存（"性能"页面和日志）
+    'profile_tracemalloc': False,           # 用 tracemalloc 统计各阶段的内存分配（明显变慢，排查内存时开启）
+    'profile_dir': None,                    # 设置目录后每个阶段保存一份 cProfile 结果（.prof）
+    'profile_max_records': 500              # 内存中保留的阶段记录数
 }
 
 # 导出配置
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+行情数据格式转换：把CSV（英文列名、中文列名、symbol/variety 用户格式）一次性转换为
+Parquet 或 Feather，之后 load_data 可以直接读取列式文件，跳过CSV解析；
+使用 --store 时转换为按合约分区的内存映射数据集目录。
+"""
+
+import argparse
+import time
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_loader import convert_market_file, read_market_data
+from market_store import write_market_store
+
+
+def path_size(path):
+    """文件或目录的总大小（字节）"""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="行情数据转换为 Parquet / Feather")
+    parser.add_argument('source', help="输入文件（CSV / Parquet / Feather）")
+    parser.add_argument('target', help="输出文件（扩展名 .parquet 或 .feather/.arrow 决定格式）或数据集目录")
+    parser.add_argument('--store', action='store_true', help="输出为按合约分区的内存映射数据集目录")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.store:
+        data, _ = read_market_data(args.source, max_rows=0)
+        try:
+            rows = write_market_store(data, args.target)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    else:
+        rows = convert_market_file(args.source, args.target)
+    elapsed = time.perf_counter() - start
+
+    source_size = path_size(args.source) / 1024 / 1024
+    target_size = path_size(args.target) / 1024 / 1024
+    print(f"✅ 已转换 {rows:,} 行: {args.source} ({source_size:.1f} MB) -> "
+          f"{args.target} ({target_size:.1f} MB)，用时 {elapsed:.2f} 秒")
+
+
+if __name__ == "__main__":
+    main()
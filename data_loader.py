@@ -0,0 +1,335 @@
+"""
+行情数据分块读取
+
+支持CSV和列式格式（Parquet、Feather/Arrow IPC）。按 PERFORMANCE_CONFIG['chunk_size']
+分块流式读取，只读取需要的列。每块单独完成列名映射、类型转换和缺失值处理，
+并立即压缩为紧凑类型（价格 float32、成交量/持仓量 int32、合约 category；成交金额保持 float64）。
+总行数超过 PERFORMANCE_CONFIG['max_data_rows'] 时只保留日期最近的行，
+峰值内存与文件大小无关。列式文件的日期范围和合约筛选在读取时下推，
+不满足条件的行组不会被解码。
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from config import PERFORMANCE_CONFIG
+
+# 标准列名及可识别的列名（按优先级排列）
+REQUIRED_COLUMN_ALIASES = {
+    'date': ['date', '交易日', 'Date', 'DATE'],
+    'contract': ['contract', 'symbol', '合约', 'Contract', 'CONTRACT'],
+    'open': ['open', '开盘价', 'Open', 'OPEN'],
+    'high': ['high', '最高价', 'High', 'HIGH'],
+    'low': ['low', '最低价', 'Low', 'LOW'],
+    'close': ['close', '收盘价', 'Close', 'CLOSE'],
+    'volume': ['volume', '成交量', 'Volume', 'VOLUME'],
+    'open_interest': ['open_interest', '持仓量', 'Open_Interest', 'OPEN_INTEREST']
+}
+
+OPTIONAL_COLUMN_ALIASES = {
+    'turnover': ['turnover', '成交金额'],
+    'settle': ['settle', '结算价'],
+    'pre_settle': ['pre_settle', '前结算价'],
+    'variety': ['variety', '品种']
+}
+
+STANDARD_COLUMNS = list(REQUIRED_COLUMN_ALIASES) + list(OPTIONAL_COLUMN_ALIASES)
+
+# 必须有值的数值列，缺失时删除整行
+KEY_NUMERIC_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'open_interest']
+# 缺失时用0填充的可选数值列
+OPTIONAL_NUMERIC_COLUMNS = ['turnover', 'settle', 'pre_settle']
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'settle', 'pre_settle']
+# 成交金额常超过 1e9，float32 只有约 7 位有效数字，保持 float64
+AMOUNT_COLUMNS = ['turnover']
+FLOAT_COLUMNS = PRICE_COLUMNS + AMOUNT_COLUMNS
+COUNT_COLUMNS = ['volume', 'open_interest']
+CATEGORY_COLUMNS = ['contract', 'variety']
+
+# 列式文件扩展名 -> pyarrow.dataset 格式名
+COLUMNAR_FORMATS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'ipc',
+    '.arrow': 'ipc',
+    '.ipc': 'ipc'
+}
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+def resolve_columns(header, column_mapping=None):
+    """
+    根据表头确定需要读取的列
+
+    先应用用户的列映射，再按别名识别标准列。返回 {原始列名: 标准列名}，
+    缺少必要列时抛出 ValueError。
+    """
+    column_mapping = column_mapping or {}
+    mapped = [column_mapping.get(col, col) for col in header]
+
+    rename = {}
+    missing_columns = []
+    for aliases, required in ((REQUIRED_COLUMN_ALIASES, True), (OPTIONAL_COLUMN_ALIASES, False)):
+        for standard, possible_names in aliases.items():
+            found = next((name for name in possible_names if name in mapped), None)
+            if found is None:
+                if required:
+                    missing_columns.append(standard)
+                continue
+            rename[header[mapped.index(found)]] = standard
+
+    if missing_columns:
+        raise ValueError(f"缺少必要的列: {missing_columns}")
+    return rename
+
+
+def _compact_counts(values):
+    """成交量、持仓量为整数且在 int32 范围内时压缩为 int32"""
+    array = values.to_numpy(dtype=np.float64)
+    if len(array) and (np.any(array != np.round(array)) or array.min() < INT32_MIN or array.max() > INT32_MAX):
+        return values.astype(np.float64)
+    return values.astype(np.int32)
+
+
+def clean_chunk(chunk, rename):
+    """对单个数据块做列名映射、类型转换和缺失值处理"""
+    df = chunk.rename(columns=rename)
+    df = df[[col for col in STANDARD_COLUMNS if col in df.columns]]
+    df['date'] = pd.to_datetime(df['date'])
+
+    for col in FLOAT_COLUMNS + COUNT_COLUMNS:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    # 删除关键列的缺失值，可选列用0填充
+    df = df.dropna(subset=KEY_NUMERIC_COLUMNS)
+    for col in OPTIONAL_NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna(0)
+
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(np.float32)
+    for col in AMOUNT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(np.float64)
+    for col in COUNT_COLUMNS:
+        df[col] = _compact_counts(df[col])
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str).astype('category')
+    return df
+
+
+def concat_chunks(chunks):
+    """合并数据块，分类列合并类别后仍保持 category 类型"""
+    if len(chunks) == 1:
+        return chunks[0]
+    chunks = [chunk.copy() for chunk in chunks]
+    for col in CATEGORY_COLUMNS:
+        if col in chunks[0].columns:
+            categories = union_categoricals([chunk[col] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _keep_latest(df, max_rows):
+    """按日期保留最近的 max_rows 行"""
+    return df.sort_values('date', kind='mergesort').tail(max_rows)
+
+
+def _date_bound(value, tz=None):
+    """把日期边界转换为 Timestamp；日期列带时区时，不带时区的边界按该时区的本地时间理解"""
+    bound = pd.Timestamp(value)
+    if tz is None:
+        return bound.tz_localize(None) if bound.tz is not None else bound
+    return bound.tz_localize(tz) if bound.tz is None else bound.tz_convert(tz)
+
+
+def _filter_rows(df, start_date=None, end_date=None, contracts=None):
+    """按日期范围（含两端）和合约筛选"""
+    mask = np.ones(len(df), dtype=bool)
+    tz = getattr(df['date'].dtype, 'tz', None)
+    if start_date is not None:
+        mask &= (df['date'] >= _date_bound(start_date, tz)).to_numpy()
+    if end_date is not None:
+        mask &= (df['date'] <= _date_bound(end_date, tz)).to_numpy()
+    if contracts is not None:
+        mask &= df['contract'].isin(list(contracts)).to_numpy()
+    return df if mask.all() else df[mask]
+
+
+def _collect_chunks(chunks, rename, max_rows, filters):
+    """逐块清洗、筛选并合并，返回 (按日期排序的DataFrame, 因超过行数上限被丢弃的行数)"""
+    if max_rows is None:
+        max_rows = PERFORMANCE_CONFIG['max_data_rows']
+
+    kept = []
+    buffered = 0
+    dropped = 0
+    for chunk in chunks:
+        chunk = _filter_rows(clean_chunk(chunk, rename), **filters)
+        kept.append(chunk)
+        buffered += len(chunk)
+        # 超过上限两倍时才压缩，保证每行的均摊开销为常数
+        if max_rows and buffered > 2 * max_rows:
+            dropped += buffered - max_rows
+            kept = [_keep_latest(concat_chunks(kept), max_rows)]
+            buffered = max_rows
+
+    if not kept:
+        raise ValueError("文件中没有数据")
+
+    df = concat_chunks(kept)
+    if max_rows and len(df) > max_rows:
+        dropped += len(df) - max_rows
+        df = _keep_latest(df, max_rows)
+    else:
+        df = df.sort_values('date', kind='mergesort')
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].cat.remove_unused_categories()
+    return df.reset_index(drop=True), dropped
+
+
+def detect_format(file):
+    """根据文件名扩展名判断格式，返回 'csv'、'parquet' 或 'ipc'"""
+    name = file if isinstance(file, (str, os.PathLike)) else getattr(file, 'name', '')
+    return COLUMNAR_FORMATS.get(os.path.splitext(str(name))[1].lower(), 'csv')
+
+
+def read_market_csv(file, column_mapping=None, chunk_size=None, max_rows=None,
+                    start_date=None, end_date=None, contracts=None):
+    """
+    分块读取行情CSV
+
+    file 可以是路径或文件对象。返回 (按日期排序的DataFrame, 因超过行数上限被丢弃的行数)。
+    max_rows 为 0 时不限制行数，为 None 时使用 PERFORMANCE_CONFIG['max_data_rows']。
+    """
+    chunk_size = chunk_size or PERFORMANCE_CONFIG['chunk_size']
+
+    # 文件对象可能已被预览读取过，先回到开头
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    header = list(pd.read_csv(file, nrows=0).columns)
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    rename = resolve_columns(header, column_mapping)
+    dtype = {original: 'category' for original, standard in rename.items() if standard in CATEGORY_COLUMNS}
+
+    chunks = pd.read_csv(file, usecols=list(rename), dtype=dtype, chunksize=chunk_size)
+    filters = {'start_date': start_date, 'end_date': end_date, 'contracts': contracts}
+    return _collect_chunks(chunks, rename, max_rows, filters)
+
+
+def _open_dataset(file, file_format):
+    """打开列式文件：路径直接打开（支持目录），文件对象读入内存缓冲"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    if isinstance(file, (str, os.PathLike)):
+        return ds.dataset(file, format=file_format)
+
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    buffer = pa.BufferReader(file.read())
+    arrow_format = ds.ParquetFileFormat() if file_format == 'parquet' else ds.IpcFileFormat()
+    fragment = arrow_format.make_fragment(buffer)
+    return ds.FileSystemDataset([fragment], fragment.physical_schema, arrow_format)
+
+
+def _pushdown_filter(schema, rename, start_date=None, end_date=None, contracts=None):
+    """把日期范围和合约筛选转换为 pyarrow 表达式（列类型不支持时交给逐块筛选）"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    original = {standard: name for name, standard in rename.items()}
+    expression = None
+
+    def combine(condition):
+        return condition if expression is None else expression & condition
+
+    # 边界带上列的时区，否则带时区的时间戳列没有可用的比较函数
+    date_type = schema.field(original['date']).type
+    if pa.types.is_timestamp(date_type) or pa.types.is_date(date_type):
+        tz = date_type.tz if pa.types.is_timestamp(date_type) else None
+        date_field = ds.field(original['date'])
+        if start_date is not None:
+            expression = combine(date_field >= pa.scalar(_date_bound(start_date, tz), type=pa.timestamp('ns', tz)))
+        if end_date is not None:
+            expression = combine(date_field <= pa.scalar(_date_bound(end_date, tz), type=pa.timestamp('ns', tz)))
+
+    contract_type = schema.field(original['contract']).type
+    if pa.types.is_dictionary(contract_type):
+        contract_type = contract_type.value_type
+    if contracts is not None and (pa.types.is_string(contract_type) or pa.types.is_large_string(contract_type)):
+        expression = combine(ds.field(original['contract']).isin([str(c) for c in contracts]))
+
+    return expression
+
+
+def read_market_columnar(file, column_mapping=None, chunk_size=None, max_rows=None,
+                         start_date=None, end_date=None, contracts=None, file_format=None):
+    """
+    读取 Parquet / Feather(Arrow IPC) 行情文件
+
+    只解码需要的列；日期范围和合约筛选下推到文件读取（Parquet 按行组统计信息跳过），
+    按批次清洗，返回值与 read_market_csv 相同。
+    """
+    chunk_size = chunk_size or PERFORMANCE_CONFIG['chunk_size']
+    dataset = _open_dataset(file, file_format or detect_format(file))
+    rename = resolve_columns(dataset.schema.names, column_mapping)
+    expression = _pushdown_filter(dataset.schema, rename, start_date, end_date, contracts)
+
+    batches = dataset.to_batches(columns=list(rename), filter=expression, batch_size=chunk_size)
+    chunks = (batch.to_pandas() for batch in batches if batch.num_rows)
+    filters = {'start_date': start_date, 'end_date': end_date, 'contracts': contracts}
+    return _collect_chunks(chunks, rename, max_rows, filters)
+
+
+def read_market_data(file, column_mapping=None, **options):
+    """按文件格式选择读取方式（CSV 或列式文件）"""
+    if detect_format(file) == 'csv':
+        return read_market_csv(file, column_mapping, **options)
+    return read_market_columnar(file, column_mapping, **options)
+
+
+def preview_market_file(file, rows=5):
+    """读取文件的前几行（用于显示列名和列映射）"""
+    file_format = detect_format(file)
+    if file_format == 'csv':
+        if hasattr(file, 'seek'):
+            file.seek(0)
+        preview = pd.read_csv(file, nrows=rows)
+    else:
+        dataset = _open_dataset(file, file_format)
+        preview = dataset.head(rows).to_pandas()
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return preview
+
+
+def convert_market_file(source, target, column_mapping=None, file_format=None):
+    """
+    把行情文件一次性转换为列式格式（默认按扩展名选择 Parquet 或 Feather）
+
+    输出为标准列名、紧凑类型、按 (合约, 日期) 排序的数据，
+    Parquet 按合约聚集的行组使合约和日期筛选可以跳过无关行组。返回写入的行数。
+    """
+    df, _ = read_market_data(source, column_mapping, max_rows=0)
+    df = df.sort_values(['contract', 'date'], kind='mergesort').reset_index(drop=True)
+
+    file_format = file_format or detect_format(target)
+    if file_format == 'parquet':
+        df.to_parquet(target, index=False, row_group_size=PERFORMANCE_CONFIG['chunk_size'])
+    elif file_format == 'ipc':
+        df.to_feather(target)
+    else:
+        raise ValueError(f"不支持的输出格式: {target}")
+    return len(df)
@@ -88,7 +88,7 @@ def test_with_user_data():
     print("\n🧪 测试用户数据...")
     
     try:
-        from app import FuturesStrategyAnalyzer
+        from strategy_analyzer import FuturesStrategyAnalyzer
         
         analyzer = FuturesStrategyAnalyzer()
         
@@ -0,0 +1,204 @@
+"""
+特征缓存
+
+以 "数据内容哈希 + 特征配置" 为键，把特征表持久化到磁盘（每列一个 .npy 文件），
+跨会话重复分析同一份数据时直接读取。缓存总大小超过上限时按最近最少使用淘汰，
+超过 PERFORMANCE_CONFIG['cache_ttl'] 秒的条目视为过期。
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from config import PERFORMANCE_CONFIG
+
+# 缓存格式或特征计算逻辑变化时递增，使旧缓存失效
+# 2: 指数平滑直接使用 alpha、成交金额保持 float64、保存带时区日期和全部列类型
+CACHE_FORMAT_VERSION = 2
+
+META_FILE = 'meta.json'
+
+
+def hash_dataframe(df):
+    """计算DataFrame内容哈希（包含列名和类型）"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes))]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def make_cache_key(data, *parts):
+    """由数据哈希和其他参数（需可JSON序列化）生成缓存键"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(CACHE_FORMAT_VERSION).encode('utf-8'))
+    digest.update(hash_dataframe(data).encode('utf-8'))
+    digest.update(json.dumps(parts, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def make_stage_key(*parts):
+    """由参数（需可JSON序列化，通常包含上一阶段的键）生成阶段结果的缓存键"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(CACHE_FORMAT_VERSION).encode('utf-8'))
+    digest.update(json.dumps(parts, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def file_fingerprint(source):
+    """
+    行情文件的指纹
+
+    上传的文件对象按内容计算哈希；文件路径按路径、大小和修改时间（不读取内容），
+    目录（Parquet 数据集、内存映射数据集）按其中各文件的大小和修改时间。
+    """
+    if hasattr(source, 'getvalue'):
+        return hashlib.blake2b(source.getvalue(), digest_size=16).hexdigest()
+    if hasattr(source, 'read'):
+        position = source.tell()
+        source.seek(0)
+        digest = hashlib.blake2b(digest_size=16)
+        for chunk in iter(lambda: source.read(1 << 20), b''):
+            digest.update(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+        source.seek(position)
+        return digest.hexdigest()
+
+    path = os.path.abspath(os.fspath(source))
+    entries = [path]
+    if os.path.isdir(path):
+        entries = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    stats = [(os.path.relpath(entry, path), os.path.getsize(entry), os.path.getmtime(entry)) for entry in entries]
+    return make_stage_key(path, stats)
+
+
+class FeatureCache:
+    """基于目录的特征缓存，每个键对应一个子目录"""
+
+    def __init__(self, cache_dir=None, max_bytes=None, ttl=None):
+        self.cache_dir = cache_dir or PERFORMANCE_CONFIG['feature_cache_dir']
+        self.max_bytes = max_bytes if max_bytes is not None else PERFORMANCE_CONFIG['feature_cache_max_mb'] * 1024 * 1024
+        self.ttl = ttl if ttl is not None else PERFORMANCE_CONFIG['cache_ttl']
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _is_expired(self, meta):
+        return self.ttl is not None and self.ttl > 0 and time.time() - meta['created'] > self.ttl
+
+    def get(self, key):
+        """
+        读取缓存，未命中或已过期时返回 None
+
+        数值列直接以只读内存映射返回（不复制到内存，按需从页缓存读入）；
+        返回的表只能新增或替换列，需要原地修改时先 copy()。
+        """
+        entry = self._entry_dir(key)
+        meta_path = os.path.join(entry, META_FILE)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self._is_expired(meta):
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        try:
+            columns = {}
+            for i, column in enumerate(meta['columns']):
+                path = os.path.join(entry, f'{i}.npy')
+                if column['object']:
+                    columns[column['name']] = np.load(path, allow_pickle=True)
+                else:
+                    # 普通 ndarray 视图，不复制数据
+                    columns[column['name']] = np.asarray(np.load(path, mmap_mode='r'))
+            df = pd.DataFrame(columns, copy=False)
+            # 恢复写入时的列类型（时区、分类、可空整数等），与未命中缓存时计算的结果一致
+            for column in meta['columns']:
+                name = column['name']
+                if column.get('tz'):
+                    df[name] = df[name].dt.tz_localize('UTC').dt.tz_convert(column['tz'])
+                elif str(df[name].dtype) != column['dtype']:
+                    df[name] = df[name].astype(column['dtype'])
+        except (OSError, ValueError, TypeError, KeyError):
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        # 更新访问时间，用于LRU淘汰
+        os.utime(meta_path)
+        return df
+
+    def put(self, key, df):
+        """写入缓存（先写临时目录再原子重命名），随后执行淘汰"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = os.path.join(self.cache_dir, f'.tmp-{uuid.uuid4().hex}')
+        os.makedirs(tmp_dir)
+        try:
+            columns = []
+            for i, name in enumerate(df.columns):
+                series = df[name]
+                column = {'name': name, 'dtype': str(series.dtype)}
+                if isinstance(series.dtype, pd.DatetimeTZDtype):
+                    # 带时区的日期按 UTC 保存为 datetime64（可以内存映射），读取时恢复时区
+                    column['tz'] = str(series.dt.tz)
+                    series = series.dt.tz_convert(None)
+                values = series.to_numpy()
+                column['object'] = bool(values.dtype == object)
+                np.save(os.path.join(tmp_dir, f'{i}.npy'), values, allow_pickle=column['object'])
+                columns.append(column)
+            with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump({'created': time.time(), 'rows': len(df), 'columns': columns}, f, ensure_ascii=False)
+
+            entry = self._entry_dir(key)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp_dir, entry)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self.evict()
+
+    def _entries(self):
+        """列出缓存条目 [(最后访问时间, 大小, 路径)]"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for name in os.listdir(self.cache_dir):
+            entry = os.path.join(self.cache_dir, name)
+            meta_path = os.path.join(entry, META_FILE)
+            if name.startswith('.') or not os.path.isfile(meta_path):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+            entries.append((os.path.getmtime(meta_path), size, entry))
+        return entries
+
+    def evict(self):
+        """删除过期条目，并按最近最少使用淘汰到总大小不超过上限"""
+        entries = sorted(self._entries())
+        kept = []
+        for accessed, size, entry in entries:
+            try:
+                with open(os.path.join(entry, META_FILE), 'r', encoding='utf-8') as f:
+                    expired = self._is_expired(json.load(f))
+            except (OSError, ValueError):
+                expired = True
+            if expired:
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                kept.append((accessed, size, entry))
+
+        total = sum(size for _, size, _ in kept)
+        for accessed, size, entry in kept:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """清空缓存目录"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
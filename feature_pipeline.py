@@ -0,0 +1,197 @@
+"""
+声明式特征流水线
+
+由 FEATURE_CONFIG 构建特征注册表，每个特征声明自己的输入列和计算函数。
+规划器按依赖关系拓扑排序，对计算内容相同的中间结果去重，
+并且只计算模型实际使用的特征及其依赖。
+"""
+
+import numpy as np
+
+from config import FEATURE_CONFIG
+import indicators
+
+# 原始行情列（由 load_data 提供）
+RAW_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'open_interest',
+               'turnover', 'settle', 'pre_settle']
+
+# 依赖可选列的特征，数据中缺少对应列时自动跳过
+OPTIONAL_FEATURES = [
+    'turnover_ratio', 'avg_price', 'settle_change',
+    'close_vs_settle', 'settle_vs_pre_settle'
+]
+
+
+class FeatureSpec:
+    """单个特征的声明：名称、输入、计算函数"""
+
+    def __init__(self, name, inputs, compute, key=None, intermediate=False):
+        self.name = name
+        self.inputs = list(inputs)
+        # compute(index, *输入数组) -> 数组
+        self.compute = compute
+        # 计算内容标识，key 相同的特征只计算一次
+        self.key = key if key is not None else name
+        # 中间结果只参与计算，不输出到特征表
+        self.intermediate = intermediate
+
+    def __repr__(self):
+        return f"FeatureSpec({self.name!r}, inputs={self.inputs!r})"
+
+
+def model_feature_columns(config=None):
+    """模型训练使用的特征列（可选特征放在最后）"""
+    config = config or FEATURE_CONFIG
+    columns = ['price_change', 'high_low_ratio', 'open_close_ratio']
+    columns += [f'price_vs_ma{window}' for window in config['moving_averages']]
+    columns += [
+        'rsi', 'macd', 'macd_signal', 'bb_width', 'volume_ratio',
+        'volatility', 'atr', 'adx', 'cci'
+    ]
+    return columns + OPTIONAL_FEATURES
+
+
+def _ratio(index, numerator, denominator):
+    return numerator / denominator
+
+
+def _relative(index, value, base):
+    return value / base - 1
+
+
+def build_feature_registry(config=None):
+    """根据特征配置构建注册表 {特征名: FeatureSpec}"""
+    config = config or FEATURE_CONFIG
+    specs = []
+
+    def add(name, inputs, compute, key=None, intermediate=False):
+        specs.append(FeatureSpec(name, inputs, compute, key, intermediate))
+
+    def sma(window):
+        return lambda index, values: index.rolling_mean(values, window)
+
+    # 基础价格特征
+    add('price_change', ['close'], lambda index, close: index.pct_change(close))
+    add('high_low_ratio', ['high', 'low'], _ratio)
+    add('open_close_ratio', ['open', 'close'], _ratio)
+
+    # 移动平均线及价格相对位置
+    for window in config['moving_averages']:
+        add(f'ma_{window}', ['close'], sma(window), key=('sma', 'close', window))
+        add(f'price_vs_ma{window}', ['close', f'ma_{window}'], _relative)
+
+    # RSI
+    rsi_period = config['rsi_period']
+    add('rsi', ['close'], lambda index, close: indicators.rsi(index, close, rsi_period))
+
+    # MACD
+    fast, slow, signal = config['macd_fast'], config['macd_slow'], config['macd_signal']
+    for span in (fast, slow):
+        add(f'ema_{span}', ['close'],
+            lambda index, close, span=span: indicators.ema(index, close, span),
+            key=('ema', 'close', span), intermediate=True)
+    add('macd', [f'ema_{fast}', f'ema_{slow}'], lambda index, ema_fast, ema_slow: ema_fast - ema_slow)
+    add('macd_signal', ['macd'], lambda index, macd: indicators.ema(index, macd, signal))
+
+    # 布林带（中轨与同周期均线共享计算）
+    bb_period, bb_std = config['bb_period'], config['bb_std']
+    add('bb_mid', ['close'], sma(bb_period), key=('sma', 'close', bb_period), intermediate=True)
+    add('bb_std', ['close'], lambda index, close: index.rolling_std(close, bb_period, ddof=0),
+        key=('std', 'close', bb_period, 0), intermediate=True)
+    add('bb_upper', ['bb_mid', 'bb_std'], lambda index, mid, std: mid + bb_std * std)
+    add('bb_lower', ['bb_mid', 'bb_std'], lambda index, mid, std: mid - bb_std * std)
+    add('bb_width', ['bb_upper', 'bb_lower'], lambda index, upper, lower: upper - lower)
+
+    # 成交量指标
+    volume_period = config['volume_ma_period']
+    add('volume_ma', ['volume'], sma(volume_period), key=('sma', 'volume', volume_period))
+    add('volume_ratio', ['volume', 'volume_ma'], _ratio)
+
+    # 成交金额指标
+    add('turnover_ma', ['turnover'], sma(volume_period), key=('sma', 'turnover', volume_period))
+    add('turnover_ratio', ['turnover', 'turnover_ma'], _ratio)
+    add('avg_price', ['turnover', 'volume'], _ratio)
+
+    # 结算价指标
+    add('settle_change', ['settle'], lambda index, settle: index.pct_change(settle))
+    add('close_vs_settle', ['close', 'settle'], _relative)
+    add('settle_vs_pre_settle', ['settle', 'pre_settle'], _relative)
+
+    # 波动率指标
+    volatility_period = config['volatility_period']
+    add('volatility', ['close'], lambda index, close: index.rolling_std(close, volatility_period),
+        key=('std', 'close', volatility_period, 1))
+    add('true_range', ['high', 'low', 'close'], indicators.true_range, intermediate=True)
+    atr_period = config['atr_period']
+    add('atr', ['true_range'], lambda index, tr: index.wilder_mean(tr, atr_period))
+
+    # 趋势指标
+    adx_period = config['adx_period']
+    add('adx', ['high', 'low', 'true_range'],
+        lambda index, high, low, tr: indicators.adx(index, high, low, tr, adx_period))
+    cci_period = config['cci_period']
+    add('typical_price', ['high', 'low', 'close'],
+        lambda index, high, low, close: (high + low + close) / 3.0, intermediate=True)
+    add('typical_ma', ['typical_price'], sma(cci_period),
+        key=('sma', 'typical_price', cci_period), intermediate=True)
+    add('cci', ['typical_price', 'typical_ma'],
+        lambda index, typical, typical_ma: indicators.cci(index, typical, typical_ma, cci_period))
+
+    return {spec.name: spec for spec in specs}
+
+
+def plan_features(registry, targets, available_columns):
+    """
+    规划计算顺序
+
+    返回 (按拓扑顺序排列的FeatureSpec列表, 可计算的目标特征列表)。
+    输入列缺失的目标特征会被跳过，依赖存在循环时抛出 ValueError。
+    """
+    available_columns = set(available_columns)
+    order = []
+    resolved = {}
+    visiting = set()
+
+    def visit(name):
+        if name in resolved:
+            return resolved[name]
+        if name in available_columns:
+            resolved[name] = True
+            return True
+        spec = registry.get(name)
+        if spec is None:
+            # 既不是原始列也不是已注册特征（例如数据中没有的可选列）
+            resolved[name] = False
+            return False
+        if name in visiting:
+            raise ValueError(f"特征依赖存在循环: {name}")
+        visiting.add(name)
+        ok = all([visit(dependency) for dependency in spec.inputs])
+        visiting.discard(name)
+        if ok:
+            order.append(spec)
+        resolved[name] = ok
+        return ok
+
+    computable = [name for name in targets if visit(name)]
+    return order, computable
+
+
+def run_plan(plan, columns, index):
+    """
+    按规划执行特征计算
+
+    columns 为原始列 {列名: 数组}；返回输出的特征 {特征名: 数组}，
+    中间结果不输出，key 相同的特征只计算一次。
+    """
+    values = dict(columns)
+    by_key = {}
+    outputs = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for spec in plan:
+            if spec.key not in by_key:
+                by_key[spec.key] = spec.compute(index, *[values[name] for name in spec.inputs])
+            values[spec.name] = by_key[spec.key]
+            if not spec.intermediate:
+                outputs[spec.name] = values[spec.name]
+    return outputs
@@ -0,0 +1,101 @@
+"""
+训练与预测共用的特征变换
+
+FeatureTransform 记录模型训练时的特征列（及其顺序）和拟合好的标准化器，
+训练、回测、批量信号和 predict_strategy 都通过它把特征表转换为模型输入，
+预测时按训练时的列顺序取列，缺少特征列时直接报错，而不是悄悄换用现有的列。
+标准化直接用 NumPy 计算 (X - mean) / scale，与 StandardScaler.transform 结果相同；
+transform_row 对单根K线只取所需的特征值，不构造 DataFrame。
+scikit-learn 在拟合或设置标准化器时才导入，只做数据处理的脚本不需要加载它。
+"""
+
+import numpy as np
+
+
+class FeatureTransform:
+    """特征列 + 标准化器"""
+
+    def __init__(self, feature_columns, scaler=None):
+        self.feature_columns = list(feature_columns)
+        self.scaler = scaler
+        self._mean = None
+        self._scale = None
+        if scaler is not None:
+            self._set_scaler(scaler)
+
+    def _set_scaler(self, scaler):
+        from sklearn.preprocessing import StandardScaler
+
+        self.scaler = scaler
+        n_features = len(self.feature_columns)
+        if getattr(scaler, 'n_features_in_', n_features) != n_features:
+            raise ValueError(f"标准化器的特征数 {scaler.n_features_in_} 与特征列数 {n_features} 不一致")
+        mean = getattr(scaler, 'mean_', None)
+        scale = getattr(scaler, 'scale_', None)
+        if isinstance(scaler, StandardScaler):
+            self._mean = np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64)
+            self._scale = np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+        else:
+            self._mean = self._scale = None
+
+    @property
+    def is_fitted(self):
+        return self.scaler is not None
+
+    def missing_columns(self, columns):
+        """columns 中缺少的特征列"""
+        columns = set(columns)
+        return [col for col in self.feature_columns if col not in columns]
+
+    def _check_columns(self, df):
+        missing = self.missing_columns(df.columns if hasattr(df, 'columns') else df.index)
+        if missing:
+            raise ValueError(f"数据缺少模型的特征列: {', '.join(missing)}")
+
+    def fit(self, df):
+        """在 df 的特征列上拟合标准化器，返回自身"""
+        from sklearn.preprocessing import StandardScaler
+
+        self._check_columns(df)
+        self._set_scaler(StandardScaler().fit(df[self.feature_columns].to_numpy(dtype=np.float64)))
+        return self
+
+    def _scale_values(self, X):
+        if self._mean is None:
+            return self.scaler.transform(X)
+        return (X - self._mean) / self._scale
+
+    def transform(self, df):
+        """把 df 转换为模型输入矩阵（按训练时的特征顺序）"""
+        if not self.is_fitted:
+            raise ValueError("特征变换尚未拟合")
+        self._check_columns(df)
+        return self._scale_values(df[self.feature_columns].to_numpy(dtype=np.float64))
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def transform_row(self, row):
+        """
+        单根K线的快速路径，返回 1 行的模型输入矩阵
+
+        row 可以是 Series、字典（按特征名取值），或已按特征顺序排列的一维数组。
+        """
+        if not self.is_fitted:
+            raise ValueError("特征变换尚未拟合")
+        if isinstance(row, np.ndarray):
+            values = row.astype(np.float64, copy=False).reshape(1, -1)
+            if values.shape[1] != len(self.feature_columns):
+                raise ValueError(f"特征数 {values.shape[1]} 与模型的特征数 {len(self.feature_columns)} 不一致")
+        else:
+            missing = self.missing_columns(row.keys())
+            if missing:
+                raise ValueError(f"数据缺少模型的特征列: {', '.join(missing)}")
+            values = np.fromiter((row[col] for col in self.feature_columns), dtype=np.float64,
+                                 count=len(self.feature_columns)).reshape(1, -1)
+        return self._scale_values(values)
+
+    def transform_last(self, df):
+        """df 最后一行的模型输入矩阵（只读取特征列的最后一个值）"""
+        self._check_columns(df)
+        return self.transform_row({col: df[col].iat[-1] for col in self.feature_columns})
@@ -0,0 +1,333 @@
+"""
+超参数搜索
+
+在 SEARCH_CONFIG['spaces'] 定义的搜索空间中随机采样参数组合，支持三种方式：
+    random      所有组合都用全部训练数据评估
+    halving     逐次减半：先用最近一小段交易日评估全部组合，每轮保留最好的
+                1/reduction_factor，并把训练数据扩大 reduction_factor 倍
+    hyperband   多组起始数据比例不同的逐次减半（Hyperband）
+每个组合用按时间顺序的交叉验证评估（训练与测试之间留出 lookforward_days 个交易日）。
+XGBoost / LightGBM / CatBoost 从训练窗口末尾划出验证集做早停，树的数量由早停决定。
+同一轮的组合在 joblib 进程池中并行评估；每个完成的试验立即追加到磁盘缓存，
+中断后用相同的数据和设置重新搜索时，已完成的试验直接读取。
+"""
+
+import hashlib
+import json
+import math
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+from config import SEARCH_CONFIG
+from feature_cache import make_cache_key
+from model_factory import build_model
+from walk_forward import time_series_folds
+
+SEARCH_METHODS = ['random', 'halving', 'hyperband']
+
+# 支持早停的模型及其树数量参数
+EARLY_STOPPING_PARAMS = {
+    'xgboost': 'n_estimators',
+    'lightgbm': 'n_estimators',
+    'catboost': 'iterations'
+}
+
+
+def sample_params(space, rng):
+    """从搜索空间中随机采样一组参数（值均可JSON序列化）"""
+    params = {}
+    for name, spec in space.items():
+        kind = spec[0]
+        if kind == 'int':
+            params[name] = int(rng.integers(spec[1], spec[2] + 1))
+        elif kind == 'float':
+            params[name] = float(rng.uniform(spec[1], spec[2]))
+        elif kind == 'log':
+            params[name] = float(np.exp(rng.uniform(np.log(spec[1]), np.log(spec[2]))))
+        elif kind == 'choice':
+            params[name] = spec[1][int(rng.integers(len(spec[1])))]
+        else:
+            raise ValueError(f"不支持的搜索空间类型: {kind}")
+    return params
+
+
+def max_bracket(min_fraction, reduction_factor):
+    """逐次减半的最大轮次：数据比例从 reduction_factor**-s 扩大到 1"""
+    return max(0, int(math.floor(math.log(1 / min_fraction) / math.log(reduction_factor) + 1e-9)))
+
+
+def search_brackets(method, n_trials, min_fraction, reduction_factor):
+    """
+    各组逐次减半的 [(s, 组合数)]
+
+    第 s 组从 reduction_factor**-s 的数据比例开始，共 s+1 轮。
+    Hyperband 各组的组合数按经典比例分配，总数约为 n_trials。
+    """
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"不支持的搜索方式: {method}")
+    s_max = max_bracket(min_fraction, reduction_factor)
+    if method == 'random':
+        return [(0, n_trials)]
+    if method == 'halving':
+        return [(s_max, n_trials)]
+
+    weights = [(s_max + 1) / (s + 1) * reduction_factor ** s for s in range(s_max, -1, -1)]
+    scale = n_trials / sum(weights)
+    return [(s, max(1, int(round(weight * scale)))) for s, weight in zip(range(s_max, -1, -1), weights)]
+
+
+def rung_schedule(s, n_configs, reduction_factor):
+    """一组逐次减半的各轮 [(保留组合数, 数据比例)]"""
+    return [(max(1, n_configs // reduction_factor ** i), float(reduction_factor ** -(s - i)))
+            for i in range(s + 1)]
+
+
+def trial_key(params, fraction):
+    """试验的缓存键"""
+    text = json.dumps([params, round(fraction, 6)], sort_keys=True, default=str)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=12).hexdigest()
+
+
+class TrialCache:
+    """已完成试验的缓存，每次搜索一个 JSON lines 文件，每行一个试验"""
+
+    def __init__(self, path):
+        self.path = path
+        self.results = {}
+        if path and os.path.isfile(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.read().split('\n')
+            # 中断时最后一行可能只写了一半，丢弃后再继续追加
+            if lines[-1]:
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.writelines(line + '\n' for line in lines[:-1])
+            for line in lines[:-1]:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self.results[record['key']] = record
+
+    def get(self, key):
+        return self.results.get(key)
+
+    def put(self, record):
+        self.results[record['key']] = record
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, default=str) + '\n')
+
+
+def _recent_rows(rows, day, fraction):
+    """只保留 rows 中最近 fraction 比例的交易日"""
+    if fraction >= 1:
+        return rows
+    first, last = day[rows].min(), day[rows].max()
+    n_days = max(1, int(math.ceil((last - first + 1) * fraction)))
+    return rows[day[rows] > last - n_days]
+
+
+def _fit(model_type, estimator, X_fit, y_fit, X_val, y_val, early_stopping_rounds):
+    """训练模型，有验证集时使用早停，返回最佳迭代次数（无早停时为 None）"""
+    if X_val is None:
+        estimator.fit(X_fit, y_fit)
+        return None
+
+    if model_type == 'xgboost':
+        estimator.set_params(estimator__early_stopping_rounds=early_stopping_rounds)
+        estimator.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+        return int(estimator.estimator_.best_iteration)
+    elif model_type == 'lightgbm':
+        import lightgbm as lgb
+        with warnings.catch_warnings():
+            # 新版本 LightGBM 建议改用 eval_X/eval_y，requirements 中的版本只支持 eval_set
+            warnings.simplefilter('ignore')
+            estimator.fit(X_fit, y_fit, eval_set=[(X_val, y_val)],
+                          callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)])
+        return int(estimator.best_iteration_)
+    elif model_type == 'catboost':
+        estimator.fit(X_fit, y_fit, eval_set=(X_val, y_val), early_stopping_rounds=early_stopping_rounds)
+        return int(estimator.get_best_iteration())
+    raise ValueError(f"{model_type} 不支持早停")
+
+
+def evaluate_params(model_type, params, fraction, threads, X, y, day, folds, gap=0,
+                    early_stopping_rounds=None, validation_size=0.2):
+    """
+    用按时间顺序的交叉验证评估一组参数
+
+    每折只使用训练窗口中最近 fraction 比例的交易日；支持早停的模型再从其中
+    划出最后 validation_size 比例的交易日作为验证集（与训练部分之间同样留出 gap）。
+    返回指标字典，失败时 error 给出原因。
+    """
+    start = time.perf_counter()
+    try:
+        accuracies, f1_scores, best_iterations = [], [], []
+        with threadpool_limits(limits=threads):
+            for train_idx, test_idx in folds:
+                train_idx = _recent_rows(train_idx, day, fraction)
+                fit_idx, val_idx = train_idx, None
+                if early_stopping_rounds and model_type in EARLY_STOPPING_PARAMS:
+                    train_days = day[train_idx]
+                    n_val = max(1, int(round((train_days.max() - train_days.min() + 1) * validation_size)))
+                    val_start = train_days.max() - n_val + 1
+                    candidate = train_idx[train_days < val_start - gap]
+                    if len(candidate):
+                        fit_idx, val_idx = candidate, train_idx[train_days >= val_start]
+                        # 验证集中训练部分没有出现的类别无法计算损失
+                        val_idx = val_idx[np.isin(y[val_idx], np.unique(y[fit_idx]))]
+                        if not len(val_idx):
+                            fit_idx, val_idx = train_idx, None
+
+                scaler = StandardScaler()
+                X_fit = scaler.fit_transform(X[fit_idx])
+                X_val = scaler.transform(X[val_idx]) if val_idx is not None else None
+                y_val = y[val_idx] if val_idx is not None else None
+
+                estimator = build_model(model_type, n_jobs=threads, params=params)
+                best_iteration = _fit(model_type, estimator, X_fit, y[fit_idx], X_val, y_val,
+                                      early_stopping_rounds)
+                if best_iteration is not None:
+                    best_iterations.append(best_iteration)
+
+                y_pred = np.asarray(estimator.predict(scaler.transform(X[test_idx]))).ravel()
+                accuracies.append(accuracy_score(y[test_idx], y_pred))
+                f1_scores.append(f1_score(y[test_idx], y_pred, average='macro', zero_division=0))
+
+        return {
+            'score': float(np.mean(accuracies)),
+            'score_std': float(np.std(accuracies)),
+            'f1_macro': float(np.mean(f1_scores)),
+            'best_iteration': int(np.median(best_iterations)) if best_iterations else None,
+            'fit_time': time.perf_counter() - start,
+            'error': None
+        }
+    except Exception as e:
+        return {'score': None, 'score_std': None, 'f1_macro': None, 'best_iteration': None,
+                'fit_time': time.perf_counter() - start, 'error': str(e)}
+
+
+def _run_trial(key, model_type, params, fraction, threads, X, y, day, folds, gap,
+               early_stopping_rounds, validation_size):
+    metrics = evaluate_params(model_type, params, fraction, threads, X, y, day, folds, gap,
+                              early_stopping_rounds, validation_size)
+    return {'key': key, 'params': params, 'fraction': fraction, **metrics}
+
+
+def _score(record):
+    return record['score'] if record['score'] is not None else -np.inf
+
+
+def search_hyperparameters(df, feature_columns, model_type, method=None, n_trials=None,
+                           n_splits=None, gap=0, n_jobs=-1, random_state=None, cache_dir=None,
+                           target_column='target', progress=None):
+    """
+    搜索 model_type 的超参数
+
+    未给出的设置取自 SEARCH_CONFIG；cache_dir=False 时不使用磁盘缓存。
+    progress 为可选回调 progress(已完成试验数, 总试验数)。
+    返回 (试验DataFrame, 最佳参数)：最佳参数为全部数据比例下交叉验证准确率最高的组合，
+    支持早停的模型把树的数量设为早停得到的最佳迭代次数。
+    """
+    config = SEARCH_CONFIG
+    method = method or config['method']
+    n_trials = n_trials or config['n_trials']
+    n_splits = n_splits or config['n_splits']
+    random_state = config['random_state'] if random_state is None else random_state
+    reduction_factor = config['reduction_factor']
+    early_stopping_rounds = config['early_stopping_rounds']
+    validation_size = config['validation_size']
+    if model_type not in config['spaces']:
+        raise ValueError(f"没有 {model_type} 的搜索空间")
+    space = config['spaces'][model_type]
+
+    X = df[feature_columns].to_numpy(dtype=np.float64)
+    y = df[target_column].to_numpy()
+    dates = df['date'].to_numpy()
+    _, day = np.unique(dates, return_inverse=True)
+    folds = time_series_folds(dates, n_splits, gap=gap)
+
+    # 缓存文件由数据内容和所有影响结果的设置决定
+    cache_path = None
+    if cache_dir is not False:
+        search_key = make_cache_key(
+            df[['date', *feature_columns, target_column]], model_type, feature_columns,
+            n_splits, gap, early_stopping_rounds, validation_size
+        )
+        cache_path = os.path.join(cache_dir or config['cache_dir'], f'{search_key}.jsonl')
+    cache = TrialCache(cache_path)
+
+    brackets = search_brackets(method, n_trials, config['min_fraction'], reduction_factor)
+    total = sum(n for s, n_configs in brackets for n, _ in rung_schedule(s, n_configs, reduction_factor))
+    rng = np.random.default_rng(random_state)
+    cpu_count = os.cpu_count() or 1
+    rows = []
+    done = 0
+
+    for s, n_configs in brackets:
+        # 采样顺序固定，重新搜索时得到相同的组合，从而命中缓存
+        configs = [(f'{s}-{i}', sample_params(space, rng)) for i in range(n_configs)]
+        for rung, (n_keep, fraction) in enumerate(rung_schedule(s, n_configs, reduction_factor)):
+            records = {}
+            pending = []
+            for trial, params in configs:
+                key = trial_key(params, fraction)
+                cached = cache.get(key)
+                if cached is not None:
+                    records[trial] = (cached, True)
+                    done += 1
+                else:
+                    pending.append((trial, key, params))
+
+            if pending:
+                workers = min(len(pending), cpu_count if n_jobs in (None, -1) else n_jobs)
+                threads = max(1, cpu_count // workers)
+                results = Parallel(n_jobs=workers, return_as='generator')(
+                    delayed(_run_trial)(key, model_type, params, fraction, threads, X, y, day, folds,
+                                        gap, early_stopping_rounds, validation_size)
+                    for _, key, params in pending
+                )
+                for (trial, _, _), record in zip(pending, results):
+                    cache.put(record)
+                    records[trial] = (record, False)
+                    done += 1
+                    if progress is not None:
+                        progress(done, total)
+
+            for trial, params in configs:
+                record, cached = records[trial]
+                rows.append({'trial': trial, 'bracket': s, 'rung': rung, 'fraction': fraction,
+                             'score': record['score'], 'score_std': record['score_std'],
+                             'f1_macro': record['f1_macro'], 'best_iteration': record['best_iteration'],
+                             'fit_time': record['fit_time'], 'cached': cached, 'error': record['error'],
+                             'params': json.dumps(params, default=str)})
+
+            # 保留得分最高的组合进入下一轮
+            if rung < s:
+                ranked = sorted(configs, key=lambda item: _score(records[item[0]][0]), reverse=True)
+                next_keep = rung_schedule(s, n_configs, reduction_factor)[rung + 1][0]
+                configs = ranked[:next_keep]
+            if progress is not None:
+                progress(done, total)
+
+    trials = pd.DataFrame(rows)
+    final = trials[(trials['fraction'] >= 1) & trials['score'].notna()]
+    if final.empty:
+        errors = trials['error'].dropna()
+        raise RuntimeError(f"所有试验均失败: {errors.iloc[0] if len(errors) else '未知错误'}")
+
+    best = final.loc[final['score'].idxmax()]
+    best_params = json.loads(best['params'])
+    if model_type in EARLY_STOPPING_PARAMS and pd.notna(best['best_iteration']):
+        best_params[EARLY_STOPPING_PARAMS[model_type]] = int(best['best_iteration']) + 1
+    trials = trials.sort_values(['fraction', 'score'], ascending=False, na_position='last')
+    return trials.reset_index(drop=True), best_params
@@ -0,0 +1,333 @@
+"""
+增量特征计算
+
+为每个合约保存最近若干行原始数据（滚动窗口缓冲）和每次指数平滑结束时的状态
+（MACD/RSI/ATR/ADX 使用的EMA与Wilder平滑），追加新交易日时只在
+"缓冲 + 新行" 上计算，计算量与历史长度无关，结果与全量重算一致。
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import FEATURE_CONFIG
+from indicators import SegmentIndex
+from feature_engine import compute_feature_frame, sort_by_contract
+from feature_pipeline import (
+    RAW_COLUMNS, build_feature_registry, model_feature_columns, plan_features, run_plan
+)
+
+
+def required_history(config=None):
+    """增量计算需要为每个合约保留的原始行数（覆盖两层窗口嵌套）"""
+    config = config or FEATURE_CONFIG
+    windows = list(config['moving_averages']) + [
+        config[key] for key in (
+            'rsi_period', 'macd_slow', 'macd_signal', 'bb_period', 'atr_period',
+            'adx_period', 'cci_period', 'volume_ma_period', 'volatility_period'
+        )
+    ]
+    return 2 * max(windows)
+
+
+class _ResumedSegmentIndex(SegmentIndex):
+    """从保存的状态续算的分段索引：缓冲行直接使用保存的输出，只递推新行"""
+
+    def __init__(self, keys, offsets, buffered, states, tail_length):
+        super().__init__(keys, ewm_log=[], tail_length=tail_length)
+        # 组内序号换算为合约的真实序号，保证预热期判断与全量计算一致
+        self.position = self.position + np.repeat(offsets, self.lengths)
+        self.buffered = buffered
+        self._states = states
+        self._calls = 0
+
+    def ewm_mean(self, values, alpha, min_periods=0):
+        values = np.asarray(values, dtype=np.float64)
+        state = self._states[self._calls]
+        self._calls += 1
+
+        # 新合约没有历史状态
+        lookup = pd.Index(state['keys']).get_indexer(self.segment_keys)
+        known = lookup >= 0
+        weighted = np.where(known, state['weighted'][lookup], np.nan)
+        old_wt = np.where(known, state['old_wt'][lookup], 1.0)
+        nobs = np.where(known, state['nobs'][lookup], 0).astype(np.int64)
+        saved_tail = np.where(known[:, None], state['tail'][lookup], np.nan)
+
+        # 缓冲行：直接使用上次计算保存的输出（右对齐）
+        out = np.full(self.size, np.nan)
+        width = saved_tail.shape[1]
+        for segment in np.flatnonzero(self.buffered):
+            count = self.buffered[segment]
+            start = self.starts[segment]
+            out[start:start + count] = saved_tail[segment, width - count:]
+
+        # 新行：按 pandas ewm(adjust=False) 的递推规则逐步推进，各合约同时计算
+        decay = 1.0 - alpha
+        minp = max(min_periods, 1)
+        new_counts = self.lengths - self.buffered
+        for step in range(int(new_counts.max()) if self.size else 0):
+            active = np.flatnonzero(new_counts > step)
+            rows = self.starts[active] + self.buffered[active] + step
+            cur = values[rows]
+            observed = ~np.isnan(cur)
+            nobs[active] += observed
+
+            w = weighted[active]
+            ow = old_wt[active]
+            started = ~np.isnan(w)
+            ow = np.where(started, ow * decay, ow)
+            update = started & observed & (w != cur)
+            blended = (ow * w + alpha * cur) / (ow + alpha)
+            w = np.where(update, blended, w)
+            ow = np.where(started & observed, 1.0, ow)
+            w = np.where(~started & observed, cur, w)
+
+            weighted[active] = w
+            old_wt[active] = ow
+            out[rows] = np.where(nobs[active] >= minp, w, np.nan)
+
+        self.ewm_log.append({
+            'keys': self.segment_keys,
+            'weighted': weighted,
+            'old_wt': old_wt,
+            'nobs': nobs,
+            'tail': self.tails(out, self.tail_length),
+        })
+        return out
+
+
+def _merge_states(old_states, new_states):
+    """用本次更新的合约状态覆盖旧状态，保留未更新合约的状态"""
+    merged = []
+    for old, new in zip(old_states, new_states):
+        keep = ~pd.Index(old['keys']).isin(new['keys'])
+        merged.append({
+            name: np.concatenate([old[name][keep], new[name]]) for name in old
+        })
+    return merged
+
+
+class IncrementalFeatureState:
+    """按合约保存滚动状态，支持追加新交易日后增量计算特征"""
+
+    def __init__(self, config=None, columns=None):
+        self.config = config or FEATURE_CONFIG
+        self.columns = columns if columns is not None else model_feature_columns(self.config)
+        self.tail_length = required_history(self.config)
+        self.buffer = None
+        self.row_counts = None
+        self.ewm_states = None
+
+    def _raw_columns(self, df):
+        return ['date', 'contract'] + [col for col in RAW_COLUMNS if col in df.columns]
+
+    def _save_buffer(self, df):
+        """保存每个合约最近 tail_length 行原始数据"""
+        return df.groupby('contract', sort=False).tail(self.tail_length)[self._raw_columns(df)]
+
+    def initialize(self, data):
+        """全量计算特征并记录状态，返回按 (合约, 日期) 排序的特征表"""
+        df = sort_by_contract(data)
+        ewm_log = []
+        index = SegmentIndex(df['contract'].to_numpy(), ewm_log=ewm_log, tail_length=self.tail_length)
+        features = compute_feature_frame(df, index, self.columns, self.config)
+
+        self.buffer = self._save_buffer(df).reset_index(drop=True)
+        self.row_counts = pd.Series(index.lengths, index=index.segment_keys)
+        self.ewm_states = ewm_log
+        return features
+
+    def update(self, new_rows):
+        """
+        追加新数据并只计算新行的特征
+
+        new_rows 的日期必须晚于对应合约已有的最后日期；返回新行的特征表。
+        """
+        if self.ewm_states is None:
+            raise ValueError("增量状态尚未初始化")
+
+        new = sort_by_contract(new_rows)
+        last_dates = self.buffer.groupby('contract', sort=False)['date'].max()
+        previous = new['contract'].map(last_dates)
+        if (previous.notna() & (new['date'] <= previous)).any():
+            raise ValueError("新数据的日期必须晚于该合约已有的最后日期")
+
+        contracts = new['contract'].unique()
+        history = self.buffer[self.buffer['contract'].isin(contracts)]
+        combined = sort_by_contract(pd.concat(
+            [history.assign(_is_new=False), new.assign(_is_new=True)], ignore_index=True
+        ))
+
+        keys = combined['contract'].to_numpy()
+        segment_keys = keys[SegmentIndex(keys).starts]
+        buffered = history.groupby('contract', sort=False).size().reindex(segment_keys, fill_value=0).to_numpy()
+        seen = self.row_counts.reindex(segment_keys, fill_value=0).to_numpy()
+        index = _ResumedSegmentIndex(keys, seen - buffered, buffered, self.ewm_states, self.tail_length)
+
+        raw = combined.drop(columns='_is_new')
+        features = compute_feature_frame(raw, index, self.columns, self.config)
+        feature_columns = [col for col in features.columns if col not in raw.columns]
+        new_features = features.loc[combined['_is_new'].to_numpy(), feature_columns].reset_index(drop=True)
+        result = pd.concat([new.drop(columns=feature_columns, errors='ignore'), new_features], axis=1)
+
+        # 更新缓冲、行数和平滑状态
+        untouched = self.buffer[~self.buffer['contract'].isin(contracts)]
+        updated = self._save_buffer(raw)
+        self.buffer = pd.concat([untouched, updated], ignore_index=True)
+        added = new.groupby('contract', sort=False).size()
+        self.row_counts = self.row_counts.add(added, fill_value=0).astype(np.int64)
+        self.ewm_states = _merge_states(self.ewm_states, index.ewm_log)
+        return result
+
+
+class _BarIndex(SegmentIndex):
+    """
+    单个合约 "缓冲 + 1 根新K线" 的分段索引，只计算最后一行
+
+    缓冲行的平滑输出取自保存的状态；滚动窗口只计算最后一个窗口（其余行为NaN，
+    特征规划中滚动结果只按行组合或作为平滑的输入，最后一行的值与全量计算相同）。
+    """
+
+    def __init__(self, length, offset, states, tail_length):
+        # 只有一个分段，直接设置 SegmentIndex 的属性
+        self.starts = np.zeros(1, dtype=np.int64)
+        self.lengths = np.array([length])
+        self.ids = np.zeros(length, dtype=np.int64)
+        self.position = np.arange(offset, offset + length)
+        self.size = length
+        self.segment_keys = self.ids[:1]
+        self.ewm_log = []
+        self.tail_length = tail_length
+        self._states = states
+        self._calls = 0
+
+    def _rolling(self, values, window, reducer):
+        out = np.full(self.size, np.nan)
+        if self.size >= window and self.position[-1] >= window - 1:
+            out[-1] = reducer(np.asarray(values, dtype=np.float64)[None, -window:])[0]
+        return out
+
+    def wilder_mean(self, values, window):
+        # 平滑已开始（之前的行已有观测）时新行直接使用原值，否则新行是否为首个完整窗口由滚动均值决定
+        if self._states[self._calls][2] > 0:
+            return self.ewm_mean(values, 1.0 / window)
+        seeded = np.full(self.size, np.nan)
+        seeded[-1] = self.rolling_mean(values, window)[-1]
+        return self.ewm_mean(seeded, 1.0 / window)
+
+    def ewm_mean(self, values, alpha, min_periods=0):
+        weighted, old_wt, nobs, tail = self._states[self._calls]
+        self._calls += 1
+
+        out = np.empty(self.size)
+        out[:-1] = tail[len(tail) - self.size + 1:]
+        cur = float(values[-1])
+        # 与 _ResumedSegmentIndex 相同的 pandas ewm(adjust=False) 递推，标量计算
+        observed = cur == cur
+        nobs += observed
+        if weighted == weighted:
+            old_wt *= 1.0 - alpha
+            if observed:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif observed:
+            weighted = cur
+        out[-1] = weighted if nobs >= max(min_periods, 1) else np.nan
+
+        if self.size > len(tail):
+            tail = out[1:]
+        else:
+            tail = np.concatenate((tail[1:], out[-1:]))
+        self.ewm_log.append((weighted, old_wt, nobs, tail))
+        return out
+
+
+class StreamingFeatureState:
+    """
+    逐根K线的特征状态（实时打分使用）
+
+    每个合约保存最近 tail_length 行原始数据的NumPy数组和各指数平滑的标量状态，
+    新K线只在本合约 "缓冲 + 1 行" 上执行与批量计算相同的特征规划，
+    不经过 DataFrame 的排序、拼接和分组，结果与全量重算一致。
+    """
+
+    def __init__(self, raw_columns, config=None, columns=None):
+        self.config = config or FEATURE_CONFIG
+        self.columns = columns if columns is not None else model_feature_columns(self.config)
+        self.tail_length = required_history(self.config)
+        self.raw_columns = list(raw_columns)
+        plan, self.computable = plan_features(build_feature_registry(self.config), self.columns, self.raw_columns)
+        self.plan = plan
+        # 合约 -> {'raw': 原始列×最近行的二维数组, 'last_date', 'rows', 'ewm': [(weighted, old_wt, nobs, tail)]}
+        self.contracts = {}
+        # 特征规划中指数平滑的次数（每次对应一个保存的状态）
+        counter = SegmentIndex(np.zeros(1, dtype=np.int8), ewm_log=[])
+        run_plan(plan, {col: np.ones(1) for col in self.raw_columns}, counter)
+        self._n_ewm = len(counter.ewm_log)
+
+    @classmethod
+    def from_state(cls, state):
+        """由已初始化的 IncrementalFeatureState 转换"""
+        if state.ewm_states is None:
+            raise ValueError("增量状态尚未初始化")
+        raw_columns = [col for col in state._raw_columns(state.buffer) if col not in ('date', 'contract')]
+        stream = cls(raw_columns, state.config, state.columns)
+        if stream._n_ewm != len(state.ewm_states):
+            raise ValueError("增量状态与特征规划不一致")
+
+        positions = [pd.Index(ewm['keys']).get_indexer(state.row_counts.index) for ewm in state.ewm_states]
+        groups = state.buffer.groupby('contract', sort=False).indices
+        values = state.buffer[raw_columns].to_numpy(dtype=np.float64).T
+        dates = state.buffer['date'].to_numpy()
+        for i, (contract, rows) in enumerate(state.row_counts.items()):
+            buffer_rows = groups[contract]
+            stream.contracts[contract] = {
+                'raw': np.ascontiguousarray(values[:, buffer_rows]),
+                'last_date': pd.Timestamp(dates[buffer_rows[-1]]),
+                'rows': int(rows),
+                'ewm': [(float(ewm['weighted'][p[i]]), float(ewm['old_wt'][p[i]]), int(ewm['nobs'][p[i]]),
+                         ewm['tail'][p[i]]) for ewm, p in zip(state.ewm_states, positions)]
+            }
+        return stream
+
+    def _new_contract(self):
+        empty = np.full(self.tail_length, np.nan)
+        return {
+            'raw': np.empty((len(self.raw_columns), 0)),
+            'last_date': None,
+            'rows': 0,
+            'ewm': [(np.nan, 1.0, 0, empty)] * self._n_ewm
+        }
+
+    def update_bar(self, contract, date, bar):
+        """
+        追加合约的一根新K线，返回 {特征名: 值}
+
+        bar 为原始列（open、high、low、close、volume、open_interest 等）到数值的映射，
+        日期必须晚于该合约已有的最后日期。
+        """
+        date = pd.Timestamp(date)
+        state = self.contracts.get(contract)
+        if state is None:
+            state = self._new_contract()
+        elif date <= state['last_date']:
+            raise ValueError("新数据的日期必须晚于该合约已有的最后日期")
+        missing = [col for col in self.raw_columns if col not in bar]
+        if missing:
+            raise ValueError(f"K线缺少列: {', '.join(missing)}")
+
+        buffered = state['raw'].shape[1]
+        block = np.empty((len(self.raw_columns), buffered + 1))
+        block[:, :-1] = state['raw']
+        block[:, -1] = [bar[col] for col in self.raw_columns]
+        index = _BarIndex(buffered + 1, state['rows'] - buffered, state['ewm'], self.tail_length)
+        features = run_plan(self.plan, dict(zip(self.raw_columns, block)), index)
+
+        self.contracts[contract] = {
+            'raw': block[:, -self.tail_length:],
+            'last_date': date,
+            'rows': state['rows'] + 1,
+            'ewm': index.ewm_log
+        }
+        return {name: float(values[-1]) for name, values in features.items()}
@@ -0,0 +1,304 @@
+"""
+技术指标内核库
+
+基于NumPy的分段感知指标内核（EMA、SMA、滚动标准差、真实波幅、RSI、MACD、
+布林带、ATR、ADX、CCI）。IndicatorKernel 对同一组OHLC数据缓存中间结果：
+真实波幅只计算一次，每个周期的EMA/SMA各计算一次，多个指标共享这些数组。
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import FEATURE_CONFIG
+
+# 滚动窗口每次处理的行数（限制临时数组的内存占用）
+ROLLING_CHUNK_ROWS = 1 << 16
+
+
+class SegmentIndex:
+    """连续分段索引：每个合约对应一段连续的行"""
+
+    def __init__(self, keys, ewm_log=None, tail_length=0):
+        keys = np.asarray(keys)
+        n = len(keys)
+        if n:
+            boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+            self.starts = np.concatenate(([0], boundaries)).astype(np.int64)
+        else:
+            self.starts = np.array([], dtype=np.int64)
+        self.lengths = np.diff(np.append(self.starts, n))
+        # 每行所属分段编号，以及在分段内的序号
+        self.ids = np.repeat(np.arange(len(self.starts)), self.lengths)
+        self.position = np.arange(n) - np.repeat(self.starts, self.lengths)
+        self.size = n
+        self.segment_keys = keys[self.starts]
+        # 非None时记录每次指数平滑结束时各分段的状态，供增量更新续算
+        self.ewm_log = ewm_log
+        self.tail_length = tail_length
+
+    @classmethod
+    def single(cls, size):
+        """整段数据视为同一个合约"""
+        return cls(np.zeros(size, dtype=np.int8))
+
+    def shift(self, values, periods=1):
+        """分段内向后平移，分段开头填充NaN"""
+        values = np.asarray(values, dtype=np.float64)
+        out = np.full(self.size, np.nan)
+        if periods < self.size:
+            out[periods:] = values[:self.size - periods]
+        out[self.position < periods] = np.nan
+        return out
+
+    def diff(self, values, periods=1):
+        """分段内差分"""
+        return np.asarray(values, dtype=np.float64) - self.shift(values, periods)
+
+    def pct_change(self, values, periods=1):
+        """分段内变动率"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.asarray(values, dtype=np.float64) / self.shift(values, periods) - 1
+
+    def _rolling(self, values, window, reducer):
+        """在滑动窗口视图上分块归约，跨越分段边界的窗口置为NaN"""
+        values = np.asarray(values, dtype=np.float64)
+        out = np.full(self.size, np.nan)
+        if window <= self.size:
+            view = sliding_window_view(values, window)
+            for start in range(0, len(view), ROLLING_CHUNK_ROWS):
+                block = view[start:start + ROLLING_CHUNK_ROWS]
+                out[start + window - 1:start + window - 1 + len(block)] = reducer(block)
+        out[self.position < window - 1] = np.nan
+        return out
+
+    def rolling_mean(self, values, window):
+        """分段内滚动均值"""
+        return self._rolling(values, window, lambda block: block.mean(axis=1))
+
+    def rolling_std(self, values, window, ddof=1):
+        """分段内滚动标准差"""
+        return self._rolling(values, window, lambda block: block.std(axis=1, ddof=ddof))
+
+    def rolling_mad(self, values, window):
+        """分段内滚动平均绝对偏差"""
+        def _mad(block):
+            return np.abs(block - block.mean(axis=1, keepdims=True)).mean(axis=1)
+        return self._rolling(values, window, _mad)
+
+    def ewm_mean(self, values, alpha, min_periods=0):
+        """分段内指数加权均值（adjust=False，跳过分段开头的NaN）"""
+        values = np.asarray(values, dtype=np.float64)
+        result = pd.Series(values).groupby(self.ids, sort=False).ewm(
+            alpha=alpha, adjust=False
+        ).mean()
+        weighted = np.empty(self.size)
+        weighted[result.index.get_level_values(-1)] = result.to_numpy()
+
+        # 按分段内累计观测数应用 min_periods
+        valid = ~np.isnan(values)
+        nobs = self.cumsum(valid)
+        out = np.where(nobs >= max(min_periods, 1), weighted, np.nan)
+
+        if self.ewm_log is not None and self.size:
+            self.ewm_log.append(self._ewm_state(weighted, valid, nobs, alpha, out))
+        return out
+
+    def cumsum(self, values):
+        """分段内累计和"""
+        total = np.cumsum(values)
+        if not self.size:
+            return total
+        before = total[self.starts] - np.asarray(values)[self.starts]
+        return total - np.repeat(before, self.lengths)
+
+    def tails(self, values, length):
+        """各分段最后 length 个值，右对齐，不足部分填充NaN"""
+        ends = self.starts + self.lengths
+        rows = ends[:, None] - length + np.arange(length)
+        inside = rows >= self.starts[:, None]
+        return np.where(inside, np.asarray(values, dtype=np.float64)[np.clip(rows, 0, None)], np.nan)
+
+    def _ewm_state(self, weighted, valid, nobs, alpha, out):
+        """指数平滑在各分段末尾的状态"""
+        ends = self.starts + self.lengths - 1
+        rows = np.arange(self.size)
+        last_valid = np.maximum.reduceat(np.where(valid, rows, -1), self.starts)
+        # 末尾连续缺失值使旧权重按 (1 - alpha) 衰减
+        decay = 1.0 - alpha
+        old_wt = np.where(last_valid >= self.starts, decay ** (ends - last_valid), 1.0)
+        return {
+            'keys': self.segment_keys,
+            'weighted': weighted[ends],
+            'old_wt': old_wt,
+            'nobs': nobs[ends],
+            'tail': self.tails(out, self.tail_length),
+        }
+
+    def wilder_mean(self, values, window):
+        """Wilder平滑：以首个完整窗口的均值为初值，之后按 1/window 递推"""
+        values = np.asarray(values, dtype=np.float64)
+        seed = self.rolling_mean(values, window)
+        valid = ~np.isnan(seed)
+        # 每个分段第一个完整窗口的位置
+        rows = np.arange(self.size)
+        candidates = np.where(valid, rows, self.size)
+        first = np.minimum.reduceat(candidates, self.starts) if self.size else candidates
+        first_row = np.repeat(first, self.lengths)
+        seeded = values.copy()
+        seeded[rows < first_row] = np.nan
+        at_seed = rows == first_row
+        seeded[at_seed] = seed[at_seed]
+        return self.ewm_mean(seeded, 1.0 / window)
+
+
+def ema(index, values, span):
+    """指数移动平均（span 周期，预热期为NaN）"""
+    return index.ewm_mean(values, 2.0 / (span + 1), min_periods=span)
+
+
+def true_range(index, high, low, close):
+    """真实波幅，分段首行退化为 high - low"""
+    prev_close = index.shift(close)
+    ranges = np.vstack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    return np.nanmax(ranges, axis=0)
+
+
+def rsi(index, close, window=14):
+    """相对强弱指标"""
+    diff = index.diff(close)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    ema_up = index.ewm_mean(up, 1.0 / window, min_periods=window)
+    ema_down = index.ewm_mean(down, 1.0 / window, min_periods=window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ema_down == 0, 100.0, 100 - 100 / (1 + ema_up / ema_down))
+
+
+def adx(index, high, low, true_range_values, window=14):
+    """平均趋向指标（Wilder定义）"""
+    up_move = index.diff(high)
+    down_move = -index.diff(low)
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    # 分段首行没有前值，方向运动无定义
+    first = index.position == 0
+    plus_dm[first] = np.nan
+    minus_dm[first] = np.nan
+    tr = np.where(first, np.nan, true_range_values)
+
+    smoothed_tr = index.wilder_mean(tr, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100 * index.wilder_mean(plus_dm, window) / smoothed_tr
+        minus_di = 100 * index.wilder_mean(minus_dm, window) / smoothed_tr
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum == 0, 0.0, 100 * np.abs(plus_di - minus_di) / di_sum)
+    dx[np.isnan(di_sum)] = np.nan
+    return index.wilder_mean(dx, window)
+
+
+def cci(index, typical, typical_ma, window=20, constant=0.015):
+    """顺势指标"""
+    mad = index.rolling_mad(typical, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (typical - typical_ma) / (constant * mad)
+
+
+class IndicatorKernel:
+    """共享中间结果的指标内核，所有输出按需计算并缓存"""
+
+    def __init__(self, high, low, close, index=None):
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.index = index if index is not None else SegmentIndex.single(len(self.close))
+        self._cache = {}
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _series(self, source):
+        """按名称取得输入序列（收盘价或典型价格）"""
+        if source == 'close':
+            return self.close
+        if source == 'typical':
+            return self.typical_price()
+        raise KeyError(source)
+
+    def typical_price(self):
+        return self._cached('typical', lambda: (self.high + self.low + self.close) / 3.0)
+
+    def ema(self, span, source='close'):
+        """指数移动平均（span 周期，预热期为NaN）"""
+        return self._cached(('ema', source, span), lambda: ema(self.index, self._series(source), span))
+
+    def sma(self, window, source='close'):
+        """简单移动平均"""
+        return self._cached(('sma', source, window),
+                            lambda: self.index.rolling_mean(self._series(source), window))
+
+    def rolling_std(self, window, ddof=1, source='close'):
+        """滚动标准差"""
+        return self._cached(('std', source, window, ddof),
+                            lambda: self.index.rolling_std(self._series(source), window, ddof))
+
+    def true_range(self):
+        """真实波幅，分段首行退化为 high - low"""
+        return self._cached('true_range', lambda: true_range(self.index, self.high, self.low, self.close))
+
+    def rsi(self, window=14):
+        """相对强弱指标"""
+        return self._cached(('rsi', window), lambda: rsi(self.index, self.close, window))
+
+    def macd(self, fast=12, slow=26, signal=9):
+        """MACD，返回 (macd线, 信号线, 柱状图)"""
+        def compute():
+            line = self.ema(fast) - self.ema(slow)
+            signal_line = ema(self.index, line, signal)
+            return line, signal_line, line - signal_line
+        return self._cached(('macd', fast, slow, signal), compute)
+
+    def bollinger(self, window=20, num_std=2):
+        """布林带，返回 (上轨, 中轨, 下轨)"""
+        def compute():
+            mid = self.sma(window)
+            std = self.rolling_std(window, ddof=0)
+            return mid + num_std * std, mid, mid - num_std * std
+        return self._cached(('bollinger', window, num_std), compute)
+
+    def atr(self, window=14):
+        """平均真实波幅（Wilder平滑）"""
+        return self._cached(('atr', window), lambda: self.index.wilder_mean(self.true_range(), window))
+
+    def adx(self, window=14):
+        """平均趋向指标（Wilder定义）"""
+        return self._cached(('adx', window), lambda: adx(self.index, self.high, self.low, self.true_range(), window))
+
+    def cci(self, window=20, constant=0.015):
+        """顺势指标"""
+        return self._cached(('cci', window, constant), lambda: cci(
+            self.index, self.typical_price(), self.sma(window, source='typical'), window, constant
+        ))
+
+    def compute_all(self, config=None):
+        """一次调用计算全部指标，返回 {名称: 数组}"""
+        config = config or FEATURE_CONFIG
+        macd, macd_signal, macd_hist = self.macd(
+            config['macd_fast'], config['macd_slow'], config['macd_signal']
+        )
+        bb_upper, bb_mid, bb_lower = self.bollinger(config['bb_period'], config['bb_std'])
+        return {
+            'rsi': self.rsi(config['rsi_period']),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_hist': macd_hist,
+            'bb_upper': bb_upper,
+            'bb_mid': bb_mid,
+            'bb_lower': bb_lower,
+            'true_range': self.true_range(),
+            'atr': self.atr(config['atr_period']),
+            'adx': self.adx(config['adx_period']),
+            'cci': self.cci(config['cci_period']),
+        }
@@ -0,0 +1,227 @@
+"""
+按合约分区的内存映射行情数据集
+
+目录结构：
+    index.json      合约索引（合约 -> 起始行/行数/日期范围）、列类型和日期时区
+    date.npy        日期（带时区的日期按 UTC 保存）
+    <列名>.npy      OHLCV、持仓量等数值列
+
+数据按 (合约, 日期) 排序，每个合约在每列中是一段连续的行。
+各列以 np.load(mmap_mode='r') 打开，只有实际读取的合约和日期范围会被调入内存，
+打开十年全合约历史也不需要把数据读入RAM。
+"""
+
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from indicators import SegmentIndex
+
+# 格式变化时递增
+STORE_FORMAT_VERSION = 1
+
+INDEX_FILE = 'index.json'
+
+STORE_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'open_interest',
+                 'turnover', 'settle', 'pre_settle']
+
+
+def is_market_store(path):
+    """判断路径是否为内存映射数据集目录"""
+    return isinstance(path, (str, os.PathLike)) and os.path.isfile(os.path.join(path, INDEX_FILE))
+
+
+def write_market_store(data, path):
+    """
+    把行情数据写为内存映射数据集（先写临时目录再重命名）
+
+    path 必须不存在、为空目录或已有的数据集，否则抛出 ValueError，不会删除其他目录。
+    覆盖已有数据集时先把旧数据集改名移开，新数据集就位后才删除旧的，
+    任何时刻 path 上要么是旧数据集，要么是新数据集（两次重命名之间短暂不存在）。
+    品种（variety）按合约保存在索引中，取每个合约的第一个值。
+    带时区的日期按 UTC 保存为 datetime64（以便内存映射），时区记录在索引中，读取时恢复。返回写入的行数。
+    """
+    if os.path.lexists(path) and not is_market_store(path) and \
+            not (os.path.isdir(path) and not os.path.islink(path) and not os.listdir(path)):
+        raise ValueError(f"目标路径已存在且不是行情数据集，拒绝覆盖: {path}")
+
+    df = data.sort_values(['contract', 'date'], kind='mergesort').reset_index(drop=True)
+    contracts = df['contract'].astype(str).to_numpy()
+    segments = SegmentIndex(contracts)
+    tz = getattr(df['date'].dtype, 'tz', None)
+    # 索引中的日期范围按本地时间（与读取时的日期边界一致），数据按 UTC
+    local_dates = df['date'].dt.tz_localize(None).to_numpy() if tz is not None else df['date'].to_numpy()
+    dates = df['date'].dt.tz_convert(None).to_numpy() if tz is not None else local_dates
+    ends = segments.starts + segments.lengths - 1
+
+    index = []
+    for i, start in enumerate(segments.starts):
+        entry = {
+            'contract': contracts[start],
+            'offset': int(start),
+            'length': int(segments.lengths[i]),
+            'start_date': str(pd.Timestamp(local_dates[start]).date()),
+            'end_date': str(pd.Timestamp(local_dates[ends[i]]).date())
+        }
+        if 'variety' in df.columns:
+            entry['variety'] = str(df['variety'].iloc[start])
+        index.append(entry)
+
+    parent = os.path.dirname(os.path.abspath(path))
+    tmp_dir = os.path.join(parent, f'.tmp-{uuid.uuid4().hex}')
+    os.makedirs(tmp_dir)
+    try:
+        columns = {'date': str(dates.dtype)}
+        np.save(os.path.join(tmp_dir, 'date.npy'), dates)
+        for col in STORE_COLUMNS:
+            if col in df.columns:
+                values = df[col].to_numpy()
+                np.save(os.path.join(tmp_dir, f'{col}.npy'), values)
+                columns[col] = str(values.dtype)
+        with open(os.path.join(tmp_dir, INDEX_FILE), 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': STORE_FORMAT_VERSION,
+                'rows': len(df),
+                'columns': columns,
+                'tz': str(tz) if tz is not None else None,
+                'contracts': index
+            }, f, ensure_ascii=False)
+
+        old_dir = None
+        if is_market_store(path):
+            old_dir = os.path.join(parent, f'.old-{uuid.uuid4().hex}')
+            os.replace(path, old_dir)
+        elif os.path.isdir(path):
+            os.rmdir(path)
+        try:
+            os.replace(tmp_dir, path)
+        except OSError:
+            if old_dir is not None:
+                os.replace(old_dir, path)
+            raise
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return len(df)
+
+
+class MarketStore:
+    """只读打开内存映射数据集，按合约和日期范围读取"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, INDEX_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != STORE_FORMAT_VERSION:
+            raise ValueError(f"数据集格式版本不兼容: {meta.get('version')}")
+
+        self.path = path
+        self.rows = meta['rows']
+        self.columns = list(meta['columns'])
+        self.tz = meta.get('tz')
+        self.index = pd.DataFrame(meta['contracts']).set_index('contract')
+        self.index['start_date'] = pd.to_datetime(self.index['start_date'])
+        self.index['end_date'] = pd.to_datetime(self.index['end_date'])
+        self._arrays = {}
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def contracts(self):
+        return list(self.index.index)
+
+    def _array(self, column):
+        """按需以内存映射方式打开列"""
+        if column not in self._arrays:
+            self._arrays[column] = np.load(os.path.join(self.path, f'{column}.npy'), mmap_mode='r')
+        return self._arrays[column]
+
+    def date_range(self):
+        """整个数据集的 (最早日期, 最晚日期)"""
+        return self.index['start_date'].min(), self.index['end_date'].max()
+
+    def _local_bound(self, value):
+        """日期边界转换为数据集时区的本地时间（不带时区），不带时区的边界即为本地时间"""
+        bound = pd.Timestamp(value)
+        if bound.tz is not None:
+            bound = bound.tz_convert(self.tz) if self.tz is not None else bound
+            bound = bound.tz_localize(None)
+        return bound
+
+    def _stored_bound(self, value):
+        """日期边界转换为 date.npy 中的时间（带时区的数据集为 UTC）"""
+        bound = self._local_bound(value)
+        if self.tz is not None:
+            bound = bound.tz_localize(self.tz).tz_convert(None)
+        return np.datetime64(bound)
+
+    def _slices(self, contracts=None, start_date=None, end_date=None):
+        """每个选中合约在日期范围内的行区间 [(合约, 起始行, 结束行)]"""
+        selected = self.index if contracts is None else self.index.loc[
+            [contract for contract in map(str, contracts) if contract in self.index.index]
+        ]
+        if start_date is not None:
+            selected = selected[selected['end_date'] >= self._local_bound(start_date).normalize()]
+        if end_date is not None:
+            selected = selected[selected['start_date'] <= self._local_bound(end_date)]
+
+        dates = self._array('date')
+        slices = []
+        for contract, entry in selected.iterrows():
+            lo, hi = int(entry['offset']), int(entry['offset'] + entry['length'])
+            # 合约内日期有序，二分查找只读取这一段日期所在的页
+            if start_date is not None:
+                lo += int(np.searchsorted(dates[lo:hi], self._stored_bound(start_date), 'left'))
+            if end_date is not None:
+                hi = int(entry['offset']) + int(np.searchsorted(
+                    dates[int(entry['offset']):hi], self._stored_bound(end_date), 'right'))
+            if hi > lo:
+                slices.append((contract, lo, hi))
+        return slices
+
+    def load(self, contracts=None, start_date=None, end_date=None, columns=None):
+        """
+        读取选中合约和日期范围（含两端）的数据，返回按日期排序的DataFrame
+
+        只复制选中的行，其余数据不会被读入内存。
+        """
+        columns = [col for col in (columns or self.columns) if col in self.columns and col != 'date']
+        slices = self._slices(contracts, start_date, end_date)
+        names = [contract for contract, _, _ in slices]
+        lengths = np.array([hi - lo for _, lo, hi in slices], dtype=np.int64)
+
+        def gather(column):
+            array = self._array(column)
+            if not slices:
+                return np.empty(0, dtype=array.dtype)
+            return np.concatenate([array[lo:hi] for _, lo, hi in slices])
+
+        data = {
+            'date': gather('date'),
+            'contract': pd.Categorical.from_codes(np.repeat(np.arange(len(names)), lengths), categories=names)
+        }
+        for col in columns:
+            data[col] = gather(col)
+        if 'variety' in self.index.columns:
+            varieties = self.index.loc[names, 'variety'].to_numpy() if names else np.array([], dtype=object)
+            data['variety'] = pd.Categorical(np.repeat(varieties, lengths))
+
+        if self.tz is not None:
+            data['date'] = pd.DatetimeIndex(data['date']).tz_localize('UTC').tz_convert(self.tz)
+        df = pd.DataFrame(data)
+        return df.sort_values('date', kind='mergesort').reset_index(drop=True)
+
+    def summary(self):
+        """数据集概要（只读取索引）"""
+        start, end = self.date_range()
+        return {
+            'rows': self.rows,
+            'contracts': len(self.index),
+            'start_date': start,
+            'end_date': end
+        }
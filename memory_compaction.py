@@ -0,0 +1,113 @@
+"""
+DataFrame内存压缩
+
+把分析器的数据、特征、目标变量表压缩为紧凑类型（浮点 float32、整数 int32、
+目标变量 int8、合约/品种 category；成交金额保持 float64），并统计相对于 float64/object 且每个阶段
+各自复制一份时节省的字节数。各阶段的表用浅复制（copy(deep=False)）共享未修改的列，
+新增或替换的列只属于新表；共享的列只计算一次。
+不修改 pandas 的全局选项（如 mode.copy_on_write）。
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ['contract', 'variety']
+INT8_COLUMNS = ['target']
+# 数值常超过 float32 有效位数的列（成交金额），保持 float64
+FLOAT64_COLUMNS = ['turnover']
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+def _compact_column(values, name):
+    dtype = values.dtype
+    if name in CATEGORY_COLUMNS and not isinstance(dtype, pd.CategoricalDtype):
+        return values.astype(str).astype('category')
+    if name in INT8_COLUMNS and pd.api.types.is_integer_dtype(dtype) and dtype != np.int8:
+        return values.astype(np.int8)
+    if dtype == np.float64 and name not in FLOAT64_COLUMNS:
+        return values.astype(np.float32)
+    if dtype == np.int64 and (values.empty or (values.min() >= INT32_MIN and values.max() <= INT32_MAX)):
+        return values.astype(np.int32)
+    return values
+
+
+def compact_frame(df):
+    """返回压缩后的DataFrame，已是紧凑类型的列与原表共享、不复制"""
+    changed = {}
+    for name in df.columns:
+        series = df[name]
+        values = _compact_column(series, name)
+        if values is not series:
+            changed[name] = values
+    if not changed:
+        return df
+    # 浅复制后整列替换：原表不受影响（assign 在未开启写时复制的 pandas 2 中会深复制全部列）
+    compact = df.copy(deep=False)
+    for name, values in changed.items():
+        compact[name] = values
+    return compact
+
+
+def _column_buffer(series):
+    """列实际占用内存的数组（分类列为编码）"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.array.codes
+    return series.to_numpy()
+
+
+def _buffer_bytes(array):
+    if array.dtype == object:
+        return array.nbytes + sum(sys.getsizeof(value) for value in array)
+    return array.nbytes
+
+
+def baseline_bytes(series):
+    """同一列以 float64/int64/object 存储时的字节数"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        sizes = np.array([sys.getsizeof(str(value)) for value in categories], dtype=np.int64)
+        counts = np.bincount(series.array.codes[series.array.codes >= 0], minlength=len(categories))
+        return len(series) * 8 + int((sizes * counts).sum())
+    if series.dtype == object:
+        return int(series.memory_usage(index=False, deep=True))
+    return len(series) * 8
+
+
+def memory_report(frames):
+    """
+    统计各阶段表的内存占用
+
+    frames 为 {阶段名: DataFrame}（按顺序，None 表示该阶段尚未创建）。
+    返回DataFrame：baseline_bytes 为 float64/object 且每个阶段独立复制时的大小，
+    actual_bytes 为实际占用（与前面阶段共享的列不重复计算），saved_bytes 为两者之差。
+    """
+    seen = []
+    seen_categories = set()
+    rows = []
+    for stage, df in frames.items():
+        if df is None:
+            continue
+        baseline = 0
+        actual = 0
+        for name in df.columns:
+            series = df[name]
+            baseline += baseline_bytes(series)
+            array = _column_buffer(series)
+            if not any(np.may_share_memory(array, other) for other in seen if other.dtype == array.dtype):
+                actual += _buffer_bytes(array)
+                seen.append(array)
+            # 类别表在共享同一类型的列之间也是共享的
+            if isinstance(series.dtype, pd.CategoricalDtype) and id(series.dtype) not in seen_categories:
+                actual += _buffer_bytes(series.cat.categories.to_numpy(dtype=object))
+                seen_categories.add(id(series.dtype))
+        rows.append({'stage': stage, 'rows': len(df), 'baseline_bytes': baseline,
+                     'actual_bytes': actual, 'saved_bytes': baseline - actual})
+
+    report = pd.DataFrame(rows, columns=['stage', 'rows', 'baseline_bytes', 'actual_bytes', 'saved_bytes'])
+    if len(report):
+        total = report[['baseline_bytes', 'actual_bytes', 'saved_bytes']].sum()
+        report.loc[len(report)] = {'stage': 'total', 'rows': np.nan, **total.to_dict()}
+    return report.set_index('stage')
@@ -0,0 +1,114 @@
+"""
+模型工厂
+
+根据 MODEL_CONFIG 创建六种模型，并把统一的并行度设置（PERFORMANCE_CONFIG['model_n_jobs']）
+转换为各库自己的线程参数：scikit-learn / XGBoost / LightGBM 的 n_jobs，CatBoost 的 thread_count。
+梯度提升和逻辑回归没有线程参数（逻辑回归的 n_jobs 对 lbfgs 无效），由 threadpoolctl 控制。
+XGBoost 的 tree_method='hist'、LightGBM 的 max_bin 等直方图加速参数也在 MODEL_CONFIG 中配置。
+"""
+
+import os
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+
+from config import MODEL_CONFIG, PERFORMANCE_CONFIG
+
+MODEL_TYPES = ['random_forest', 'gradient_boosting', 'logistic_regression', 'xgboost', 'lightgbm', 'catboost']
+
+# 各模型控制线程数的参数名（None 表示没有）
+THREAD_PARAMS = {
+    'random_forest': 'n_jobs',
+    'gradient_boosting': None,
+    'logistic_regression': None,
+    'xgboost': 'n_jobs',
+    'lightgbm': 'n_jobs',
+    'catboost': 'thread_count'
+}
+
+
+class LabelEncodedClassifier(BaseEstimator, ClassifierMixin):
+    """把标签编码为 0..K-1 后训练（XGBoost 不接受 -1/0/1 标签），预测时还原"""
+
+    def __init__(self, estimator):
+        self.estimator = estimator
+
+    def fit(self, X, y, **fit_params):
+        self.classes_, codes = np.unique(np.asarray(y), return_inverse=True)
+        if 'eval_set' in fit_params:
+            # 早停验证集的标签同样编码，训练集中没有的类别丢弃
+            eval_set = []
+            for X_val, y_val in fit_params['eval_set']:
+                y_val = np.asarray(y_val)
+                keep = np.isin(y_val, self.classes_)
+                eval_set.append((np.asarray(X_val)[keep], np.searchsorted(self.classes_, y_val[keep])))
+            fit_params = {**fit_params, 'eval_set': eval_set}
+        self.estimator_ = clone(self.estimator).fit(X, codes, **fit_params)
+        return self
+
+    def predict(self, X):
+        codes = np.asarray(self.estimator_.predict(X)).ravel().astype(np.int64)
+        return self.classes_[codes]
+
+    def predict_proba(self, X):
+        return self.estimator_.predict_proba(X)
+
+
+def resolve_n_jobs(n_jobs=None):
+    """把并行度设置转换为正整数线程数（None 使用配置，-1 为全部CPU核）"""
+    if n_jobs is None:
+        n_jobs = PERFORMANCE_CONFIG['model_n_jobs']
+    cpu_count = os.cpu_count() or 1
+    if n_jobs < 0:
+        return max(1, cpu_count + 1 + n_jobs)
+    return max(1, min(n_jobs, cpu_count))
+
+
+def set_thread_budget(estimator, threads, model_type):
+    """
+    把模型（包括嵌套模型）的线程参数设置为 threads
+
+    只设置 THREAD_PARAMS[model_type] 指定的参数；没有线程参数的模型类型（或未知类型）保持不变，
+    避免设置 LogisticRegression 等已弃用的 n_jobs。
+    """
+    name = THREAD_PARAMS.get(model_type)
+    if name is None:
+        return estimator
+    params = {key: threads for key in estimator.get_params(deep=True) if key.rsplit('__', 1)[-1] == name}
+    if params:
+        estimator.set_params(**params)
+    return estimator
+
+
+def build_model(model_type, n_jobs=None, params=None):
+    """
+    根据 MODEL_CONFIG 创建未训练的模型
+
+    params 覆盖配置中的超参数；n_jobs 为统一的并行度设置，映射到各库的线程参数。
+    """
+    if model_type not in MODEL_CONFIG:
+        raise ValueError(f"不支持的模型类型: {model_type}")
+
+    params = {**MODEL_CONFIG[model_type], **(params or {})}
+    thread_param = THREAD_PARAMS[model_type]
+    if thread_param:
+        params[thread_param] = resolve_n_jobs(n_jobs)
+
+    if model_type == 'random_forest':
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(**params)
+    elif model_type == 'gradient_boosting':
+        from sklearn.ensemble import GradientBoostingClassifier
+        return GradientBoostingClassifier(**params)
+    elif model_type == 'logistic_regression':
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(**params)
+    elif model_type == 'xgboost':
+        import xgboost as xgb
+        return LabelEncodedClassifier(xgb.XGBClassifier(**params))
+    elif model_type == 'lightgbm':
+        import lightgbm as lgb
+        return lgb.LGBMClassifier(**params)
+    elif model_type == 'catboost':
+        from catboost import CatBoostClassifier
+        return CatBoostClassifier(**params)
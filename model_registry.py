@@ -0,0 +1,193 @@
+"""
+模型库
+
+把训练好的模型、标准化器、特征列和配置哈希保存为带版本号的目录：
+    <根目录>/v0001/
+        meta.json       版本、模型类型、特征列、配置哈希、指标、模型文件格式
+        scaler.joblib   标准化器
+        model.*         模型文件
+XGBoost / LightGBM / CatBoost 使用各自的原生格式（model.ubj / model.txt / model.cbm），
+其余 scikit-learn 模型用 joblib 保存：默认不压缩并以内存映射方式读取数组，加载最快；
+设置 PERFORMANCE_CONFIG['model_compress'] 可把随机森林等大模型的文件缩小数倍，但加载更慢。
+写入时先写临时目录再原子重命名，读取版本列表只读 meta.json，模型文件在 load 时才读取，
+joblib 和模型库也在保存、加载时才导入。
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+
+from config import FEATURE_CONFIG, MODEL_CONFIG, PERFORMANCE_CONFIG
+
+# 目录格式变化时递增
+REGISTRY_FORMAT_VERSION = 1
+
+META_FILE = 'meta.json'
+SCALER_FILE = 'scaler.joblib'
+
+MODEL_FILES = {
+    'joblib': 'model.joblib',
+    'xgboost': 'model.ubj',
+    'lightgbm': 'model.txt',
+    'catboost': 'model.cbm'
+}
+
+
+class BoosterClassifier:
+    """包装 LightGBM 原生 Booster，提供 predict / predict_proba / classes_"""
+
+    def __init__(self, booster, classes):
+        self.booster = booster
+        self.classes_ = np.asarray(classes)
+
+    def predict_proba(self, X):
+        probabilities = self.booster.predict(np.asarray(X, dtype=np.float64))
+        if probabilities.ndim == 1:
+            probabilities = np.column_stack([1 - probabilities, probabilities])
+        return probabilities
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def config_hash(model_type, feature_columns, params=None):
+    """模型参数、特征配置和特征列的哈希，用于判断保存的模型是否与当前配置一致"""
+    text = json.dumps([model_type, params if params is not None else MODEL_CONFIG.get(model_type),
+                       FEATURE_CONFIG, list(feature_columns)], sort_keys=True, default=str)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _model_format(model_type):
+    return model_type if model_type in ('xgboost', 'lightgbm', 'catboost') else 'joblib'
+
+
+class ModelRegistry:
+    """基于目录的模型库，每个版本一个子目录"""
+
+    def __init__(self, root=None, compress=None):
+        self.root = root or PERFORMANCE_CONFIG['model_registry_dir']
+        self.compress = PERFORMANCE_CONFIG['model_compress'] if compress is None else compress
+
+    def _version_dir(self, version):
+        return os.path.join(self.root, f'v{version:04d}')
+
+    def _version_numbers(self):
+        if not os.path.isdir(self.root):
+            return []
+        numbers = []
+        for name in os.listdir(self.root):
+            if name.startswith('v') and name[1:].isdigit() and os.path.isfile(os.path.join(self.root, name, META_FILE)):
+                numbers.append(int(name[1:]))
+        return sorted(numbers)
+
+    def latest_version(self):
+        """最新版本号，没有保存的模型时返回 None"""
+        numbers = self._version_numbers()
+        return numbers[-1] if numbers else None
+
+    def read_meta(self, version=None):
+        """读取版本的元数据（不加载模型）"""
+        version = self.latest_version() if version is None else version
+        if version is None:
+            return None
+        with open(os.path.join(self._version_dir(version), META_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def versions(self):
+        """所有版本的元数据，按版本号排序"""
+        return [self.read_meta(version) for version in self._version_numbers()]
+
+    def save(self, model, scaler, model_type, feature_columns, params=None, metrics=None, extra=None):
+        """保存模型为新版本，返回版本号"""
+        import joblib
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = os.path.join(self.root, f'.tmp-{uuid.uuid4().hex}')
+        os.makedirs(tmp_dir)
+        try:
+            model_format = _model_format(model_type)
+            model_path = os.path.join(tmp_dir, MODEL_FILES[model_format])
+            classes = np.asarray(model.classes_).tolist()
+            if model_format == 'xgboost':
+                model.estimator_.save_model(model_path)
+            elif model_format == 'lightgbm':
+                model.booster_.save_model(model_path)
+            elif model_format == 'catboost':
+                model.save_model(model_path)
+            else:
+                joblib.dump(model, model_path, compress=self.compress)
+            joblib.dump(scaler, os.path.join(tmp_dir, SCALER_FILE))
+
+            meta = {
+                'format_version': REGISTRY_FORMAT_VERSION,
+                'model_type': model_type,
+                'model_format': model_format,
+                'compressed': bool(self.compress),
+                'created': time.time(),
+                'feature_columns': list(feature_columns),
+                'classes': classes,
+                'params': params,
+                'config_hash': config_hash(model_type, feature_columns, params),
+                'metrics': metrics or {},
+                **(extra or {})
+            }
+
+            # 版本号在重命名前确定；并发保存时重命名失败则换下一个版本号
+            while True:
+                version = (self.latest_version() or 0) + 1
+                meta['version'] = version
+                with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+                    json.dump(meta, f, ensure_ascii=False, default=str)
+                try:
+                    os.rename(tmp_dir, self._version_dir(version))
+                    return version
+                except OSError:
+                    if not os.path.exists(self._version_dir(version)):
+                        raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def load(self, version=None):
+        """
+        加载模型，返回 (模型, 标准化器, 元数据)；version 为 None 时加载最新版本
+
+        没有保存的模型时返回 None。
+        """
+        import joblib
+
+        meta = self.read_meta(version)
+        if meta is None:
+            return None
+        if meta.get('format_version') != REGISTRY_FORMAT_VERSION:
+            raise ValueError(f"模型格式版本不兼容: {meta.get('format_version')}")
+
+        entry = self._version_dir(meta['version'])
+        model_path = os.path.join(entry, MODEL_FILES[meta['model_format']])
+        if meta['model_format'] == 'xgboost':
+            import xgboost as xgb
+            from model_factory import LabelEncodedClassifier
+            booster = xgb.XGBClassifier()
+            booster.load_model(model_path)
+            model = LabelEncodedClassifier(xgb.XGBClassifier())
+            model.estimator_ = booster
+            model.classes_ = np.asarray(meta['classes'])
+        elif meta['model_format'] == 'lightgbm':
+            import lightgbm as lgb
+            model = BoosterClassifier(lgb.Booster(model_file=model_path), meta['classes'])
+        elif meta['model_format'] == 'catboost':
+            from catboost import CatBoostClassifier
+            model = CatBoostClassifier()
+            model.load_model(model_path)
+        else:
+            model = joblib.load(model_path, mmap_mode=None if meta['compressed'] else 'r')
+        scaler = joblib.load(os.path.join(entry, SCALER_FILE))
+        return model, scaler, meta
+
+    def delete(self, version):
+        """删除版本"""
+        shutil.rmtree(self._version_dir(version), ignore_errors=True)
@@ -0,0 +1,84 @@
+"""
+多模型并行训练
+
+在同一份按时间切分的训练/测试集上同时训练多个模型（joblib 进程池），
+每个模型分配固定的线程数，避免多个模型同时使用全部CPU核导致过度订阅。
+返回按测试集准确率排序的排行榜：准确率、训练时间、批量与单条预测延迟。
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from threadpoolctl import threadpool_limits
+
+from model_factory import set_thread_budget
+from walk_forward import fit_and_score
+
+
+def _predict_latency(model, X, repeats=20):
+    """单条样本预测的中位延迟（毫秒）"""
+    row = X[-1:]
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def _train_one(model_type, estimator, threads, X_train, y_train, X_test, y_test):
+    """在工作进程中训练单个模型，返回 (模型类型, 模型, 标准化器, 指标)"""
+    try:
+        with threadpool_limits(limits=threads):
+            estimator = set_thread_budget(clone(estimator), threads, model_type)
+            model, scaler, metrics = fit_and_score(estimator, X_train, y_train, X_test, y_test)
+
+            X_test_scaled = scaler.transform(X_test)
+            start = time.perf_counter()
+            model.predict(X_test_scaled)
+            metrics['batch_predict_time'] = time.perf_counter() - start
+            metrics['single_predict_ms'] = _predict_latency(model, X_test_scaled)
+        metrics['threads'] = threads
+        return model_type, model, scaler, metrics
+    except Exception as e:
+        return model_type, None, None, {'threads': threads, 'error': str(e)}
+
+
+def train_all_models(estimators, X_train, y_train, X_test, y_test, n_jobs=-1):
+    """
+    并行训练多个模型
+
+    estimators 为 {模型类型: 未训练的模型}。n_jobs 为同时训练的模型数（-1 为CPU核数），
+    CPU核在同时训练的模型之间平均分配。返回 (排行榜DataFrame, {模型类型: (模型, 标准化器)})，
+    训练失败的模型在排行榜的 error 列中给出原因。
+    """
+    cpu_count = os.cpu_count() or 1
+    workers = min(len(estimators), cpu_count if n_jobs in (None, -1) else n_jobs)
+    threads = max(1, cpu_count // workers)
+
+    X_train = np.asarray(X_train, dtype=np.float64)
+    X_test = np.asarray(X_test, dtype=np.float64)
+    y_train = np.asarray(y_train)
+    y_test = np.asarray(y_test)
+
+    results = Parallel(n_jobs=workers)(
+        delayed(_train_one)(model_type, estimator, threads, X_train, y_train, X_test, y_test)
+        for model_type, estimator in estimators.items()
+    )
+
+    models = {}
+    rows = []
+    for model_type, model, scaler, metrics in results:
+        if model is not None:
+            models[model_type] = (model, scaler)
+        rows.append({'model_type': model_type, **metrics})
+
+    columns = ['model_type', 'accuracy', 'f1_macro', 'fit_time', 'batch_predict_time',
+               'single_predict_ms', 'threads', 'error']
+    leaderboard = pd.DataFrame(rows).reindex(columns=columns)
+    leaderboard = leaderboard.sort_values('accuracy', ascending=False, na_position='last')
+    return leaderboard.set_index('model_type'), models
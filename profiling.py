@@ -0,0 +1,238 @@
+"""
+分析流程各阶段的性能记录
+
+用 profile_stage 装饰分析器的阶段方法（load_data、create_features、train_model 等），每次调用记录：
+    wall_ms / cpu_ms          墙钟时间、本进程CPU时间（多线程时CPU时间可以大于墙钟时间）
+    rss_mb / rss_delta_mb     阶段结束时的常驻内存及阶段内的变化
+    peak_rss_mb               进程的常驻内存峰值，peak_rss_delta_mb 为本阶段抬高的峰值
+    alloc_mb / alloc_peak_mb  tracemalloc 统计的净分配和峰值（PERFORMANCE_CONFIG['profile_tracemalloc']）
+    rows_in / rows_out        输入、输出表的行数
+记录保存在分析器的 profiler 中（界面的"性能"页面），并按 LOGGING_CONFIG 写为一行 JSON 日志。
+设置 PERFORMANCE_CONFIG['profile_dir'] 后，每个阶段的 cProfile 结果保存为 .prof 文件，
+可以用 hot_spots() 或 snakeviz 等工具查看。阶段嵌套调用时（如 create_features 内部读取数据），
+内层阶段同样记录，但 tracemalloc 和 cProfile 只作用于最外层阶段。
+"""
+
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from config import LOGGING_CONFIG, PERFORMANCE_CONFIG
+
+LOGGER_NAME = 'futures_strategy'
+
+logger = logging.getLogger(f'{LOGGER_NAME}.profiling')
+
+MB = 1024 * 1024
+
+
+def setup_logging(config=None):
+    """
+    按 LOGGING_CONFIG 配置本系统的日志（配置了 file 时写入文件，否则输出到标准错误）
+
+    重复调用（如 Streamlit 每次重新运行）不会重复添加处理器。
+    """
+    config = config or LOGGING_CONFIG
+    system_logger = logging.getLogger(LOGGER_NAME)
+    system_logger.setLevel(config['level'])
+    if any(getattr(handler, '_from_logging_config', False) for handler in system_logger.handlers):
+        return system_logger
+
+    if config.get('file'):
+        handler = logging.FileHandler(config['file'], encoding='utf-8')
+    else:
+        handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(config['format']))
+    handler._from_logging_config = True
+    system_logger.addHandler(handler)
+    return system_logger
+
+
+def _current_rss():
+    """当前常驻内存（字节），无法读取时返回 None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss():
+    """进程的常驻内存峰值（字节），无法读取时返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位为 KB，macOS 上为字节
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _mb(value):
+    return round(value / MB, 3) if value is not None else None
+
+
+class StageProfiler:
+    """阶段性能记录"""
+
+    def __init__(self, enabled=None, trace_memory=None, profile_dir=None, max_records=None):
+        self.enabled = PERFORMANCE_CONFIG['profile_stages'] if enabled is None else enabled
+        self.trace_memory = PERFORMANCE_CONFIG['profile_tracemalloc'] if trace_memory is None else trace_memory
+        self.profile_dir = PERFORMANCE_CONFIG['profile_dir'] if profile_dir is None else profile_dir
+        self.max_records = PERFORMANCE_CONFIG['profile_max_records'] if max_records is None else max_records
+        self.records = []
+        self._depth = 0
+
+    @contextmanager
+    def measure(self, stage, rows_in=None):
+        """
+        测量 with 块，产出本次的记录字典
+
+        块内可以设置记录的 ok、message、rows_out；块内抛出异常时 ok 为 False。
+        """
+        if not self.enabled:
+            yield {}
+            return
+
+        record = {'stage': stage, 'ok': True, 'rows_in': rows_in, 'rows_out': None, 'depth': self._depth}
+        outermost = self._depth == 0
+        trace_memory = self.trace_memory and outermost
+        if trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile() if self.profile_dir and outermost else None
+
+        rss_before = _current_rss()
+        peak_before = _peak_rss()
+        started = time.time()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        self._depth += 1
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        except BaseException as e:
+            record.update(ok=False, message=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            self._depth -= 1
+            wall_ms = (time.perf_counter() - wall_start) * 1000
+            cpu_ms = (time.process_time() - cpu_start) * 1000
+            rss_after = _current_rss()
+            peak_after = _peak_rss()
+            record.update(
+                started=started,
+                wall_ms=round(wall_ms, 3),
+                cpu_ms=round(cpu_ms, 3),
+                rss_mb=_mb(rss_after),
+                rss_delta_mb=_mb(rss_after - rss_before) if rss_before is not None else None,
+                peak_rss_mb=_mb(peak_after),
+                peak_rss_delta_mb=_mb(peak_after - peak_before) if peak_before is not None else None,
+            )
+            if trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record.update(alloc_mb=_mb(current - traced_before), alloc_peak_mb=_mb(peak - traced_before))
+            if profiler is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                path = os.path.join(self.profile_dir,
+                                    f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(started))}_{stage}_{os.getpid()}"
+                                    f"_{len(self.records)}.prof")
+                profiler.dump_stats(path)
+                record['profile'] = path
+            self._add(record)
+
+    def _add(self, record):
+        self.records.append(record)
+        if self.max_records and len(self.records) > self.max_records:
+            del self.records[:len(self.records) - self.max_records]
+        logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+    def clear(self):
+        self.records = []
+
+    def to_frame(self):
+        """全部记录的表格（每次调用一行）"""
+        df = pd.DataFrame(self.records)
+        if not df.empty:
+            df['started'] = pd.to_datetime(df['started'], unit='s')
+        return df
+
+    def summary(self):
+        """按阶段汇总：调用次数、总耗时、平均耗时、最大内存峰值增量"""
+        df = self.to_frame()
+        if df.empty:
+            return df
+        return df.groupby('stage', sort=False).agg(
+            calls=('wall_ms', 'size'),
+            total_ms=('wall_ms', 'sum'),
+            mean_ms=('wall_ms', 'mean'),
+            cpu_ms=('cpu_ms', 'sum'),
+            max_peak_rss_delta_mb=('peak_rss_delta_mb', 'max')
+        ).sort_values('total_ms', ascending=False)
+
+
+def _count_rows(analyzer, spec, args, result=None):
+    """按 spec 取行数：分析器属性名、位置参数序号，或 'result'（返回值中的表）"""
+    if spec is None:
+        return None
+    if spec == 'result':
+        value = result[1] if isinstance(result, tuple) and len(result) == 2 else result
+    elif isinstance(spec, int):
+        value = args[spec] if len(args) > spec else None
+    else:
+        value = getattr(analyzer, spec, None)
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+
+def profile_stage(stage=None, rows_in=None, rows_out=None):
+    """
+    记录分析器方法的性能（分析器的 profiler 为 None 或未启用时直接调用）
+
+    rows_in / rows_out 指定输入、输出行数的来源：分析器属性名（调用前 / 后读取）、
+    位置参数序号，或 'result'。返回 (bool, message) 的方法以第一个值作为 ok。
+    """
+    def decorator(method):
+        name = stage or method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = getattr(self, 'profiler', None)
+            if profiler is None or not profiler.enabled:
+                return method(self, *args, **kwargs)
+
+            with profiler.measure(name, _count_rows(self, rows_in, args)) as record:
+                result = method(self, *args, **kwargs)
+                if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], bool):
+                    record['ok'] = result[0]
+                    if not result[0]:
+                        record['message'] = str(result[1])
+                record['rows_out'] = _count_rows(self, rows_out, args, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def hot_spots(path, limit=20, sort='cumulative'):
+    """cProfile 结果中耗时最多的函数（文本）"""
+    stream = io.StringIO()
+    stats = pstats.Stats(path, stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
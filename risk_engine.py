@@ -0,0 +1,185 @@
+"""
+组合风险引擎
+
+在回测的逐笔交易（止损/止盈使用 RISK_CONFIG 的 ATR 倍数）之上按组合模拟资金：
+    仓位    每笔交易在止损处亏损 risk_per_trade 比例的资金，且不超过 max_position_size；
+            同一合约最多同时持有 holding_days 笔交易，单笔仓位再除以 holding_days，
+            使单个合约的总仓位不超过 max_position_size
+    日亏损  某日组合按收盘价计算的亏损超过 max_daily_loss 时，当日收盘全部平仓，当日不再开仓
+    回撤    资金从高点回撤超过 max_drawdown 时，当日收盘全部平仓并停止交易
+每笔持仓按收盘价逐日结算，展开为 (交易, 交易日) 行后用 bincount 按日汇总组合收益。
+风控事件按时间顺序处理：每次在事件日截断受影响的交易，只从每日收益中减去被删除的行，
+循环次数等于风控事件数，与合约数和交易日数无关。
+"""
+
+import numpy as np
+import pandas as pd
+
+from backtest import simulate_trades
+from config import RISK_CONFIG, STRATEGY_CONFIG
+
+
+def position_weights(trades, holding_days, max_position_size, risk_per_trade):
+    """每笔交易占用的资金比例"""
+    stop_distance = np.abs(trades['entry_price'] - trades['stop_loss']).to_numpy() / trades['entry_price'].to_numpy()
+    with np.errstate(divide='ignore'):
+        weight = np.where(stop_distance > 0, risk_per_trade / stop_distance, max_position_size)
+    return np.minimum(weight, max_position_size) / holding_days
+
+
+def _daily_rows(df, trades, all_dates):
+    """
+    把每笔交易展开为持仓期间每个交易日一行
+
+    返回 (交易编号, 交易日序号, 当日收益率)，当日收益率 = 方向 × 价格变动 / 开仓价，
+    中间交易日按该合约收盘价（停牌日沿用前一收盘价），平仓日按平仓价。
+    """
+    codes = pd.Categorical(df['contract'].astype(str), categories=trades['contract'].cat.categories).codes
+    day = np.searchsorted(all_dates, df['date'].to_numpy())
+    grid = np.full((len(all_dates), len(trades['contract'].cat.categories)), np.nan)
+    grid[day, codes] = df['close'].to_numpy(dtype=np.float64)
+    grid = pd.DataFrame(grid).ffill().to_numpy()
+
+    contract = trades['contract'].cat.codes.to_numpy()
+    entry_day = np.searchsorted(all_dates, trades['entry_date'].to_numpy())
+    exit_day = np.searchsorted(all_dates, trades['exit_date'].to_numpy())
+    entry_price = trades['entry_price'].to_numpy()
+    exit_price = trades['exit_price'].to_numpy()
+    direction = trades['direction'].to_numpy().astype(np.float64)
+
+    trade_ids, days, returns = [], [], []
+    previous = entry_price
+    for offset in range(1, int((exit_day - entry_day).max(initial=0)) + 1):
+        current_day = entry_day + offset
+        held = np.flatnonzero(current_day <= exit_day)
+        price = np.where(current_day[held] == exit_day[held], exit_price[held],
+                         grid[np.minimum(current_day[held], len(all_dates) - 1), contract[held]])
+        trade_ids.append(held)
+        days.append(current_day[held])
+        returns.append(direction[held] * (price - previous[held]) / entry_price[held])
+        previous = previous.copy()
+        previous[held] = price
+
+    if not trade_ids:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([])
+    return np.concatenate(trade_ids), np.concatenate(days), np.concatenate(returns)
+
+
+def simulate_portfolio(df, signals, holding_days=5, max_position_size=None, max_daily_loss=None,
+                       max_drawdown=None, risk_per_trade=None, initial_capital=None):
+    """
+    按 RISK_CONFIG 的限制模拟组合
+
+    df 需要 date、contract、high、low、close 列（可选 open、atr），signals 与 df 的行对应。
+    未给出的限制取自 RISK_CONFIG。返回
+    {'trades': 逐笔交易（含仓位、是否被风控平仓）, 'equity': 每日资金/回撤/仓位,
+     'events': 风控事件, 'stats': 统计}。
+    """
+    max_position_size = RISK_CONFIG['max_position_size'] if max_position_size is None else max_position_size
+    max_daily_loss = RISK_CONFIG['max_daily_loss'] if max_daily_loss is None else max_daily_loss
+    max_drawdown = RISK_CONFIG['max_drawdown'] if max_drawdown is None else max_drawdown
+    risk_per_trade = RISK_CONFIG['risk_per_trade'] if risk_per_trade is None else risk_per_trade
+    initial_capital = STRATEGY_CONFIG['initial_capital'] if initial_capital is None else initial_capital
+
+    trades = simulate_trades(df, signals, holding_days,
+                             stop_multiplier=RISK_CONFIG['stop_loss_atr_multiplier'],
+                             take_multiplier=RISK_CONFIG['take_profit_atr_multiplier'])
+    weight = position_weights(trades, holding_days, max_position_size, risk_per_trade)
+    all_dates = np.unique(df['date'].to_numpy())
+    n_days = len(all_dates)
+    row_trade, row_day, row_return = _daily_rows(df, trades, all_dates)
+    row_pnl = row_return * weight[row_trade]
+
+    entry_day = np.searchsorted(all_dates, trades['entry_date'].to_numpy())
+    exit_day = np.searchsorted(all_dates, trades['exit_date'].to_numpy())
+    # 展开的行按交易排序，每笔交易的行按交易日连续排列
+    order = np.argsort(row_trade, kind='stable')
+    row_trade, row_day, row_return, row_pnl = row_trade[order], row_day[order], row_return[order], row_pnl[order]
+    row_start = np.searchsorted(row_trade, np.arange(len(trades)))
+
+    # 被风控截断的交易在 cut_day 收盘平仓；被禁止开仓的交易不计入
+    cut_day = exit_day.copy()
+    blocked = np.zeros(len(trades), dtype=bool)
+    alive = np.ones(len(row_trade), dtype=bool)
+    daily_return = np.bincount(row_day, weights=row_pnl, minlength=n_days)
+    events = []
+    checked_until = -1
+
+    def rows_after(selected, day):
+        """selected 中各交易在 day 之后的行号"""
+        first = row_start[selected] + np.maximum(0, day - entry_day[selected])
+        lengths = np.maximum(0, row_start[selected] + (exit_day[selected] - entry_day[selected]) - first)
+        return np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths - first, lengths)
+
+    while True:
+        equity = initial_capital * np.cumprod(1 + daily_return)
+        drawdown = equity / np.maximum(np.maximum.accumulate(equity), initial_capital) - 1
+        if checked_until >= n_days:
+            break
+
+        later = np.arange(n_days) > checked_until
+        loss_days = np.flatnonzero(later & (daily_return < -max_daily_loss))
+        drawdown_days = np.flatnonzero(later & (drawdown < -max_drawdown))
+        if not len(loss_days) and not len(drawdown_days):
+            break
+
+        first_loss = loss_days[0] if len(loss_days) else n_days
+        first_drawdown = drawdown_days[0] if len(drawdown_days) else n_days
+        event_day = min(first_loss, first_drawdown)
+        halt = first_drawdown <= first_loss
+
+        # 事件日收盘平掉所有持仓；当日（回撤触发时为之后所有交易日）不再开仓
+        open_at_close = np.flatnonzero(~blocked & (entry_day < event_day) & (cut_day > event_day))
+        new_blocked = np.flatnonzero(~blocked & ((entry_day >= event_day) if halt else (entry_day == event_day)))
+        cut_day[open_at_close] = event_day
+        blocked[new_blocked] = True
+        events.append({
+            'date': all_dates[event_day],
+            'event': '最大回撤' if halt else '日亏损',
+            'daily_return': daily_return[event_day],
+            'drawdown': drawdown[event_day],
+            'closed_positions': len(open_at_close)
+        })
+
+        # 只从组合收益中减去被截断或取消的那部分行
+        removed = np.concatenate([rows_after(open_at_close, event_day), rows_after(new_blocked, entry_day[new_blocked])])
+        removed = removed[alive[removed]]
+        alive[removed] = False
+        daily_return -= np.bincount(row_day[removed], weights=row_pnl[removed], minlength=n_days)
+        checked_until = n_days if halt else event_day
+
+    # 每日收盘持仓：开仓日收盘之后、平仓日收盘之前
+    held = ~blocked
+    exposure = (np.bincount(entry_day[held], weights=weight[held], minlength=n_days + 1)
+                - np.bincount(cut_day[held], weights=weight[held], minlength=n_days + 1))[:n_days].cumsum()
+    positions = (np.bincount(entry_day[held], minlength=n_days + 1)
+                 - np.bincount(cut_day[held], minlength=n_days + 1))[:n_days].cumsum()
+    equity_frame = pd.DataFrame({
+        'daily_return': daily_return,
+        'equity': equity,
+        'drawdown': drawdown,
+        'gross_exposure': exposure,
+        'open_positions': positions
+    }, index=pd.Index(all_dates, name='date'))
+
+    trades = trades.assign(weight=weight, blocked=blocked, closed_by_risk=~blocked & (cut_day < exit_day))
+    trades.loc[trades['closed_by_risk'], 'exit_date'] = all_dates[cut_day[trades['closed_by_risk'].to_numpy()]]
+    # 按持仓期间的逐日收益重新计算每笔交易的实际收益
+    realized = np.bincount(row_trade[alive], weights=row_return[alive], minlength=len(trades))
+    trades['return'] = np.where(blocked, np.nan, realized)
+
+    taken = trades[~blocked]
+    stats = {
+        'trades': len(taken),
+        'blocked_trades': int(blocked.sum()),
+        'risk_closed_trades': int(trades['closed_by_risk'].sum()),
+        'hit_rate': float((taken['return'] > 0).mean() * 100) if len(taken) else 0.0,
+        'total_return': float(equity[-1] / initial_capital - 1) if n_days else 0.0,
+        'max_drawdown': float(drawdown.min()) if n_days else 0.0,
+        'worst_day': float(daily_return.min()) if n_days else 0.0,
+        'max_gross_exposure': float(exposure.max()) if n_days else 0.0,
+        'daily_loss_events': sum(1 for event in events if event['event'] == '日亏损'),
+        'halted': any(event['event'] == '最大回撤' for event in events)
+    }
+    events = pd.DataFrame(events, columns=['date', 'event', 'daily_return', 'drawdown', 'closed_positions'])
+    return {'trades': trades, 'equity': equity_frame, 'events': events, 'stats': stats}
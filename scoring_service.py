@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+实时打分服务
+
+在内存中保存模型、特征变换和每个合约的滚动指标状态（StreamingFeatureState），
+每收到一根新K线只更新该合约的特征，再用训练时的特征变换打分，
+返回与 predict_strategy 相同的结果字典。通过本地 HTTP（或 Unix socket）提供：
+    POST /score   请求体为一根K线的JSON：date、contract、open、high、low、close、volume、
+                  open_interest（以及训练数据中有的 turnover、settle、pre_settle）
+    GET  /health  模型版本、特征列和已跟踪的合约数
+合约的指标还在预热期（特征含NaN）时返回 ready=false，状态照常更新。
+"""
+
+import argparse
+import json
+import socketserver
+import threading
+import sys
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import SERVICE_CONFIG
+from incremental_features import IncrementalFeatureState, StreamingFeatureState
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"无法序列化: {type(value)}")
+
+
+def _is_random_forest(model):
+    from sklearn.ensemble import RandomForestClassifier
+    return isinstance(model, RandomForestClassifier) and model.n_outputs_ == 1
+
+
+def single_row_predictor(model):
+    """
+    单行预测概率的快速路径，返回 X -> 概率 的函数
+
+    scikit-learn 包装层对每次调用都要做输入检查和线程调度，对单行输入是主要开销：
+    LightGBM 直接调用 Booster，随机森林直接调用各棵树的底层 predict，其余模型使用 predict_proba。
+    """
+    booster = getattr(model, 'booster_', None)
+    if booster is not None and hasattr(booster, 'predict'):
+        def predict(X):
+            probabilities = booster.predict(X)
+            if probabilities.ndim == 1:
+                probabilities = np.column_stack([1 - probabilities, probabilities])
+            return probabilities
+        return predict
+
+    trees = getattr(model, 'estimators_', None)
+    if trees is not None and type(model).__module__.startswith('sklearn.') and _is_random_forest(model):
+        def predict(X):
+            X = np.asarray(X, dtype=np.float32)
+            total = 0
+            for tree in trees:
+                values = tree.tree_.predict(X).reshape(len(X), -1)
+                total = total + values / values.sum(axis=1, keepdims=True)
+            return total / len(trees)
+        return predict
+
+    return model.predict_proba
+
+
+class ScoringService:
+    """包装 FuturesStrategyAnalyzer 的逐根K线打分"""
+
+    def __init__(self, analyzer, single_thread=None):
+        if analyzer.model is None:
+            raise ValueError("请先训练或加载模型")
+        if analyzer.data is None:
+            raise ValueError("请先加载历史行情数据")
+
+        self.analyzer = analyzer
+        self.transform = analyzer.feature_transform
+        state = analyzer.feature_state
+        if state is None:
+            state = IncrementalFeatureState()
+            state.initialize(analyzer.data)
+        self.stream = StreamingFeatureState.from_state(state)
+        missing = self.transform.missing_columns(self.stream.computable)
+        if missing:
+            raise ValueError(f"历史数据无法计算模型的特征列: {', '.join(missing)}")
+
+        single_thread = SERVICE_CONFIG['single_thread_predict'] if single_thread is None else single_thread
+        if single_thread:
+            from model_factory import set_thread_budget
+            model_type = (analyzer.model_info or {}).get('model_type')
+            for estimator in (analyzer.model, getattr(analyzer.model, 'estimator_', None)):
+                if hasattr(estimator, 'get_params'):
+                    set_thread_budget(estimator, 1, model_type)
+        self.predict_proba = single_row_predictor(analyzer.model)
+        # 同一合约的K线必须按顺序更新状态
+        self.lock = threading.Lock()
+        self.scored = 0
+
+    def score(self, bar):
+        """
+        更新合约状态并对新K线打分
+
+        返回 predict_strategy 的结果字典，另含 contract、date、ready；
+        K线不合法（缺列、日期不晚于已有数据）时抛出 ValueError。
+        """
+        contract = str(bar['contract'])
+        with self.lock:
+            features = self.stream.update_bar(contract, bar['date'], bar)
+            X = self.transform.transform_row(features)
+            self.scored += 1
+        if np.isnan(X).any():
+            missing = [col for col, value in zip(self.transform.feature_columns, X[0]) if value != value]
+            return {'contract': contract, 'date': str(bar['date']), 'ready': False, 'warming_up': missing}
+
+        result = self.analyzer.strategy_result(self.predict_proba(X), float(bar['close']), features.get('atr', np.nan))
+        result.update(contract=contract, date=str(bar['date']), ready=True)
+        return result
+
+    def health(self):
+        info = self.analyzer.model_info or {}
+        return {
+            'model_type': info.get('model_type'),
+            'version': info.get('version'),
+            'feature_columns': self.transform.feature_columns,
+            'contracts': len(self.stream.contracts),
+            'scored': self.scored
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    # 响应头和响应体在请求处理完后一次写出
+    wbufsize = -1
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False, default=_to_json).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._reply(200, self.server.service.health())
+        else:
+            self._reply(404, {'error': f"未知路径: {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/score':
+            self._reply(404, {'error': f"未知路径: {self.path}"})
+            return
+        try:
+            bar = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            self._reply(200, self.server.service.score(bar))
+        except (ValueError, KeyError, TypeError) as e:
+            self._reply(400, {'error': f"打分失败: {e}"})
+
+    def address_string(self):
+        return str(self.client_address[0]) if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        # 每个请求写一行日志会明显增加延迟
+        pass
+
+
+class _UnixHandler(_Handler):
+    disable_nagle_algorithm = False
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, host=None, port=None, socket_path=None):
+    """创建服务器（socket_path 非空时监听 Unix socket），调用 serve_forever() 开始服务"""
+    socket_path = socket_path if socket_path is not None else SERVICE_CONFIG['socket_path']
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixHTTPServer(socket_path, _UnixHandler)
+    else:
+        host = host or SERVICE_CONFIG['host']
+        server = ThreadingHTTPServer((host, SERVICE_CONFIG['port'] if port is None else port), _Handler)
+        server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="实时打分服务")
+    parser.add_argument('source', help="历史行情数据文件（CSV / Parquet / Feather）或内存映射数据集目录，用于初始化指标状态")
+    parser.add_argument('--version', type=int, help="模型库中的模型版本（默认最新）")
+    parser.add_argument('--host', default=SERVICE_CONFIG['host'], help="监听地址")
+    parser.add_argument('--port', type=int, default=SERVICE_CONFIG['port'], help="监听端口")
+    parser.add_argument('--socket', help="改为监听 Unix socket 路径")
+    parser.add_argument('--registry', help="模型库目录（默认 PERFORMANCE_CONFIG['model_registry_dir']）")
+    args = parser.parse_args()
+
+    from strategy_analyzer import FuturesStrategyAnalyzer
+    from market_store import is_market_store
+    from model_registry import ModelRegistry
+    from profiling import setup_logging
+
+    setup_logging()
+    analyzer = FuturesStrategyAnalyzer()
+    analyzer.model_registry = ModelRegistry(args.registry)
+    success, message = analyzer.load_model(args.version)
+    if success:
+        print(f"✅ {message}")
+        if is_market_store(args.source):
+            success, message = analyzer.open_store(args.source)
+            if success:
+                success, message = analyzer.select_data()
+        else:
+            success, message = analyzer.load_data(args.source, {})
+    if not success:
+        print(f"❌ {message}")
+        sys.exit(1)
+
+    service = ScoringService(analyzer)
+    server = make_server(service, args.host, args.port, args.socket)
+    where = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"🚀 打分服务已启动: {where}（{len(service.stream.contracts)} 个合约）", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
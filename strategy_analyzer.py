@@ -0,0 +1,681 @@
+"""
+期货策略分析器
+
+FuturesStrategyAnalyzer 是与界面无关的分析核心：读取数据、创建特征和目标变量、训练模型、
+回测和生成信号。Streamlit 界面（app.py）、打分服务和命令行工具都使用它。
+scikit-learn、XGBoost、LightGBM、CatBoost 等较重的库在第一次训练或加载模型时才导入，
+只读取数据、计算特征的脚本不需要等待这些导入。
+"""
+
+import numpy as np
+import pandas as pd
+
+from backtest import run_backtest
+from config import FEATURE_CONFIG, PERFORMANCE_CONFIG, TARGET_CONFIG
+from data_loader import read_market_data
+from feature_cache import FeatureCache, file_fingerprint, hash_dataframe, make_cache_key, make_stage_key
+from feature_pipeline import model_feature_columns
+from feature_transform import FeatureTransform
+from incremental_features import IncrementalFeatureState
+from market_store import MarketStore
+from memory_compaction import compact_frame, memory_report
+from profiling import StageProfiler, profile_stage
+from model_registry import ModelRegistry, config_hash
+from risk_engine import simulate_portfolio
+from strategy_signals import batch_signals, latest_bars, signal_columns
+
+
+class FuturesStrategyAnalyzer:
+    def __init__(self):
+        self.data = None
+        # 数据来源和读取参数的哈希，各阶段结果的缓存键由它派生（界面缓存使用）
+        self.data_key = None
+        self.features = None
+        self._target = None
+        self.target_params = None
+        self._model = None
+        # 训练模型时的特征列和标准化器，预测时使用同一个变换
+        self._feature_transform = None
+        # 当前模型的类型、特征列、参数和指标（保存到模型库时使用）
+        self.model_info = None
+        self.column_mapping = {}
+        self.feature_cache = FeatureCache() if PERFORMANCE_CONFIG['enable_feature_cache'] else None
+        self.feature_state = None
+        self.store = None
+        self.lookforward_days = 0
+        self.walk_forward_results = None
+        self.leaderboard = None
+        self.trained_models = {}
+        self.search_results = None
+        self.best_params = None
+        self.backtest_results = None
+        self.risk_results = None
+        # 模型、特征变换或目标变量表被替换时递增，历史信号缓存以它为键
+        self._signal_generation = 0
+        self._signal_cache = None
+        # 各阶段的耗时和内存记录（界面的"性能"页面）
+        self.profiler = StageProfiler()
+        # 内存压缩模式：紧凑类型，且数据、特征、目标变量各阶段用浅复制共享列而不复制
+        self.compact_memory = PERFORMANCE_CONFIG['compact_memory']
+        # 模型库中的最新版本在第一次使用模型时才加载
+        self.model_registry = ModelRegistry()
+        self._pending_model_version = (self.model_registry.latest_version()
+                                       if PERFORMANCE_CONFIG['load_latest_model'] else None)
+    
+    @property
+    def model(self):
+        if self._pending_model_version is not None:
+            self.load_model(self._pending_model_version)
+        return self._model
+    
+    @model.setter
+    def model(self, value):
+        self._pending_model_version = None
+        self._model = value
+        self._invalidate_signals()
+    
+    @property
+    def feature_transform(self):
+        if self._pending_model_version is not None:
+            self.load_model(self._pending_model_version)
+        return self._feature_transform
+    
+    @feature_transform.setter
+    def feature_transform(self, value):
+        self._pending_model_version = None
+        self._feature_transform = value
+        self._invalidate_signals()
+    
+    @property
+    def target(self):
+        return self._target
+    
+    @target.setter
+    def target(self, value):
+        self._target = value
+        self._invalidate_signals()
+    
+    def _invalidate_signals(self):
+        """模型、特征变换或目标变量表已替换：丢弃缓存的历史信号"""
+        self._signal_generation += 1
+        self._signal_cache = None
+    
+    @property
+    def scaler(self):
+        transform = self.feature_transform
+        return transform.scaler if transform is not None else None
+    
+    def _set_model(self, model, transform, model_type, params=None, metrics=None):
+        """设置当前模型、特征变换及模型信息"""
+        self.model = model
+        self.feature_transform = transform
+        self.model_info = {
+            'model_type': model_type,
+            'feature_columns': list(transform.feature_columns),
+            'params': params,
+            'metrics': {key: float(value) for key, value in (metrics or {}).items()},
+            'version': None
+        }
+    
+    @profile_stage()
+    def save_model(self):
+        """把当前模型保存到模型库，返回新版本号"""
+        if self.model is None or self.model_info is None:
+            return False, "请先训练模型"
+        
+        try:
+            version = self.model_registry.save(
+                self.model, self.feature_transform.scaler, self.model_info['model_type'],
+                self.feature_transform.feature_columns,
+                params=self.model_info['params'], metrics=self.model_info['metrics'],
+                extra={'lookforward_days': self.lookforward_days}
+            )
+            self.model_info['version'] = version
+            return True, f"模型已保存为版本 v{version:04d}"
+            
+        except Exception as e:
+            return False, f"模型保存失败: {str(e)}"
+    
+    @profile_stage()
+    def load_model(self, version=None):
+        """从模型库加载模型（version 为 None 时加载最新版本），不需要重新训练"""
+        self._pending_model_version = None
+        try:
+            loaded = self.model_registry.load(version)
+            if loaded is None:
+                return False, "模型库中没有保存的模型"
+            
+            model, scaler, meta = loaded
+            self._set_model(model, FeatureTransform(meta['feature_columns'], scaler), meta['model_type'],
+                            params=meta.get('params'), metrics=meta.get('metrics'))
+            self.model_info['version'] = meta['version']
+            message = f"已加载模型 v{meta['version']:04d}（{meta['model_type']}）"
+            if meta['config_hash'] != config_hash(meta['model_type'], meta['feature_columns'], meta.get('params')):
+                message += "，注意：模型保存时的特征配置与当前配置不同"
+            return True, message
+            
+        except Exception as e:
+            return False, f"模型加载失败: {str(e)}"
+        
+    @profile_stage(rows_out='data')
+    def load_data(self, file, column_mapping, start_date=None, end_date=None, contracts=None):
+        """
+        加载并处理行情数据（CSV / Parquet / Feather，分块流式读取，内存占用有上限）
+        
+        可选按日期范围和合约筛选，列式文件的筛选在读取时下推。
+        """
+        try:
+            df, dropped = read_market_data(file, column_mapping, start_date=start_date,
+                                           end_date=end_date, contracts=contracts)
+            
+            self.data = compact_frame(df) if self.compact_memory else df
+            self.data_key = self.source_key(file_fingerprint(file), column_mapping, start_date, end_date, contracts)
+            self.store = None
+            if dropped:
+                return True, f"数据加载成功！（超过最大行数限制，仅保留最近的 {len(df)} 行）"
+            return True, "数据加载成功！"
+            
+        except Exception as e:
+            return False, f"数据加载失败: {str(e)}"
+    
+    def source_key(self, fingerprint, column_mapping, start_date=None, end_date=None, contracts=None):
+        """由文件指纹和读取参数生成数据键（与 load_data 设置的 data_key 相同）"""
+        return make_stage_key('data', fingerprint, column_mapping, start_date, end_date, contracts,
+                              PERFORMANCE_CONFIG['max_data_rows'], self.compact_memory)
+    
+    def store_key(self, contracts=None, start_date=None, end_date=None):
+        """已打开数据集中所选合约和日期范围的数据键（与 select_data 设置的 data_key 相同）"""
+        return make_stage_key('store', file_fingerprint(self.store.path), contracts, start_date, end_date)
+    
+    def data_fingerprint(self):
+        """当前数据的键；数据不是通过 load_data / select_data 读取时按内容计算哈希"""
+        if self.data is None:
+            return None
+        return self.data_key if self.data_key is not None else hash_dataframe(self.data)
+    
+    def features_key(self):
+        """当前数据和特征配置对应的特征表键"""
+        data_key = self.data_fingerprint()
+        if data_key is None:
+            return None
+        return make_stage_key('features', data_key, FEATURE_CONFIG, model_feature_columns(), self.compact_memory)
+    
+    def target_key(self, lookforward_days=None, profit_threshold=None, loss_threshold=None):
+        """目标变量表的键（不指定参数时使用当前目标变量的参数）"""
+        params = (lookforward_days, profit_threshold, loss_threshold)
+        if lookforward_days is None:
+            if self.target_params is None:
+                return None
+            params = self.target_params
+        features_key = self.features_key()
+        return make_stage_key('target', features_key, *params) if features_key is not None else None
+    
+    @profile_stage()
+    def open_store(self, path):
+        """打开内存映射数据集（只读取索引，数据在 select_data 时按需调入）"""
+        try:
+            self.store = MarketStore(path)
+            self.data = None
+            self.data_key = None
+            self.features = None
+            self.target = None
+            self.feature_state = None
+            summary = self.store.summary()
+            return True, f"数据集打开成功！共 {summary['rows']} 行、{summary['contracts']} 个合约"
+            
+        except Exception as e:
+            self.store = None
+            return False, f"数据集打开失败: {str(e)}"
+    
+    @profile_stage(rows_out='data')
+    def select_data(self, contracts=None, start_date=None, end_date=None):
+        """从已打开的数据集中读取选中合约和日期范围的数据，作为后续分析的数据"""
+        if self.store is None:
+            return False, "请先打开数据集"
+        
+        try:
+            df = self.store.load(contracts, start_date, end_date)
+            if df.empty:
+                return False, "所选范围内没有数据"
+            
+            self.data = df
+            self.data_key = self.store_key(contracts, start_date, end_date)
+            self.features = None
+            self.target = None
+            self.feature_state = None
+            return True, f"已读取 {len(df)} 行数据"
+            
+        except Exception as e:
+            return False, f"数据读取失败: {str(e)}"
+    
+    @profile_stage(rows_in='data', rows_out='features')
+    def create_features(self):
+        """创建技术指标特征"""
+        if self.data is None and self.store is not None:
+            # 不隐式读取整个数据集，只处理 select_data 选中的范围
+            return False, "请先选择数据范围"
+        if self.data is None:
+            return False, "请先加载数据"
+        
+        try:
+            # 相同数据和特征配置的结果直接从磁盘缓存读取
+            cache_key = None
+            if self.feature_cache is not None:
+                cache_key = make_cache_key(self.data, FEATURE_CONFIG, model_feature_columns(), self.compact_memory)
+                cached = self.feature_cache.get(cache_key)
+                if cached is not None:
+                    self.features = cached
+                    # 缓存中没有增量状态，追加数据时再全量初始化
+                    self.feature_state = None
+                    return True, "特征创建成功！（来自缓存）"
+            
+            # 按合约分组计算模型使用的指标，避免不同合约的数据混入同一窗口，
+            # 同时记录各合约的滚动状态供 update_features 增量计算
+            self.feature_state = IncrementalFeatureState()
+            df = self.feature_state.initialize(self.data)
+            
+            # 删除模型特征含NaN的行（各合约的指标预热期）
+            df = self._drop_warmup_rows(df)
+            if self.compact_memory:
+                df = compact_frame(df)
+            
+            if cache_key is not None:
+                self.feature_cache.put(cache_key, df)
+            
+            self.features = df
+            return True, "特征创建成功！"
+            
+        except Exception as e:
+            return False, f"特征创建失败: {str(e)}"
+    
+    def _drop_warmup_rows(self, df):
+        """删除模型特征含NaN的行"""
+        key_features = [col for col in model_feature_columns() if col in df.columns]
+        return df.dropna(subset=key_features).reset_index(drop=True)
+    
+    @profile_stage(rows_in=0, rows_out='features')
+    def update_features(self, new_rows):
+        """
+        追加新交易日数据并增量更新特征
+        
+        只对新行计算指标（复用各合约的滚动窗口缓冲和平滑状态），
+        结果与对全部数据重新调用 create_features 一致。
+        """
+        if self.features is None:
+            return False, "请先创建特征"
+        
+        try:
+            new = new_rows.copy()
+            new['date'] = pd.to_datetime(new['date'])
+            for col in ['open', 'high', 'low', 'close', 'volume', 'open_interest',
+                        'turnover', 'settle', 'pre_settle']:
+                if col in new.columns:
+                    new[col] = pd.to_numeric(new[col], errors='coerce')
+            new = new.dropna(subset=['open', 'high', 'low', 'close', 'volume', 'open_interest'])
+            
+            if self.feature_state is None:
+                self.feature_state = IncrementalFeatureState()
+                self.feature_state.initialize(self.data)
+            
+            new_features = self._drop_warmup_rows(self.feature_state.update(new))
+            if self.compact_memory:
+                new = compact_frame(new)
+                new_features = compact_frame(new_features)
+            self.data_key = make_stage_key('update', self.data_fingerprint(), hash_dataframe(new))
+            self.data = pd.concat([self.data, new], ignore_index=True)
+            self.features = pd.concat([self.features, new_features], ignore_index=True)
+            # 目标变量依赖未来价格，需要重新创建
+            self.target = None
+            return True, f"特征增量更新成功！新增 {len(new_features)} 行"
+            
+        except Exception as e:
+            return False, f"增量更新失败: {str(e)}"
+    
+    def memory_report(self):
+        """数据、特征、目标变量表的内存占用及压缩节省的字节数"""
+        return memory_report({'data': self.data, 'features': self.features, 'target': self.target})
+    
+    @profile_stage(rows_in='features', rows_out='target')
+    def create_target(self, lookforward_days=5, profit_threshold=0.02, loss_threshold=-0.01):
+        """创建目标变量（未来价格变动）"""
+        if self.features is None:
+            return False, "请先创建特征"
+        
+        try:
+            # 在特征表基础上增加列，已有的列与特征表共享（浅复制，只新增列、不原地修改）
+            df = self.features.copy(deep=not self.compact_memory)
+            
+            # 计算未来价格变动（在合约内部向前取值）
+            future_close = df.groupby('contract', sort=False)['close'].shift(-lookforward_days)
+            df['future_return'] = future_close / df['close'] - 1
+            
+            # 创建目标变量
+            # 1: 做多信号 (未来上涨超过阈值)
+            # 0: 持有 (未来变动在阈值内)
+            # -1: 做空信号 (未来下跌超过阈值)
+            
+            conditions = [
+                df['future_return'] > profit_threshold,
+                df['future_return'] < loss_threshold
+            ]
+            choices = [1, -1]
+            df['target'] = np.select(conditions, choices, default=0)
+            
+            # 每个合约最后 lookforward_days 行没有未来数据（future_return 为 NaN），标签无意义；
+            # 这些行保留在表中（与特征表行对齐、共享列），训练、评估和回测时由 _training_frame 排除
+            if self.compact_memory:
+                df = compact_frame(df)
+            
+            self.target = df
+            self.lookforward_days = lookforward_days
+            self.target_params = (lookforward_days, profit_threshold, loss_threshold)
+            return True, "目标变量创建成功！"
+            
+        except Exception as e:
+            return False, f"目标变量创建失败: {str(e)}"
+    
+    def _training_frame(self):
+        """
+        训练使用的数据和特征列（由 FEATURE_CONFIG 决定，可选特征仅在存在时使用）
+
+        只包含有未来收益的行：每个合约最后 lookforward_days 行的标签未知，不参与训练、评估和回测。
+        """
+        df = self.target[self.target['future_return'].notna()]
+        available_features = [col for col in model_feature_columns() if col in df.columns]
+        return df, available_features
+    
+    @profile_stage(rows_in='target')
+    def train_model(self, model_type='random_forest', test_size=0.2, n_jobs=None):
+        """
+        训练机器学习模型
+        
+        按时间顺序切分：最后 test_size 比例的交易日作为测试集，
+        训练集与测试集之间留出 lookforward_days 个交易日，避免使用未来信息。
+        n_jobs 为模型训练的线程数（None 使用 PERFORMANCE_CONFIG['model_n_jobs']）。
+        """
+        if self.target is None:
+            return False, "请先创建目标变量"
+        
+        try:
+            # 训练相关的模块（scikit-learn 和各模型库）在第一次训练时才导入
+            from model_factory import build_model
+            from walk_forward import fit_and_score, time_ordered_split
+            
+            df, available_features = self._training_frame()
+            X = df[available_features]
+            y = df['target']
+            
+            # 按时间顺序分割数据
+            train_idx, test_idx = time_ordered_split(df['date'], test_size, gap=self.lookforward_days)
+            
+            # 标准化特征并训练、评估模型
+            model, scaler, metrics = fit_and_score(
+                build_model(model_type, n_jobs=n_jobs),
+                X.iloc[train_idx], y.iloc[train_idx], X.iloc[test_idx], y.iloc[test_idx]
+            )
+            self._set_model(model, FeatureTransform(available_features, scaler), model_type, metrics=metrics)
+            
+            return True, f"模型训练成功！测试集准确率: {metrics['accuracy']:.4f}"
+            
+        except Exception as e:
+            return False, f"模型训练失败: {str(e)}"
+    
+    @profile_stage(rows_in='target')
+    def train_all_models(self, model_types=None, test_size=0.2, n_jobs=-1):
+        """
+        并行训练多个模型并生成排行榜
+        
+        所有模型使用同一个按时间切分的训练/测试集，在进程池中同时训练，
+        CPU核在模型之间平均分配。排行榜保存在 leaderboard，准确率最高的模型作为当前模型。
+        """
+        if self.target is None:
+            return False, "请先创建目标变量"
+        
+        try:
+            from model_factory import MODEL_TYPES, build_model
+            from model_training import train_all_models
+            from walk_forward import time_ordered_split
+            
+            model_types = model_types or MODEL_TYPES
+            df, available_features = self._training_frame()
+            X = df[available_features]
+            y = df['target']
+            train_idx, test_idx = time_ordered_split(df['date'], test_size, gap=self.lookforward_days)
+            
+            estimators = {model_type: build_model(model_type) for model_type in model_types}
+            self.leaderboard, self.trained_models = train_all_models(
+                estimators, X.iloc[train_idx], y.iloc[train_idx], X.iloc[test_idx], y.iloc[test_idx],
+                n_jobs=n_jobs
+            )
+            
+            if not self.trained_models:
+                return False, "所有模型训练失败"
+            
+            best = self.leaderboard['accuracy'].idxmax()
+            model, scaler = self.trained_models[best]
+            self._set_model(model, FeatureTransform(available_features, scaler), best,
+                            metrics=self.leaderboard.loc[best, ['accuracy', 'f1_macro', 'fit_time']].to_dict())
+            return True, f"{len(self.trained_models)} 个模型训练完成！最佳模型: {best}（准确率 {self.leaderboard.loc[best, 'accuracy']:.4f}）"
+            
+        except Exception as e:
+            return False, f"模型训练失败: {str(e)}"
+    
+    @profile_stage(rows_in='target')
+    def walk_forward_train(self, model_type='random_forest', n_splits=5, mode='expanding',
+                           train_window=None, n_jobs=-1):
+        """
+        前推验证训练
+        
+        在 n_splits 个按时间顺序的折上训练和评估（扩展或滚动窗口，训练与测试之间
+        留出 lookforward_days 个交易日），各折并行计算，结果保存在 walk_forward_results；
+        随后用全部数据训练最终模型。
+        """
+        if self.target is None:
+            return False, "请先创建目标变量"
+        
+        try:
+            from model_factory import build_model
+            from walk_forward import walk_forward_evaluate
+            
+            df, available_features = self._training_frame()
+            estimator = build_model(model_type)
+            
+            self.walk_forward_results = walk_forward_evaluate(
+                df, available_features, estimator, n_splits=n_splits, mode=mode,
+                train_window=train_window, gap=self.lookforward_days, n_jobs=n_jobs, model_type=model_type
+            )
+            
+            # 用全部数据训练最终模型
+            transform = FeatureTransform(available_features)
+            estimator.fit(transform.fit_transform(df), df['target'])
+            self._set_model(estimator, transform, model_type,
+                            metrics=self.walk_forward_results[['accuracy', 'f1_macro']].mean().to_dict())
+            
+            mean_accuracy = self.walk_forward_results['accuracy'].mean()
+            return True, f"前推验证完成！{len(self.walk_forward_results)} 折平均准确率: {mean_accuracy:.4f}"
+            
+        except Exception as e:
+            return False, f"前推验证失败: {str(e)}"
+    
+    @profile_stage(rows_in='target')
+    def tune_model(self, model_type='random_forest', method=None, n_trials=None, n_splits=None,
+                   n_jobs=-1, progress=None):
+        """
+        超参数搜索
+        
+        在 SEARCH_CONFIG 的搜索空间中用随机搜索 / 逐次减半 / Hyperband 寻找参数，
+        按时间顺序的交叉验证评估（留出 lookforward_days 个交易日），试验在进程池中并行，
+        已完成的试验缓存在磁盘上。试验结果保存在 search_results，最佳参数保存在 best_params，
+        随后用最佳参数和全部数据训练最终模型。
+        """
+        if self.target is None:
+            return False, "请先创建目标变量"
+        
+        try:
+            from hyperparameter_search import search_hyperparameters
+            from model_factory import build_model
+            
+            df, available_features = self._training_frame()
+            self.search_results, self.best_params = search_hyperparameters(
+                df, available_features, model_type, method=method, n_trials=n_trials,
+                n_splits=n_splits, gap=self.lookforward_days, n_jobs=n_jobs, progress=progress
+            )
+            
+            # 用最佳参数和全部数据训练最终模型
+            transform = FeatureTransform(available_features)
+            model = build_model(model_type, params=self.best_params)
+            model.fit(transform.fit_transform(df), df['target'])
+            
+            final = self.search_results[self.search_results['fraction'] >= 1]
+            self._set_model(model, transform, model_type, params=self.best_params,
+                            metrics={'accuracy': final['score'].max()})
+            return True, f"超参数搜索完成！共 {len(self.search_results)} 次试验，最佳交叉验证准确率: {final['score'].max():.4f}"
+            
+        except Exception as e:
+            return False, f"超参数搜索失败: {str(e)}"
+    
+    def _historical_signals(self, start_date=None, end_date=None):
+        """
+        目标变量表中日期范围内每根K线的模型信号，返回 (数据, 信号)
+        
+        同一模型和日期范围的预测结果会被缓存，调整回测或风控参数后重新模拟时不需要再次预测；
+        模型、特征变换或目标变量表被替换时缓存失效。
+        """
+        # 先取模型（可能触发延迟加载并使缓存失效），再取缓存键
+        model, transform = self.model, self.feature_transform
+        key = (self._signal_generation, start_date, end_date)
+        if self._signal_cache is not None and self._signal_cache[0] == key:
+            return self._signal_cache[1], self._signal_cache[2]
+        
+        df, _ = self._training_frame()
+        if start_date is not None:
+            df = df[df['date'] >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            df = df[df['date'] <= pd.Timestamp(end_date)]
+        signals = np.array([], dtype=np.int8)
+        if not df.empty:
+            signals = np.asarray(model.predict(transform.transform(df))).ravel()
+        self._signal_cache = (key, df, signals)
+        return df, signals
+    
+    @profile_stage(rows_in='target')
+    def run_backtest(self, start_date=None, end_date=None, holding_days=None):
+        """
+        历史回测
+        
+        用当前模型对目标变量表中日期范围内的每根K线预测信号，按与 predict_strategy 相同的
+        ATR 止损/止盈模拟交易，最多持有 holding_days 个交易日（默认等于目标变量的预测天数）。
+        结果（逐笔交易、资金曲线、统计）保存在 backtest_results。
+        注意：训练期内的K线是样本内预测，应选择测试期之后的日期评估。
+        """
+        if self.model is None:
+            return False, "请先训练模型"
+        
+        try:
+            df, signals = self._historical_signals(start_date, end_date)
+            if df.empty:
+                return False, "所选日期范围内没有数据"
+            
+            self.backtest_results = run_backtest(df, signals, holding_days=holding_days or self.lookforward_days or 5)
+            
+            stats = self.backtest_results['stats']
+            return True, f"回测完成！共 {stats['trades']} 笔交易，胜率 {stats['hit_rate']:.1f}%，最大回撤 {stats['max_drawdown']:.2%}"
+            
+        except Exception as e:
+            return False, f"回测失败: {str(e)}"
+    
+    @profile_stage(rows_in='target')
+    def simulate_risk(self, start_date=None, end_date=None, holding_days=None, **limits):
+        """
+        组合风险模拟
+        
+        用模型对日期范围内每根K线的信号按 RISK_CONFIG 分配仓位，并在整个组合上执行
+        日亏损和最大回撤限制；limits 可覆盖 max_position_size、max_daily_loss、max_drawdown、
+        risk_per_trade。结果保存在 risk_results。
+        """
+        if self.model is None:
+            return False, "请先训练模型"
+        
+        try:
+            df, signals = self._historical_signals(start_date, end_date)
+            if df.empty:
+                return False, "所选日期范围内没有数据"
+            
+            self.risk_results = simulate_portfolio(df, signals, holding_days=holding_days or self.lookforward_days or 5,
+                                                   **limits)
+            
+            stats = self.risk_results['stats']
+            message = f"风险模拟完成！共 {stats['trades']} 笔交易，总收益 {stats['total_return']:.2%}，最大回撤 {stats['max_drawdown']:.2%}"
+            if stats['halted']:
+                message += "（触及最大回撤限制后停止交易）"
+            return True, message
+            
+        except Exception as e:
+            return False, f"风险模拟失败: {str(e)}"
+    
+    @profile_stage(rows_in=0, rows_out='result')
+    def predict_signals(self, data=None, start_date=None, end_date=None, latest_only=True):
+        """
+        批量生成策略信号
+        
+        latest_only 为 True 时对每个合约的最新K线打分，否则对日期范围内的每根K线打分；
+        所有行一次调用 predict_proba，止损、止盈、成功率、盈亏比为向量化计算的列。
+        data 默认为特征表（包含每个合约最新的K线；目标变量表中没有未来收益的行由 _training_frame
+        在训练、回测时排除）。
+        """
+        if self.model is None:
+            return False, "请先训练模型"
+        
+        try:
+            df = data if data is not None else (self.features if self.features is not None else self.target)
+            if start_date is not None:
+                df = df[df['date'] >= pd.Timestamp(start_date)]
+            if end_date is not None:
+                df = df[df['date'] <= pd.Timestamp(end_date)]
+            if latest_only:
+                df = latest_bars(df)
+            if df.empty:
+                return False, "所选范围内没有数据"
+            
+            return True, batch_signals(self.model, self.feature_transform, df)
+            
+        except Exception as e:
+            return False, f"策略预测失败: {str(e)}"
+    
+    @profile_stage(rows_in=0)
+    def predict_strategy(self, latest_data):
+        """
+        预测交易策略（最后一根K线）
+        
+        使用训练时保存的特征变换：按训练时的特征列和顺序只取最后一行的特征值，
+        用 NumPy 标准化后打分，不需要处理整个DataFrame。
+        """
+        if self.model is None:
+            return False, "请先训练模型"
+        
+        try:
+            X = self.feature_transform.transform_last(latest_data)
+            atr = latest_data['atr'].iat[-1] if 'atr' in latest_data.columns else np.nan
+            probabilities = self.model.predict_proba(X)
+            return True, self.strategy_result(probabilities, latest_data['close'].iat[-1], atr)
+            
+        except Exception as e:
+            return False, f"策略预测失败: {str(e)}"
+    
+    def strategy_result(self, probabilities, price, atr):
+        """由单根K线的预测概率（1 行）计算 predict_strategy 的结果字典"""
+        probabilities = np.asarray(probabilities)
+        signal = signal_columns(probabilities, self.model.classes_, [price], [atr])
+        prediction = signal['prediction'][0]
+        trade = prediction != 0
+        
+        return {
+            'action': TARGET_CONFIG['target_mapping'][prediction.item()],
+            'current_price': signal['current_price'][0],
+            'stop_loss': signal['stop_loss'][0] if trade else None,
+            'take_profit': signal['take_profit'][0] if trade else None,
+            'success_rate': signal['success_rate'][0],
+            'profit_loss_ratio': signal['profit_loss_ratio'][0],
+            'prediction': prediction,
+            'probabilities': probabilities[0]
+        }
@@ -0,0 +1,82 @@
+"""
+批量策略信号
+
+对多根K线（所有合约的最新K线，或日期范围内的每根K线）一次调用 predict_proba，
+操作建议、止损价、止盈价、成功率、盈亏比都以向量化列计算（predict_strategy 对单根K线使用同一函数）：
+做多止损 = 收盘价 - 止损倍数×ATR、止盈 = 收盘价 + 止盈倍数×ATR，做空相反，持有不设止损止盈；
+成功率为最大预测概率，ATR 缺失时取收盘价的 2%。
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import STRATEGY_CONFIG, TARGET_CONFIG
+
+
+def latest_bars(df):
+    """每个合约的最新一根K线（按日期）"""
+    ordered = df.sort_values('date', kind='mergesort')
+    return ordered.drop_duplicates('contract', keep='last').sort_values('contract').reset_index(drop=True)
+
+
+def signal_columns(probabilities, classes, price, atr, stop_multiplier=None, take_multiplier=None):
+    """
+    由预测概率计算信号列，返回 {列名: 数组}
+
+    probabilities 的列与 classes 对应；price、atr 为对应行的收盘价和ATR。
+    """
+    stop_multiplier = STRATEGY_CONFIG['atr_multiplier_stop_loss'] if stop_multiplier is None else stop_multiplier
+    take_multiplier = STRATEGY_CONFIG['atr_multiplier_take_profit'] if take_multiplier is None else take_multiplier
+
+    probabilities = np.asarray(probabilities)
+    classes = np.asarray(classes)
+    codes = probabilities.argmax(axis=1)
+    prediction = classes[codes]
+
+    price = np.asarray(price, dtype=np.float64)
+    atr = np.asarray(atr, dtype=np.float64)
+    atr = np.where(np.isfinite(atr), atr, price * 0.02)
+
+    direction = np.sign(prediction).astype(np.float64)
+    trade = direction != 0
+    stop_loss = np.where(trade, price - direction * stop_multiplier * atr, np.nan)
+    take_profit = np.where(trade, price + direction * take_multiplier * atr, np.nan)
+    risk = direction * (price - stop_loss)
+    reward = direction * (take_profit - price)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_loss_ratio = np.where(trade & (risk > 0), reward / risk, 0.0)
+
+    return {
+        'current_price': price,
+        'atr': atr,
+        'prediction': prediction,
+        'codes': codes,
+        'stop_loss': stop_loss,
+        'take_profit': take_profit,
+        'success_rate': probabilities.max(axis=1) * 100,
+        'profit_loss_ratio': profit_loss_ratio
+    }
+
+
+def batch_signals(model, transform, df, stop_multiplier=None, take_multiplier=None):
+    """
+    计算 df 每一行的策略信号，返回DataFrame
+
+    transform 为训练模型时的 FeatureTransform。列：date、contract、current_price、atr、
+    prediction、action、stop_loss、take_profit、success_rate、profit_loss_ratio，
+    以及每个类别的概率 prob_<类别>。
+    """
+    probabilities = np.asarray(model.predict_proba(transform.transform(df)))
+    classes = np.asarray(model.classes_)
+    atr = df['atr'].to_numpy(dtype=np.float64) if 'atr' in df.columns else np.full(len(df), np.nan)
+    columns = signal_columns(probabilities, classes, df['close'].to_numpy(dtype=np.float64), atr,
+                             stop_multiplier, take_multiplier)
+
+    mapping = TARGET_CONFIG['target_mapping']
+    codes = columns.pop('codes')
+    signals = pd.DataFrame({'date': df['date'].array, 'contract': df['contract'].array, **columns})
+    signals.insert(signals.columns.get_loc('stop_loss'), 'action',
+                   pd.Categorical.from_codes(codes, categories=[mapping[value] for value in classes.tolist()]))
+    for i, value in enumerate(classes):
+        signals[f'prob_{value}'] = probabilities[:, i]
+    return signals
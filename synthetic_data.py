@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+向量化的模拟期货行情生成器（用于压测、基准和示例数据）
+
+交易日历用 NumPy 的工作日函数生成，每个合约的收盘价为一条几何布朗运动路径，
+整张 (交易日, 合约) 矩阵一次抽样，开高低价、成交量、持仓量、成交金额、结算价都由数组运算得到，
+千万行只需数秒。给定 seed 时结果可重现。
+"""
+
+import argparse
+import time
+import os
+
+import numpy as np
+import pandas as pd
+
+# 按合约数生成合约代码时轮流使用的品种
+VARIETIES = ['IF', 'IC', 'IH', 'IM', 'T', 'TF', 'TS', 'CU', 'AL', 'ZN', 'RB', 'HC', 'I', 'J', 'AU', 'AG',
+             'SC', 'FU', 'M', 'Y', 'P', 'C', 'CF', 'SR', 'TA', 'MA']
+
+# 标准列名 -> 中文列名（列顺序与 sample_futures_data_new.csv 相同）
+CHINESE_COLUMNS = {
+    'contract': '合约',
+    'date': '交易日',
+    'open': '开盘价',
+    'high': '最高价',
+    'low': '最低价',
+    'close': '收盘价',
+    'volume': '成交量',
+    'open_interest': '持仓量',
+    'turnover': '成交金额',
+    'settle': '结算价',
+    'pre_settle': '前结算价',
+    'variety': '品种'
+}
+
+SCHEMAS = ['english', 'chinese']
+
+
+def trading_days(start_date='2020-01-01', end_date=None, days=None):
+    """工作日日历：从 start_date 起 days 个工作日，或 start_date 到 end_date 之间的全部工作日"""
+    start = np.datetime64(pd.Timestamp(start_date).date(), 'D')
+    if days is not None:
+        return np.busday_offset(start, np.arange(days), roll='forward')
+    if end_date is None:
+        raise ValueError("需要指定 end_date 或 days")
+    dates = np.arange(start, np.datetime64(pd.Timestamp(end_date).date(), 'D') + 1)
+    return dates[np.is_busday(dates)]
+
+
+def contract_names(count):
+    """生成 count 个不重复的合约代码（品种 + 四位编号，如 IF2401）"""
+    return [f'{VARIETIES[i % len(VARIETIES)]}{2401 + i // len(VARIETIES)}' for i in range(count)]
+
+
+def generate_futures_data(contracts=6, start_date='2020-01-01', end_date='2023-12-31', days=None, seed=None,
+                          schema='english', extended=None, drift=0.0, volatility=0.02,
+                          price_range=(3000, 5000)):
+    """
+    生成多合约日K线
+
+    参数:
+        contracts: 合约数量，或合约代码列表
+        start_date / end_date: 日期范围（工作日）；指定 days 时从 start_date 起生成 days 个工作日
+        seed: 随机种子（None 时每次不同）
+        schema: 'english'（date, contract, ...）或 'chinese'（交易日, 合约, ...）列名
+        extended: 是否包含成交金额、结算价、前结算价、品种列（默认中文格式包含，英文格式不包含）
+        drift / volatility: 几何布朗运动的日漂移率和日波动率
+        price_range: 各合约初始价格的均匀分布范围
+
+    返回按 (日期, 合约) 排序的 DataFrame；日期为 datetime64，合约和品种为 category。
+    """
+    if schema not in SCHEMAS:
+        raise ValueError(f"不支持的列名格式: {schema}")
+    extended = schema == 'chinese' if extended is None else extended
+
+    names = sorted(contract_names(contracts) if isinstance(contracts, (int, np.integer)) else contracts)
+    dates = trading_days(start_date, end_date, days)
+    n_days, n_contracts = len(dates), len(names)
+    shape = (n_days, n_contracts)
+    rng = np.random.default_rng(seed)
+
+    # 几何布朗运动：对数收益率整块抽样后按交易日累加
+    log_returns = rng.normal(drift - volatility ** 2 / 2, volatility, shape)
+    close = rng.uniform(*price_range, n_contracts) * np.exp(np.cumsum(log_returns, axis=0))
+
+    open_price = close * (1 + rng.normal(0, 0.005, shape))
+    high = np.maximum(open_price, close) * (1 + np.abs(rng.normal(0, 0.01, shape)))
+    low = np.minimum(open_price, close) * (1 - np.abs(rng.normal(0, 0.01, shape)))
+    volume = rng.integers(1000, 10000, shape)
+
+    columns = {
+        'date': np.repeat(dates.astype('datetime64[ns]'), n_contracts),
+        'contract': pd.Categorical.from_codes(np.tile(np.arange(n_contracts), n_days), names),
+        'open': open_price.ravel().round(2),
+        'high': high.ravel().round(2),
+        'low': low.ravel().round(2),
+        'close': close.ravel().round(2),
+        'volume': volume.ravel(),
+        'open_interest': rng.integers(50000, 200000, shape).ravel(),
+    }
+
+    if extended:
+        settle = close * rng.uniform(0.995, 1.005, shape)
+        # 前结算价为同一合约上一交易日的结算价，第一天随机
+        pre_settle = np.empty_like(settle)
+        pre_settle[0] = settle[0] * rng.uniform(0.98, 1.02, n_contracts)
+        pre_settle[1:] = settle[:-1]
+        varieties = pd.Series(names).str.extract(r'^([A-Za-z]+)', expand=False).fillna('')
+        columns.update({
+            'turnover': (volume * close * rng.uniform(0.95, 1.05, shape)).ravel().round(2),
+            'settle': settle.ravel().round(1),
+            'pre_settle': pre_settle.ravel().round(1),
+            'variety': pd.Categorical(np.tile(varieties.to_numpy(), n_days)),
+        })
+
+    df = pd.DataFrame(columns)
+    if schema == 'chinese':
+        df = df[[column for column in CHINESE_COLUMNS if column in df.columns]].rename(columns=CHINESE_COLUMNS)
+    return df
+
+
+def write_data(df, path):
+    """按扩展名写出 CSV / Parquet / Feather"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.parquet', '.pq'):
+        df.to_parquet(path, index=False)
+    elif extension in ('.feather', '.arrow', '.ipc'):
+        df.to_feather(path)
+    elif extension == '.csv':
+        df.to_csv(path, index=False, encoding='utf-8-sig' if CHINESE_COLUMNS['date'] in df.columns else 'utf-8')
+    else:
+        raise ValueError(f"不支持的输出格式: {path}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="生成模拟期货行情")
+    parser.add_argument('output', help="输出文件（扩展名 .csv / .parquet / .feather 决定格式）")
+    parser.add_argument('--contracts', type=int, default=100, help="合约数量")
+    parser.add_argument('--start', default='2020-01-01', help="开始日期")
+    parser.add_argument('--end', default='2023-12-31', help="结束日期")
+    parser.add_argument('--days', type=int, help="交易日数（指定时忽略 --end）")
+    parser.add_argument('--seed', type=int, help="随机种子")
+    parser.add_argument('--schema', choices=SCHEMAS, default='english', help="列名格式")
+    parser.add_argument('--extended', action='store_true', help="英文格式也包含成交金额、结算价等可选列")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = generate_futures_data(args.contracts, args.start, args.end, args.days, args.seed, args.schema,
+                               extended=args.extended or None)
+    generated = time.perf_counter() - start
+    write_data(df, args.output)
+    print(f"✅ 已生成 {len(df):,} 行（{args.contracts} 个合约）: {args.output}，"
+          f"生成用时 {generated:.2f} 秒，总用时 {time.perf_counter() - start:.2f} 秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+测试向量化历史回测
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backtest import run_backtest, simulate_trades
+
+
+def create_test_data(days=120, contracts=4, seed=3):
+    """创建多合约按日期交错排列的K线"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(contracts):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, days)))
+        open_ = close * (1 + rng.normal(0, 0.005, days))
+        frames.append(pd.DataFrame({
+            'date': pd.bdate_range('2023-01-02', periods=days),
+            'contract': f'C{i}',
+            'open': open_,
+            'high': np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, days))),
+            'low': np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, days))),
+            'close': close,
+            'atr': close * 0.015
+        }))
+    df = pd.concat(frames).sort_values(['date', 'contract'], kind='mergesort').reset_index(drop=True)
+    signals = rng.integers(-1, 2, len(df))
+    return df, signals
+
+
+def reference_trades(df, signals, holding_days, stop_multiplier=2.0, take_multiplier=3.0):
+    """逐笔逐日循环的参考实现"""
+    rows = []
+    for contract, group in df.assign(signal=signals).groupby('contract', sort=True):
+        group = group.sort_values('date').reset_index(drop=True)
+        for i in range(len(group) - 1):
+            direction = group.loc[i, 'signal']
+            if direction == 0:
+                continue
+            entry = group.loc[i, 'close']
+            atr = group.loc[i, 'atr']
+            stop = entry - direction * stop_multiplier * atr
+            take = entry + direction * take_multiplier * atr
+            last = min(i + holding_days, len(group) - 1)
+            exit_price, reason, exit_row = group.loc[last, 'close'], '到期', last
+            for j in range(i + 1, last + 1):
+                bar = group.loc[j]
+                if (bar['low'] <= stop) if direction > 0 else (bar['high'] >= stop):
+                    gap = min(stop, bar['open']) if direction > 0 else max(stop, bar['open'])
+                    exit_price, reason, exit_row = gap, '止损', j
+                    break
+                if (bar['high'] >= take) if direction > 0 else (bar['low'] <= take):
+                    gap = max(take, bar['open']) if direction > 0 else min(take, bar['open'])
+                    exit_price, reason, exit_row = gap, '止盈', j
+                    break
+            rows.append({'contract': contract, 'entry_date': group.loc[i, 'date'],
+                         'exit_date': group.loc[exit_row, 'date'], 'exit_reason': reason,
+                         'return': direction * (exit_price - entry) / entry})
+    return pd.DataFrame(rows).sort_values(['entry_date', 'contract'], kind='mergesort').reset_index(drop=True)
+
+
+def test_matches_reference():
+    """测试向量化结果与逐笔循环一致"""
+    print("🧪 测试与逐笔循环一致...")
+
+    df, signals = create_test_data()
+    for holding_days in (1, 5, 10):
+        trades = simulate_trades(df, signals, holding_days=holding_days)
+        expected = reference_trades(df, signals, holding_days)
+        assert len(trades) == len(expected), f"交易数不一致: {len(trades)} != {len(expected)}"
+        same = (
+            (trades['contract'].astype(str).to_numpy() == expected['contract'].to_numpy()).all()
+            and (trades['exit_date'].to_numpy() == expected['exit_date'].to_numpy()).all()
+            and (trades['exit_reason'].astype(str).to_numpy() == expected['exit_reason'].to_numpy()).all()
+            and np.allclose(trades['return'], expected['return'])
+        )
+        assert same, f"持有 {holding_days} 天时的交易结果不一致"
+
+    print("✅ 与逐笔循环一致")
+
+
+def test_stop_and_take_profit():
+    """测试止损、止盈和到期平仓的价格"""
+    print("\n🧪 测试止损止盈...")
+
+    dates = pd.bdate_range('2023-01-02', periods=4)
+    df = pd.DataFrame({
+        'date': np.tile(dates, 3),
+        'contract': np.repeat(['L', 'S', 'T'], 4),
+        'open': [100, 100, 100, 100, 100, 100, 100, 100, 100, 100, 100, 100],
+        'high': [100, 101, 104, 100, 100, 101, 104, 100, 100, 101, 101, 101],
+        'low': [100, 99, 99, 99, 100, 99, 99, 99, 100, 99, 99, 99],
+        'close': [100, 100, 103, 100, 100, 100, 103, 100, 100, 100, 100, 102],
+        'atr': [1.0] * 12
+    })
+    # 做多在第2天最高价 104 触及止盈 103；做空在第2天最高价 104 触及止损 102；T 到期平仓
+    signals = np.array([1, 0, 0, 0, -1, 0, 0, 0, 1, 0, 0, 0])
+    trades = simulate_trades(df, signals, holding_days=3).set_index('contract')
+
+    checks = [
+        (trades.loc['L', 'exit_reason'], '止盈'), (trades.loc['L', 'exit_price'], 103.0),
+        (trades.loc['S', 'exit_reason'], '止损'), (trades.loc['S', 'exit_price'], 102.0),
+        (trades.loc['T', 'exit_reason'], '到期'), (trades.loc['T', 'exit_price'], 102.0),
+        (trades.loc['T', 'holding_days'], 3)
+    ]
+    for actual, expected in checks:
+        assert actual == expected, f"平仓结果不正确: {actual} != {expected}"
+
+    print("✅ 止损止盈正确")
+
+
+def test_equity_and_stats():
+    """测试资金曲线、胜率、盈亏比和回撤"""
+    print("\n🧪 测试资金曲线和统计...")
+
+    df, signals = create_test_data()
+    result = run_backtest(df, signals, holding_days=5, position_size=0.1, initial_capital=1000)
+    trades, equity, stats = result['trades'], result['equity'], result['stats']
+
+    daily = trades.groupby('exit_date')['return'].sum().reindex(equity.index, fill_value=0) * 0.1
+    expected_equity = 1000 * np.cumprod(1 + daily.to_numpy())
+    assert np.allclose(equity['equity'], expected_equity), "资金曲线不正确"
+    assert (equity['drawdown'] <= 0).all() and np.isclose(stats['max_drawdown'], equity['drawdown'].min()), "回撤不正确"
+
+    returns = trades['return']
+    assert np.isclose(stats['hit_rate'], (returns > 0).mean() * 100), "胜率不正确"
+    expected_ratio = returns[returns > 0].mean() / -returns[returns <= 0].mean()
+    assert np.isclose(stats['profit_loss_ratio'], expected_ratio), "盈亏比不正确"
+    assert stats['stop_exits'] + stats['take_profit_exits'] + stats['time_exits'] == stats['trades'], "平仓原因统计不完整"
+
+    print(f"✅ 资金曲线和统计正确（{stats['trades']} 笔交易）")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 历史回测测试")
+    print("=" * 60)
+
+    tests = [test_matches_reference, test_stop_and_take_profit, test_equity_and_stats]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+测试命令行批处理
+"""
+
+import pandas as pd
+import json
+import shutil
+import subprocess
+import tempfile
+import sys
+import os
+from unittest.mock import patch
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import model_factory
+from batch_pipeline import find_sources, process_file, run_batch
+from config import PERFORMANCE_CONFIG
+from test_incremental_features import create_test_data
+
+
+def create_input_dir():
+    """输入目录：正常的CSV和Parquet、缺少收盘价列的CSV、一个非行情文件"""
+    root = tempfile.mkdtemp()
+    data = create_test_data()
+    data.to_csv(os.path.join(root, 'a.csv'), index=False)
+    data.assign(close=data['close'] * 1.01).to_parquet(os.path.join(root, 'b.parquet'), index=False)
+    data.drop(columns=['close']).to_csv(os.path.join(root, 'broken.csv'), index=False)
+    with open(os.path.join(root, 'notes.txt'), 'w') as f:
+        f.write('不是行情文件')
+    return root
+
+
+def test_run_batch():
+    """测试并行处理：正常文件写出最新信号，失败的文件记录原因"""
+    print("🧪 测试批处理...")
+
+    root = create_input_dir()
+    output_dir = os.path.join(root, 'out')
+    try:
+        sources = find_sources([root])
+        assert [os.path.basename(source) for source in sources] == ['a.csv', 'b.parquet', 'broken.csv'], \
+            f"输入文件不正确: {sources}"
+
+        summary = run_batch(sources, output_dir, workers=2, model_type='logistic_regression', file_format='csv')
+        assert summary['status'].tolist() == ['ok', 'ok', 'failed'] and 'close' in summary['message'].iloc[2], \
+            f"处理状态不正确:\n{summary[['source', 'status', 'message']]}"
+
+        # 上市较晚的合约还在指标预热期，没有信号
+        signals = pd.read_csv(summary['output'].iloc[0], parse_dates=['date'])
+        assert len(signals) == 3 and signals['contract'].is_unique and \
+            (signals['date'] == create_test_data()['date'].max()).all(), "应输出每个合约的最新信号"
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print("✅ 批处理结果正确")
+
+
+def test_thread_budget():
+    """测试每个文件的线程数通过参数传给模型，不修改全局配置"""
+    print("\n🧪 测试线程数...")
+
+    root = create_input_dir()
+    model_n_jobs = PERFORMANCE_CONFIG['model_n_jobs']
+    seen = []
+
+    def build_model(model_type, n_jobs=None, params=None):
+        seen.append((n_jobs, PERFORMANCE_CONFIG['model_n_jobs']))
+        return original(model_type, n_jobs=n_jobs, params=params)
+
+    original = model_factory.build_model
+    try:
+        with patch.object(model_factory, 'build_model', build_model):
+            summary = process_file(os.path.join(root, 'a.csv'), root, model_type='logistic_regression', threads=1)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    assert summary['status'] == 'ok' and seen == [(1, model_n_jobs)], f"线程数应通过参数传递且不修改配置: {summary['message']} {seen}"
+
+    print("✅ 线程数通过参数传递")
+
+
+def test_cli():
+    """测试命令行：JSON 输出、汇总表、有文件失败时返回非零状态"""
+    print("\n🧪 测试批处理命令行...")
+
+    root = create_input_dir()
+    output_dir = os.path.join(root, 'out')
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'batch_pipeline.py')
+    try:
+        result = subprocess.run([sys.executable, script, os.path.join(root, 'a.csv'), os.path.join(root, 'broken.csv'),
+                                 '--output-dir', output_dir, '--model', 'logistic_regression', '--format', 'json',
+                                 '--all-bars', '--workers', '1'], capture_output=True, text=True)
+        outputs = sorted(os.listdir(output_dir))
+        summary_file = next((name for name in outputs if name.startswith('summary')), None)
+        signal_file = next((name for name in outputs if name.startswith('a_signals')), None)
+        assert result.returncode == 1 and summary_file is not None and signal_file is not None, \
+            f"命令行运行结果不正确: {result.returncode} {outputs}\n{result.stdout[-500:]}{result.stderr[-500:]}"
+
+        with open(os.path.join(output_dir, summary_file), encoding='utf-8') as f:
+            summary = json.load(f)
+        signals = pd.read_json(os.path.join(output_dir, signal_file))
+        assert [row['status'] for row in summary] == ['ok', 'failed'] and len(signals) == summary[0]['signals'] and \
+            not signals['contract'].is_unique, "汇总表或全部K线的信号不正确"
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print("✅ 批处理命令行正确")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 批处理测试")
+    print("=" * 60)
+
+    tests = [test_run_batch, test_thread_budget, test_cli]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+测试分析流程基准
+"""
+
+import json
+import shutil
+import subprocess
+import tempfile
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_pipeline import compare_results, run_case
+from config import PERFORMANCE_CONFIG
+
+
+def test_run_case():
+    """测试一个规模的测量：各阶段都有记录，不受行数上限影响，配置在结束后恢复"""
+    print("🧪 测试基准规模...")
+
+    max_rows = PERFORMANCE_CONFIG['max_data_rows']
+    PERFORMANCE_CONFIG['max_data_rows'] = 1000
+    try:
+        results = run_case(3000, 10, models=['logistic_regression'], repeat=2)
+        restored = PERFORMANCE_CONFIG['max_data_rows'] == 1000
+    finally:
+        PERFORMANCE_CONFIG['max_data_rows'] = max_rows
+
+    stages = [(result['stage'], result['model']) for result in results]
+    expected = [('load_data', None), ('create_features', None), ('create_target', None),
+                ('train_model', 'logistic_regression'), ('predict_signals', 'logistic_regression'),
+                ('run_backtest', 'logistic_regression')]
+    assert stages == expected and all(result['ok'] and result['repeat'] == 2 for result in results), \
+        f"阶段结果不正确: {stages}"
+    assert results[0]['rows_out'] == 3000 and restored, "基准运行时不应限制行数，结束后应恢复配置"
+
+    # 超过训练行数上限时只测量数据准备阶段
+    results = run_case(3000, 10, models=['logistic_regression'], max_train_rows=1000)
+    assert [result['stage'] for result in results] == ['load_data', 'create_features', 'create_target'], \
+        "超过训练行数上限时不应训练模型"
+
+    print("✅ 基准规模结果正确")
+
+
+def test_regression_check():
+    """测试与基准结果比较：容差、噪声下限、失败的阶段，以及命令行的退出状态"""
+    print("\n🧪 测试性能回退检查...")
+
+    def result(stage, wall_ms, ok=True, model=None):
+        return {'rows': 10000, 'contracts': 10, 'stage': stage, 'model': model, 'ok': ok,
+                'wall_ms': wall_ms, 'message': None if ok else '失败'}
+
+    baseline = [result('load_data', 100), result('create_features', 2), result('train_model', 500, model='lightgbm'),
+                result('run_backtest', 100)]
+    current = [result('load_data', 200), result('create_features', 8), result('train_model', 300, model='lightgbm'),
+               result('run_backtest', None, ok=False), result('create_target', 50)]
+    regressions, improvements = compare_results(current, baseline, tolerance=0.25, min_ms=10)
+    assert [entry['stage'] for entry in regressions] == ['load_data', 'run_backtest'] and \
+        [entry['stage'] for entry in improvements] == ['train_model'] and regressions[0]['ratio'] == 2.0, \
+        f"比较结果不正确: {regressions} {improvements}"
+
+    # 命令行：基准结果快很多时报告回退并以非零状态退出
+    workdir = tempfile.mkdtemp()
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_pipeline.py')
+    command = [sys.executable, script, '--rows', '3000', '--contracts', '10', '--models', 'logistic_regression',
+               '--repeat', '1', '--min-ms', '0']
+    try:
+        output = os.path.join(workdir, 'results.json')
+        first = subprocess.run(command + ['--output', output], capture_output=True, text=True)
+        with open(output, encoding='utf-8') as f:
+            report = json.load(f)
+        assert first.returncode == 0 and len(report['results']) == 6 and 'cpu_count' in report['environment'], \
+            f"结果文件不正确: {first.returncode}\n{first.stdout[-500:]}{first.stderr[-500:]}"
+
+        for entry in report['results']:
+            entry['wall_ms'] /= 100
+        baseline_path = os.path.join(workdir, 'baseline.json')
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f)
+        second = subprocess.run(command + ['--output', output, '--baseline', baseline_path],
+                                capture_output=True, text=True)
+        assert second.returncode == 1 and '❌' in second.stdout, f"应报告性能回退: {second.returncode}\n{second.stdout[-500:]}"
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("✅ 性能回退检查正确")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 分析流程基准测试")
+    print("=" * 60)
+
+    tests = [test_run_case, test_regression_check]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -75,7 +75,7 @@ def test_column_mapping():
     print("\n🧪 测试列名映射功能...")
     
     try:
-        from app import FuturesStrategyAnalyzer
+        from strategy_analyzer import FuturesStrategyAnalyzer
         
         # 创建分析器实例
         analyzer = FuturesStrategyAnalyzer()
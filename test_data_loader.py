@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+测试行情数据分块读取
+"""
+
+import io
+import tempfile
+import shutil
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_loader import read_market_csv, read_market_data, convert_market_file
+
+
+def create_csv_text(rows=500, seed=3):
+    """创建中文列名、含脏数据的测试CSV文本"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=rows // 2)
+    df = pd.DataFrame({
+        '交易日': np.repeat(dates.strftime('%Y-%m-%d'), 2),
+        '合约': np.tile(['IF2401', 'IC2401'], len(dates)),
+        '开盘价': rng.uniform(3000, 5000, len(dates) * 2).round(1),
+        '最高价': rng.uniform(5000, 5100, len(dates) * 2).round(1),
+        '最低价': rng.uniform(2900, 3000, len(dates) * 2).round(1),
+        '收盘价': rng.uniform(3000, 5000, len(dates) * 2).round(1),
+        '成交量': rng.integers(1000, 10000, len(dates) * 2),
+        '持仓量': rng.integers(50000, 200000, len(dates) * 2),
+        '结算价': rng.uniform(3000, 5000, len(dates) * 2).round(1),
+        '品种': np.tile(['IF', 'IC'], len(dates)),
+        '成交金额': rng.uniform(1e9, 5e9, len(dates) * 2).round(2)
+    }).astype({'收盘价': object, '结算价': object})
+    df.loc[7, '收盘价'] = 'N/A'   # 关键列脏数据：整行删除
+    df.loc[9, '结算价'] = '-'     # 可选列脏数据：填充为0
+    return df.to_csv(index=False)
+
+
+def sort_rows(df):
+    """按 (合约, 日期) 排序，分类列转为字符串后比较"""
+    df = df.astype({col: str for col in ['contract', 'variety'] if col in df.columns})
+    return df.sort_values(['contract', 'date']).reset_index(drop=True)
+
+
+def test_chunked_matches_single_read():
+    """测试分块读取与一次性读取结果一致，并转换为紧凑类型"""
+    print("🧪 测试分块读取...")
+
+    text = create_csv_text()
+    chunked, dropped = read_market_csv(io.StringIO(text), chunk_size=37, max_rows=0)
+    single, _ = read_market_csv(io.StringIO(text), chunk_size=10 ** 6, max_rows=0)
+
+    pd.testing.assert_frame_equal(chunked, single, obj="分块读取结果")
+
+    assert len(chunked) == 499 and dropped == 0, f"行数不正确: {len(chunked)}"
+    expected = {'close': np.float32, 'volume': np.int32, 'open_interest': np.int32, 'turnover': np.float64}
+    assert all(chunked[col].dtype == dtype for col, dtype in expected.items()), f"列类型未压缩: {dict(chunked.dtypes)}"
+    # 成交金额保持 float64，不丢失精度
+    assert np.isin(chunked['turnover'], pd.read_csv(io.StringIO(text))['成交金额']).all(), "成交金额精度丢失"
+    assert isinstance(chunked['contract'].dtype, pd.CategoricalDtype), "合约列不是 category 类型"
+    assert not chunked['settle'].isna().any() and chunked['date'].is_monotonic_increasing, "缺失值处理或日期排序不正确"
+
+    print("✅ 分块读取结果正确")
+
+
+def test_max_rows_keeps_latest():
+    """测试超过行数上限时只保留日期最近的行"""
+    print("\n🧪 测试最大行数限制...")
+
+    text = create_csv_text()
+    full, _ = read_market_csv(io.StringIO(text), chunk_size=50, max_rows=0)
+    limited, dropped = read_market_csv(io.StringIO(text), chunk_size=50, max_rows=100)
+
+    assert len(limited) == 100 and dropped == len(full) - 100, f"行数限制不正确: {len(limited)}, 丢弃 {dropped}"
+    assert limited['date'].min() >= full['date'].iloc[-100], "保留的不是最近的数据"
+
+    print("✅ 行数限制正确")
+
+
+def test_missing_columns():
+    """测试缺少必要列时报错"""
+    print("\n🧪 测试缺少必要列...")
+
+    text = "date,contract,open,high,low,close\n2023-01-02,IF2401,1,2,0.5,1.5\n"
+    try:
+        read_market_csv(io.StringIO(text))
+    except ValueError as e:
+        assert 'volume' in str(e) and 'open_interest' in str(e), f"未正确报告缺少的列: {e}"
+        print(f"✅ 正确报错: {e}")
+    else:
+        raise AssertionError("缺少必要列时未报错")
+
+
+def test_columnar_roundtrip():
+    """测试CSV转换为 Parquet / Feather 后读取结果与CSV一致，并支持文件对象"""
+    print("\n🧪 测试列式格式转换...")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        csv_path = os.path.join(work_dir, 'data.csv')
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write(create_csv_text())
+        expected, _ = read_market_data(csv_path, max_rows=0)
+
+        for name in ['data.parquet', 'data.feather']:
+            path = os.path.join(work_dir, name)
+            convert_market_file(csv_path, path)
+            with open(path, 'rb') as f:
+                sources = [path, io.BytesIO(f.read())]
+            sources[1].name = name
+            for source in sources:
+                loaded, _ = read_market_data(source, max_rows=0)
+                # 转换后按 (合约, 日期) 存储，同一日期内的行顺序可能不同
+                pd.testing.assert_frame_equal(sort_rows(loaded), sort_rows(expected), check_categorical=False,
+                                              obj=f"{name} 读取结果")
+
+        print("✅ 列式格式读取结果与CSV一致")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_pushdown_filters():
+    """测试日期范围和合约筛选"""
+    print("\n🧪 测试日期和合约筛选...")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        csv_path = os.path.join(work_dir, 'data.csv')
+        parquet_path = os.path.join(work_dir, 'data.parquet')
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write(create_csv_text())
+        convert_market_file(csv_path, parquet_path)
+
+        full, _ = read_market_data(csv_path, max_rows=0)
+        mask = (full['date'] >= '2023-02-01') & (full['date'] <= '2023-03-31') & (full['contract'] == 'IF2401')
+        expected = full[mask]
+
+        options = {'start_date': '2023-02-01', 'end_date': '2023-03-31', 'contracts': ['IF2401'], 'max_rows': 0}
+        for path in [csv_path, parquet_path]:
+            loaded, _ = read_market_data(path, **options)
+            pd.testing.assert_frame_equal(sort_rows(loaded), sort_rows(expected), check_categorical=False,
+                                          obj="筛选结果")
+
+        print(f"✅ 筛选结果正确（{len(expected)} 行）")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_pushdown_tz_aware_dates():
+    """测试带时区的日期列：筛选下推不报错，不带时区的边界按列时区的本地时间理解"""
+    print("\n🧪 测试带时区日期列的筛选...")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        csv_path = os.path.join(work_dir, 'data.csv')
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write(create_csv_text())
+        full, _ = read_market_data(csv_path, max_rows=0)
+        full['date'] = full['date'].dt.tz_localize('Asia/Shanghai')
+        parquet_path = os.path.join(work_dir, 'data.parquet')
+        full.to_parquet(parquet_path, index=False)
+
+        mask = (full['date'].dt.tz_localize(None) >= '2023-02-01') & \
+            (full['date'].dt.tz_localize(None) <= '2023-03-31') & (full['contract'] == 'IF2401')
+        expected = full[mask]
+
+        options = {'start_date': '2023-02-01', 'end_date': '2023-03-31', 'contracts': ['IF2401'], 'max_rows': 0}
+        loaded, _ = read_market_data(parquet_path, **options)
+        pd.testing.assert_frame_equal(sort_rows(loaded), sort_rows(expected), check_categorical=False,
+                                      obj="带时区日期的筛选结果")
+        assert str(loaded['date'].dt.tz) == 'Asia/Shanghai', f"日期列时区丢失: {loaded['date'].dtype}"
+
+        print(f"✅ 带时区日期列筛选正确（{len(expected)} 行）")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 数据读取测试")
+    print("=" * 60)
+
+    tests = [
+        test_chunked_matches_single_read,
+        test_max_rows_keeps_latest,
+        test_missing_columns,
+        test_columnar_roundtrip,
+        test_pushdown_filters,
+        test_pushdown_tz_aware_dates
+    ]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+测试特征磁盘缓存
+"""
+
+import pandas as pd
+import numpy as np
+import tempfile
+import shutil
+import time
+import sys
+import os
+from unittest.mock import patch
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import feature_cache
+from config import FEATURE_CONFIG
+from feature_cache import FeatureCache, make_cache_key
+
+
+def create_test_frame(rows=200, seed=0):
+    """创建包含日期、合约和数值列的测试表"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'date': pd.date_range('2023-01-01', periods=rows),
+        'contract': np.where(np.arange(rows) % 2 == 0, 'IF2401', 'IC2401'),
+        'close': rng.uniform(3000, 5000, rows),
+        'volume': rng.integers(1000, 10000, rows)
+    })
+
+
+def test_roundtrip_and_key():
+    """测试缓存读写一致，且数据或配置变化时键不同"""
+    print("🧪 测试缓存读写和缓存键...")
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cache = FeatureCache(cache_dir, max_bytes=10 * 1024 * 1024, ttl=3600)
+        df = create_test_frame()
+        key = make_cache_key(df, FEATURE_CONFIG)
+
+        assert cache.get(key) is None, "空缓存不应命中"
+
+        cache.put(key, df)
+        loaded = cache.get(key)
+        pd.testing.assert_frame_equal(df, loaded, check_dtype=False, obj="缓存读出的数据")
+        assert loaded['close'].dtype == np.float64 and pd.api.types.is_datetime64_any_dtype(loaded['date']), "列类型未保留"
+        # 数值列不复制，直接使用只读内存映射
+        base = loaded['close'].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        assert base is not None, "数值列未以内存映射方式读取"
+
+        changed = df.copy()
+        changed.loc[5, 'close'] += 1
+        other_config = dict(FEATURE_CONFIG, rsi_period=7)
+        assert make_cache_key(changed, FEATURE_CONFIG) != key and make_cache_key(df, other_config) != key, \
+            "数据或配置变化后缓存键未变化"
+        # 特征计算逻辑变化时递增版本号，旧条目不再命中
+        with patch('feature_cache.CACHE_FORMAT_VERSION', feature_cache.CACHE_FORMAT_VERSION + 1):
+            assert make_cache_key(df, FEATURE_CONFIG) != key, "缓存版本变化后缓存键未变化"
+
+        print("✅ 缓存读写和缓存键正确")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_roundtrip_extension_dtypes():
+    """测试带时区的日期、分类、字符串、可空整数列读出后类型与写入时相同"""
+    print("\n🧪 测试扩展类型的缓存读写...")
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cache = FeatureCache(cache_dir, max_bytes=10 * 1024 * 1024, ttl=3600)
+        df = create_test_frame(rows=48)
+        # 跨越夏令时切换
+        df['date'] = pd.date_range('2024-03-09', periods=48, freq='h', tz='America/New_York')
+        df['variety'] = df['contract'].str[:2].astype('category')
+        df['volume'] = df['volume'].astype('Int64').where(df.index % 5 != 0)
+
+        cache.put('extension', df)
+        pd.testing.assert_frame_equal(cache.get('extension'), df, obj="缓存读出的扩展类型")
+
+        print("✅ 扩展类型读写一致")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_ttl_expiry():
+    """测试超过TTL的缓存条目失效"""
+    print("\n🧪 测试缓存过期...")
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cache = FeatureCache(cache_dir, max_bytes=10 * 1024 * 1024, ttl=1)
+        df = create_test_frame()
+        cache.put('expiring', df)
+        time.sleep(1.2)
+        assert cache.get('expiring') is None, "过期条目仍然命中"
+
+        print("✅ 过期条目已失效")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_lru_eviction():
+    """测试超过大小上限时淘汰最久未使用的条目"""
+    print("\n🧪 测试LRU淘汰...")
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        df = create_test_frame(rows=5000)
+        probe = FeatureCache(cache_dir, max_bytes=10 * 1024 * 1024, ttl=0)
+        probe.put('probe', df)
+        entry_size = sum(size for _, size, _ in probe._entries())
+        probe.clear()
+
+        # 上限只能容纳两个条目
+        cache = FeatureCache(cache_dir, max_bytes=int(entry_size * 2.5), ttl=0)
+        cache.put('a', df)
+        time.sleep(0.05)
+        cache.put('b', df)
+        time.sleep(0.05)
+        cache.get('a')  # 'a' 变为最近使用
+        time.sleep(0.05)
+        cache.put('c', df)
+
+        assert cache.get('b') is None, "最久未使用的条目未被淘汰"
+        assert cache.get('a') is not None and cache.get('c') is not None, "最近使用的条目被错误淘汰"
+
+        print("✅ LRU淘汰正确")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 特征缓存测试")
+    print("=" * 60)
+
+    tests = [test_roundtrip_and_key, test_roundtrip_extension_dtypes, test_ttl_expiry, test_lru_eviction]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+测试声明式特征流水线
+"""
+
+import numpy as np
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import FEATURE_CONFIG
+from indicators import SegmentIndex
+from feature_pipeline import (
+    FeatureSpec, build_feature_registry, model_feature_columns, plan_features, run_plan
+)
+
+RAW = ['open', 'high', 'low', 'close', 'volume', 'open_interest']
+
+
+def test_topological_order():
+    """测试规划结果中每个特征都排在其输入之后"""
+    print("🧪 测试拓扑排序...")
+
+    registry = build_feature_registry()
+    plan, computable = plan_features(registry, model_feature_columns(), RAW)
+
+    seen = set(RAW)
+    for spec in plan:
+        missing = [name for name in spec.inputs if name not in seen]
+        assert not missing, f"{spec.name} 在输入 {missing} 之前计算"
+        seen.add(spec.name)
+
+    # 缺少成交金额和结算价时，可选特征应被跳过
+    skipped = [name for name in model_feature_columns() if name not in computable]
+    assert sorted(skipped) == sorted(['turnover_ratio', 'avg_price', 'settle_change',
+                                      'close_vs_settle', 'settle_vs_pre_settle']), f"跳过的特征不正确: {skipped}"
+
+    print("✅ 拓扑排序正确")
+
+
+def test_only_requested_features():
+    """测试只计算被请求的特征及其依赖"""
+    print("\n🧪 测试按需计算...")
+
+    plan, _ = plan_features(build_feature_registry(), ['macd_signal'], RAW)
+    names = [spec.name for spec in plan]
+    expected = [f"ema_{FEATURE_CONFIG['macd_fast']}", f"ema_{FEATURE_CONFIG['macd_slow']}",
+                'macd', 'macd_signal']
+    assert names == expected, f"规划包含多余或缺失的特征: {names}"
+
+    print("✅ 只计算请求的特征")
+
+
+def test_shared_intermediates_computed_once():
+    """测试计算内容相同的中间结果只计算一次"""
+    print("\n🧪 测试中间结果去重...")
+
+    calls = []
+    registry = {
+        'ma_20': FeatureSpec('ma_20', ['close'], lambda index, close: calls.append('ma') or close * 2,
+                             key=('sma', 'close', 20)),
+        'bb_mid': FeatureSpec('bb_mid', ['close'], lambda index, close: calls.append('bb') or close * 2,
+                              key=('sma', 'close', 20), intermediate=True),
+        'band': FeatureSpec('band', ['ma_20', 'bb_mid'], lambda index, a, b: a + b),
+    }
+    plan, _ = plan_features(registry, ['band'], ['close'])
+    close = np.arange(5, dtype=float)
+    outputs = run_plan(plan, {'close': close}, SegmentIndex.single(len(close)))
+
+    assert len(calls) == 1, f"相同中间结果被计算了 {len(calls)} 次"
+    assert 'bb_mid' not in outputs and np.allclose(outputs['band'], close * 4), "输出结果不正确"
+
+    print("✅ 中间结果只计算一次")
+
+
+def test_config_drives_windows():
+    """测试移动平均周期由配置决定"""
+    print("\n🧪 测试配置驱动的特征...")
+
+    config = dict(FEATURE_CONFIG, moving_averages=[3, 7])
+    columns = model_feature_columns(config)
+    registry = build_feature_registry(config)
+
+    assert 'price_vs_ma3' in columns and 'price_vs_ma50' not in columns, f"模型特征未按配置生成: {columns}"
+    assert 'ma_7' in registry and 'ma_50' not in registry, "注册表未按配置生成"
+
+    print("✅ 特征由配置决定")
+
+
+def test_cycle_detection():
+    """测试依赖循环会被检测出来"""
+    print("\n🧪 测试依赖循环检测...")
+
+    registry = {
+        'a': FeatureSpec('a', ['b'], lambda index, b: b),
+        'b': FeatureSpec('b', ['a'], lambda index, a: a),
+    }
+    try:
+        plan_features(registry, ['a'], ['close'])
+    except ValueError:
+        print("✅ 依赖循环已检测")
+    else:
+        raise AssertionError("未检测到依赖循环")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 特征流水线测试")
+    print("=" * 60)
+
+    tests = [
+        test_topological_order,
+        test_only_requested_features,
+        test_shared_intermediates_computed_once,
+        test_config_drives_windows,
+        test_cycle_detection
+    ]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
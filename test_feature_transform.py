@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+测试训练与预测共用的特征变换
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sklearn.preprocessing import StandardScaler
+
+from feature_transform import FeatureTransform
+
+FEATURES = ['f1', 'f2', 'f3']
+
+
+def create_test_data(n=200, seed=8):
+    """创建特征表"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(5, 2, size=(n, 3)), columns=FEATURES)
+
+
+def test_transform_matches_scaler():
+    """测试各条路径与 StandardScaler 一致，且与输入列顺序无关"""
+    print("🧪 测试特征变换...")
+
+    df = create_test_data()
+    transform = FeatureTransform(FEATURES).fit(df)
+    expected = StandardScaler().fit(df[FEATURES]).transform(df[FEATURES])
+
+    shuffled = df[['f3', 'f1', 'f2']].assign(extra=1.0)
+    assert np.allclose(transform.transform(shuffled), expected), "打乱列顺序后变换结果不一致"
+
+    row = shuffled.iloc[-1]
+    for name, value in [('Series', row), ('字典', row.to_dict()), ('数组', df.iloc[-1].to_numpy())]:
+        assert np.allclose(transform.transform_row(value), expected[-1:]), f"单行快速路径（{name}）结果不一致"
+    assert np.allclose(transform.transform_last(shuffled), expected[-1:]), "最后一行变换结果不一致"
+
+    try:
+        transform.transform(df[['f1', 'f2']])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("缺少特征列时应报错")
+
+    print("✅ 特征变换与标准化器一致")
+
+
+def test_analyzer_uses_training_transform():
+    """测试 predict_strategy 使用训练时的特征列，与批量信号和保存后加载的模型一致"""
+    print("\n🧪 测试分析器的训练与预测一致...")
+
+    from strategy_analyzer import FuturesStrategyAnalyzer
+    from model_registry import ModelRegistry
+    from test_incremental_features import create_test_data as create_market_data
+    import shutil
+    import tempfile
+
+    analyzer = FuturesStrategyAnalyzer()
+    analyzer.feature_cache = None
+    analyzer.data = create_market_data()
+    analyzer.create_features()
+    analyzer.create_target()
+    success, message = analyzer.train_model('logistic_regression')
+    assert success, message
+
+    target = analyzer.target
+    success, result = analyzer.predict_strategy(target)
+    assert success, result
+
+    # 列顺序打乱后结果不变，且与批量信号的最后一行一致
+    reordered = target[list(reversed(target.columns))]
+    _, reordered_result = analyzer.predict_strategy(reordered)
+    _, batch = analyzer.predict_signals(target, latest_only=False)
+    assert np.allclose(reordered_result['probabilities'], result['probabilities']), "单行预测与批量信号不一致"
+    assert np.allclose(batch.filter(like='prob_').iloc[-1].to_numpy(), result['probabilities']), "单行预测与批量信号不一致"
+
+    success, message = analyzer.predict_strategy(target.drop(columns=['rsi']))
+    assert not success and 'rsi' in message, "缺少特征列时应报错"
+
+    root = tempfile.mkdtemp()
+    try:
+        analyzer.model_registry = ModelRegistry(root)
+        analyzer.save_model()
+        loaded = FuturesStrategyAnalyzer()
+        loaded.model_registry = ModelRegistry(root)
+        loaded.load_model()
+        _, loaded_result = loaded.predict_strategy(target)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    assert loaded.feature_transform.feature_columns == analyzer.feature_transform.feature_columns, "加载的模型预测不一致"
+    assert np.allclose(loaded_result['probabilities'], result['probabilities']), "加载的模型预测不一致"
+
+    print("✅ 训练与预测使用同一特征变换")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 特征变换测试")
+    print("=" * 60)
+
+    tests = [test_transform_matches_scaler, test_analyzer_uses_training_transform]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+测试超参数搜索
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import SEARCH_CONFIG
+from hyperparameter_search import rung_schedule, sample_params, search_brackets, search_hyperparameters
+
+FEATURES = ['f1', 'f2', 'f3']
+
+
+def create_test_data(days=240, contracts=3, seed=2):
+    """创建多合约按日期交错排列、目标变量可由特征预测的样本"""
+    rng = np.random.default_rng(seed)
+    dates = np.repeat(pd.bdate_range('2022-01-03', periods=days), contracts)
+    X = rng.normal(size=(len(dates), 3))
+    signal = X[:, 0] + rng.normal(scale=0.3, size=len(dates))
+    return pd.DataFrame({
+        'date': dates,
+        'contract': np.tile([f'C{i}' for i in range(contracts)], days),
+        'f1': X[:, 0], 'f2': X[:, 1], 'f3': X[:, 2],
+        'target': np.where(signal > 0.5, 1, np.where(signal < -0.5, -1, 0))
+    })
+
+
+def test_schedule_and_sampling():
+    """测试逐次减半的轮次安排和参数采样"""
+    print("🧪 测试轮次安排和参数采样...")
+
+    assert rung_schedule(2, 9, 3) == [(9, 1 / 9), (3, 1 / 3), (1, 1.0)], f"逐次减半轮次不正确: {rung_schedule(2, 9, 3)}"
+    assert search_brackets('random', 10, 1 / 9, 3) == [(0, 10)] and \
+        search_brackets('halving', 10, 1 / 9, 3) == [(2, 10)], "随机搜索或逐次减半的分组不正确"
+    brackets = search_brackets('hyperband', 20, 1 / 9, 3)
+    assert [s for s, _ in brackets] == [2, 1, 0] and abs(sum(n for _, n in brackets) - 20) <= 2, \
+        f"Hyperband 分组不正确: {brackets}"
+
+    for model_type, space in SEARCH_CONFIG['spaces'].items():
+        first = sample_params(space, np.random.default_rng(0))
+        again = sample_params(space, np.random.default_rng(0))
+        assert first == again and json.loads(json.dumps(first)) == first, f"{model_type} 的采样不可复现或无法序列化"
+        for name, spec in space.items():
+            value = first[name]
+            if spec[0] == 'choice':
+                assert value in spec[1], f"{model_type}.{name} 超出候选值"
+            else:
+                assert spec[1] <= value <= spec[2], f"{model_type}.{name} 超出范围"
+
+    print("✅ 轮次安排和参数采样正确")
+
+
+def test_halving_search():
+    """测试逐次减半搜索：数据比例递增、只有保留的组合进入下一轮"""
+    print("\n🧪 测试逐次减半搜索...")
+
+    df = create_test_data()
+    trials, best_params = search_hyperparameters(df, FEATURES, 'logistic_regression', method='halving',
+                                                 n_trials=9, n_splits=3, gap=5, n_jobs=1, cache_dir=False)
+
+    counts = trials.groupby('rung').size().to_dict()
+    assert counts == {0: 9, 1: 3, 2: 1}, f"各轮试验数不正确: {counts}"
+    assert trials['error'].isna().all(), f"试验失败: {trials['error'].dropna().iloc[0]}"
+
+    rung0 = trials[trials['rung'] == 0].sort_values('score', ascending=False)
+    assert set(trials.loc[trials['rung'] == 1, 'trial']) == set(rung0['trial'].head(3)), "进入下一轮的不是得分最高的组合"
+
+    final = trials[trials['fraction'] >= 1].iloc[0]
+    assert json.loads(final['params']) == best_params and final['score'] >= 0.6, \
+        f"最佳参数或得分不正确: {best_params}, {final['score']:.3f}"
+
+    print(f"✅ 逐次减半搜索正确（最佳准确率 {final['score']:.3f}）")
+
+
+def test_early_stopping():
+    """测试梯度提升库的早停和最佳树数量"""
+    print("\n🧪 测试早停...")
+
+    df = create_test_data()
+    for model_type, param in [('xgboost', 'n_estimators'), ('lightgbm', 'n_estimators'),
+                              ('catboost', 'iterations')]:
+        trials, best_params = search_hyperparameters(df, FEATURES, model_type, method='random',
+                                                     n_trials=2, n_splits=2, gap=5, n_jobs=1, cache_dir=False)
+        assert trials['error'].isna().all(), f"{model_type} 试验失败: {trials['error'].dropna().iloc[0]}"
+        best = trials.iloc[0]
+        assert best['best_iteration'] is not None and best_params[param] == int(best['best_iteration']) + 1, \
+            f"{model_type} 未使用早停的最佳迭代次数"
+
+    print("✅ 早停正确")
+
+
+def test_resume_from_cache():
+    """测试中断后重新搜索时读取已完成的试验"""
+    print("\n🧪 测试试验缓存...")
+
+    df = create_test_data()
+    cache_dir = tempfile.mkdtemp()
+    try:
+        first, first_best = search_hyperparameters(df, FEATURES, 'logistic_regression', method='hyperband',
+                                                   n_trials=6, n_splits=3, gap=5, n_jobs=1, cache_dir=cache_dir)
+
+        # 模拟中断：只保留前一半的试验记录，并留下写了一半的行
+        path = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(lines[:len(lines) // 2])
+            f.write(lines[-1][:10])
+
+        resumed, resumed_best = search_hyperparameters(df, FEATURES, 'logistic_regression', method='hyperband',
+                                                       n_trials=6, n_splits=3, gap=5, n_jobs=1, cache_dir=cache_dir)
+        assert resumed['cached'].any() and not resumed['cached'].all(), "中断后应部分命中缓存"
+        assert resumed_best == first_best and np.allclose(resumed['score'], first['score']), "继续搜索的结果与完整搜索不一致"
+
+        again, _ = search_hyperparameters(df, FEATURES, 'logistic_regression', method='hyperband',
+                                          n_trials=6, n_splits=3, gap=5, n_jobs=1, cache_dir=cache_dir)
+        assert again['cached'].all(), "完成后重新搜索应全部命中缓存"
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print("✅ 试验缓存正确")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 超参数搜索测试")
+    print("=" * 60)
+
+    tests = [test_schedule_and_sampling, test_halving_search, test_early_stopping, test_resume_from_cache]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
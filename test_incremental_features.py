@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+测试增量特征计算
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from feature_engine import build_grouped_features
+from incremental_features import IncrementalFeatureState, StreamingFeatureState
+
+
+def create_test_data():
+    """创建多合约测试数据（含一个上市较晚的合约）"""
+    rng = np.random.default_rng(11)
+    dates = pd.bdate_range('2022-01-03', periods=220)
+    frames = []
+    for i, contract in enumerate(['IF2401', 'IC2402', 'IH2403', 'IM2404']):
+        contract_dates = dates if i < 3 else dates[-40:]
+        n = len(contract_dates)
+        close = rng.uniform(3000, 5000) * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        open_price = close * (1 + rng.normal(0, 0.005, n))
+        frames.append(pd.DataFrame({
+            'date': contract_dates,
+            'contract': contract,
+            'open': open_price,
+            'high': np.maximum(open_price, close) * (1 + np.abs(rng.normal(0, 0.01, n))),
+            'low': np.minimum(open_price, close) * (1 - np.abs(rng.normal(0, 0.01, n))),
+            'close': close,
+            'volume': rng.integers(1000, 10000, n),
+            'open_interest': rng.integers(50000, 200000, n)
+        }))
+    return pd.concat(frames).sort_values('date', kind='mergesort').reset_index(drop=True)
+
+
+def assert_matches_full(data, incremental, since):
+    """比较增量结果与全量重算结果中 since 之后的行"""
+    full = build_grouped_features(data)
+    full = full[full['date'] >= since].reset_index(drop=True)
+    incremental = incremental.sort_values(['contract', 'date']).reset_index(drop=True)
+    if len(full) != len(incremental):
+        return [f"行数不一致: {len(full)} != {len(incremental)}"]
+
+    mismatched = []
+    for col in full.columns:
+        if col in ('date', 'contract'):
+            continue
+        if not np.allclose(full[col].to_numpy(float), incremental[col].to_numpy(float),
+                           rtol=1e-9, atol=1e-9, equal_nan=True):
+            mismatched.append(col)
+    return mismatched
+
+
+def test_daily_updates_match_full():
+    """测试逐日追加的增量结果与全量重算一致"""
+    print("🧪 测试逐日增量更新...")
+
+    data = create_test_data()
+    dates = np.sort(data['date'].unique())
+    state = IncrementalFeatureState()
+    state.initialize(data[data['date'] < dates[-5]])
+
+    parts = [state.update(data[data['date'] == day]) for day in dates[-5:]]
+    mismatched = assert_matches_full(data, pd.concat(parts, ignore_index=True), dates[-5])
+    assert not mismatched, f"增量结果与全量重算不一致: {mismatched}"
+
+    print("✅ 逐日增量结果与全量重算一致")
+
+
+def test_multi_day_update_with_new_contract():
+    """测试一次追加多日数据且包含新合约"""
+    print("\n🧪 测试多日追加和新合约...")
+
+    data = create_test_data()
+    dates = np.sort(data['date'].unique())
+    since = dates[-60]
+    state = IncrementalFeatureState()
+    # 新合约 IM2404 在初始化数据中不存在
+    state.initialize(data[data['date'] < since])
+
+    first = state.update(data[(data['date'] >= since) & (data['date'] < dates[-3])])
+    second = state.update(data[data['date'] >= dates[-3]])
+    mismatched = assert_matches_full(data, pd.concat([first, second]), since)
+    assert not mismatched, f"增量结果与全量重算不一致: {mismatched}"
+
+    print("✅ 多日追加和新合约结果正确")
+
+
+def test_rejects_stale_dates():
+    """测试日期不晚于已有数据时拒绝更新"""
+    print("\n🧪 测试拒绝过期日期...")
+
+    data = create_test_data()
+    dates = np.sort(data['date'].unique())
+    state = IncrementalFeatureState()
+    state.initialize(data[data['date'] < dates[-1]])
+
+    try:
+        state.update(data[data['date'] == dates[-2]])
+    except ValueError:
+        print("✅ 过期日期已被拒绝")
+    else:
+        raise AssertionError("过期日期未被拒绝")
+
+
+def test_streaming_bars_match_full():
+    """测试逐根K线的流式特征与全量重算一致（含预热期和新合约）"""
+    print("\n🧪 测试逐根K线流式更新...")
+
+    data = create_test_data()
+    dates = np.sort(data['date'].unique())
+    full = build_grouped_features(data).set_index(['contract', 'date'])
+    for since in (dates[-60], dates[3]):
+        state = IncrementalFeatureState()
+        state.initialize(data[data['date'] < since])
+        stream = StreamingFeatureState.from_state(state)
+
+        for bar in data[data['date'] >= since].to_dict('records'):
+            features = stream.update_bar(bar['contract'], bar['date'], bar)
+            expected = full.loc[(bar['contract'], bar['date'])]
+            mismatched = [name for name, value in features.items()
+                          if not np.isclose(value, expected[name], rtol=1e-9, atol=1e-9, equal_nan=True)]
+            assert not mismatched, f"{bar['contract']} {bar['date']:%Y-%m-%d} 流式特征不一致: {mismatched}"
+
+    try:
+        stream.update_bar(bar['contract'], bar['date'], bar)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("流式更新的过期日期未被拒绝")
+
+    print("✅ 流式特征与全量重算一致")
+
+
+def test_analyzer_update_features():
+    """测试分析器的 update_features 与重新创建特征结果一致"""
+    print("\n🧪 测试分析器增量更新...")
+
+    from strategy_analyzer import FuturesStrategyAnalyzer
+
+    data = create_test_data()
+    dates = np.sort(data['date'].unique())
+    analyzer = FuturesStrategyAnalyzer()
+    analyzer.feature_cache = None
+    analyzer.data = data[data['date'] < dates[-3]].reset_index(drop=True)
+    analyzer.create_features()
+
+    success, message = analyzer.update_features(data[data['date'] >= dates[-3]])
+    assert success, message
+
+    reference = FuturesStrategyAnalyzer()
+    reference.feature_cache = None
+    reference.data = data
+    reference.create_features()
+
+    updated = analyzer.features.sort_values(['contract', 'date']).reset_index(drop=True)
+    expected = reference.features.sort_values(['contract', 'date']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(updated, expected, check_dtype=False, rtol=1e-9, obj="增量更新后的特征表")
+
+    print(f"✅ {message}")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 增量特征测试")
+    print("=" * 60)
+
+    tests = [
+        test_daily_updates_match_full,
+        test_multi_day_update_with_new_contract,
+        test_rejects_stale_dates,
+        test_streaming_bars_match_full,
+        test_analyzer_update_features
+    ]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
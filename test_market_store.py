@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+测试内存映射行情数据集
+"""
+
+import pandas as pd
+import numpy as np
+import tempfile
+import shutil
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from market_store import MarketStore, write_market_store, is_market_store
+
+
+def create_test_data():
+    """创建多合约、日期范围不同的测试数据"""
+    rng = np.random.default_rng(5)
+    frames = []
+    for contract, start, periods in [('IF2401', '2023-01-02', 120), ('IC2402', '2023-03-01', 80),
+                                     ('IH2403', '2023-02-01', 60)]:
+        dates = pd.bdate_range(start, periods=periods)
+        frames.append(pd.DataFrame({
+            'date': dates,
+            'contract': contract,
+            'open': rng.uniform(3000, 5000, periods).astype(np.float32),
+            'high': rng.uniform(5000, 5100, periods).astype(np.float32),
+            'low': rng.uniform(2900, 3000, periods).astype(np.float32),
+            'close': rng.uniform(3000, 5000, periods).astype(np.float32),
+            'volume': rng.integers(1000, 10000, periods).astype(np.int32),
+            'open_interest': rng.integers(50000, 200000, periods).astype(np.int32),
+            'variety': contract[:2]
+        }))
+    return pd.concat(frames).sort_values('date', kind='mergesort').reset_index(drop=True)
+
+
+def normalize(df):
+    """按 (合约, 日期) 排序，分类列转为字符串后比较"""
+    df = df.astype({'contract': str, 'variety': str})
+    return df.sort_values(['contract', 'date']).reset_index(drop=True)
+
+
+def test_roundtrip():
+    """测试写入后完整读取的数据一致，列以内存映射方式打开"""
+    print("🧪 测试数据集读写...")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        data = create_test_data()
+        path = os.path.join(work_dir, 'history.store')
+        write_market_store(data, path)
+
+        store = MarketStore(path)
+        assert is_market_store(path) and len(store) == len(data) and store.summary()['contracts'] == 3, "数据集索引不正确"
+
+        pd.testing.assert_frame_equal(normalize(store.load()), normalize(data), obj="完整读取结果")
+        assert isinstance(store._array('close'), np.memmap), "列未以内存映射方式打开"
+
+        # 覆盖已有数据集：不留下临时目录或旧数据集
+        write_market_store(data.head(100), path)
+        assert len(MarketStore(path)) == 100 and sorted(os.listdir(work_dir)) == ['history.store'], \
+            f"覆盖数据集不正确: {os.listdir(work_dir)}"
+
+        # 不是数据集的非空目录拒绝覆盖，内容保持不变
+        other = os.path.join(work_dir, 'other')
+        os.makedirs(other)
+        with open(os.path.join(other, 'keep.txt'), 'w') as f:
+            f.write('不要删除')
+        try:
+            write_market_store(data, other)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("应拒绝覆盖不是数据集的目录")
+        assert os.listdir(other) == ['keep.txt'] and len(os.listdir(work_dir)) == 2, "拒绝覆盖时不应修改目录"
+
+        print("✅ 数据集读写正确")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_select_contracts_and_dates():
+    """测试按合约和日期范围读取"""
+    print("\n🧪 测试按合约和日期范围读取...")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        data = create_test_data()
+        path = os.path.join(work_dir, 'history.store')
+        write_market_store(data, path)
+        store = MarketStore(path)
+
+        start, end = '2023-03-15', '2023-04-20'
+        loaded = store.load(['IC2402', 'IH2403', 'UNKNOWN'], start, end, columns=['close'])
+        mask = data['contract'].isin(['IC2402', 'IH2403']) & (data['date'] >= start) & (data['date'] <= end)
+        expected = data.loc[mask, ['date', 'contract', 'close', 'variety']]
+
+        pd.testing.assert_frame_equal(normalize(loaded), normalize(expected), obj="按范围读取结果")
+        assert len(store.load(start_date='2030-01-01')) == 0, "范围外不应有数据"
+
+        print(f"✅ 按范围读取正确（{len(loaded)} 行）")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_tz_aware_dates():
+    """测试带时区的日期：按 UTC 内存映射保存，读取时恢复时区，日期边界按本地时间理解"""
+    print("\n🧪 测试带时区的日期...")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        data = create_test_data()
+        # 收盘时间 15:00（北京时间），UTC 为 07:00
+        data['date'] = (data['date'] + pd.Timedelta(hours=15)).dt.tz_localize('Asia/Shanghai')
+        path = os.path.join(work_dir, 'history.store')
+        write_market_store(data, path)
+
+        store = MarketStore(path)
+        assert store._array('date').dtype.kind == 'M', f"日期未保存为 datetime64: {store._array('date').dtype}"
+        pd.testing.assert_frame_equal(normalize(store.load()), normalize(data), obj="带时区的完整读取结果")
+
+        start, end = '2023-03-15', '2023-04-20 15:00'
+        loaded = store.load(['IC2402'], start, end)
+        local = data['date'].dt.tz_localize(None)
+        expected = data[(data['contract'] == 'IC2402') & (local >= start) & (local <= end)]
+        pd.testing.assert_frame_equal(normalize(loaded), normalize(expected), obj="带时区的按范围读取结果")
+        assert loaded['date'].max() == pd.Timestamp('2023-04-20 15:00', tz='Asia/Shanghai'), "结束日期当天的K线应包含在内"
+
+        print(f"✅ 带时区的日期读写正确（{len(loaded)} 行）")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_analyzer_select_data():
+    """测试分析器打开数据集、读取所选范围并创建特征"""
+    print("\n🧪 测试分析器使用数据集...")
+
+    from strategy_analyzer import FuturesStrategyAnalyzer
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        data = create_test_data()
+        path = os.path.join(work_dir, 'history.store')
+        write_market_store(data, path)
+
+        analyzer = FuturesStrategyAnalyzer()
+        analyzer.feature_cache = None
+        success, message = analyzer.open_store(path)
+        assert success and analyzer.data is None, f"打开数据集失败: {message}"
+
+        # 未选择范围时不隐式读取整个数据集
+        success, message = analyzer.create_features()
+        assert not success and analyzer.data is None, "未选择数据范围时应拒绝创建特征"
+
+        success, message = analyzer.select_data(['IF2401'], '2023-02-01', None)
+        assert success and set(analyzer.data['contract'].astype(str)) == {'IF2401'}, f"读取所选数据失败: {message}"
+
+        success, message = analyzer.create_features()
+        assert success and analyzer.features['date'].min() >= pd.Timestamp('2023-02-01'), f"特征创建失败: {message}"
+
+        print("✅ 分析器使用数据集正确")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 内存映射数据集测试")
+    print("=" * 60)
+
+    tests = [test_roundtrip, test_select_contracts_and_dates, test_tz_aware_dates, test_analyzer_select_data]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+测试DataFrame内存压缩
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+from unittest.mock import patch
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from memory_compaction import compact_frame, memory_report
+
+
+def create_test_frame(rows=1000, seed=0):
+    """创建 float64/int64/object 列的测试表"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'date': pd.date_range('2023-01-01', periods=rows),
+        'contract': np.where(np.arange(rows) % 2 == 0, 'IF2401', 'IC2401'),
+        'close': rng.uniform(3000, 5000, rows),
+        'volume': rng.integers(1000, 10000, rows),
+        'target': rng.integers(-1, 2, rows),
+        'turnover': rng.uniform(1e9, 5e9, rows).round(2)
+    })
+
+
+def test_compact_dtypes():
+    """测试压缩后的列类型和数值"""
+    print("🧪 测试紧凑类型...")
+
+    df = create_test_frame()
+    compact = compact_frame(df)
+    expected = {'close': np.float32, 'volume': np.int32, 'target': np.int8, 'turnover': np.float64}
+    assert all(compact[col].dtype == dtype for col, dtype in expected.items()), f"列类型不正确: {dict(compact.dtypes)}"
+    assert isinstance(compact['contract'].dtype, pd.CategoricalDtype), "合约列不是 category 类型"
+    assert np.allclose(compact['close'], df['close'], rtol=1e-6) and compact_frame(compact) is compact, "数值改变或重复压缩"
+    assert df['close'].dtype == np.float64 and np.shares_memory(compact['date'].to_numpy(), df['date'].to_numpy()), \
+        "原表应保持不变，未压缩的列应共享"
+
+    print("✅ 紧凑类型正确")
+
+
+def test_report_counts_shared_columns_once():
+    """测试与前一阶段共享的列不重复计算"""
+    print("\n🧪 测试内存报告...")
+
+    features = compact_frame(create_test_frame())
+    target = features.copy(deep=False)
+    target['future_return'] = np.zeros(len(target), dtype=np.float32)
+
+    report = memory_report({'features': features, 'target': target})
+    assert report.loc['target', 'actual_bytes'] == len(target) * 4, f"共享列被重复计算:\n{report}"
+    assert report.loc['total', 'saved_bytes'] > report.loc['total', 'actual_bytes'], f"节省的字节数不正确:\n{report}"
+
+    print(f"✅ 内存报告正确，共节省 {report.loc['total', 'saved_bytes']:,} 字节")
+
+
+def test_analyzer_compact_pipeline():
+    """测试压缩模式下分析器的特征与非压缩模式一致，目标变量与特征表共享列"""
+    print("\n🧪 测试分析器压缩模式...")
+
+    from strategy_analyzer import FuturesStrategyAnalyzer
+
+    results = {}
+    # 分析器不修改 pandas 的全局选项（如 mode.copy_on_write）
+    with patch.object(pd, 'set_option', side_effect=AssertionError("分析器修改了 pandas 全局选项")):
+        for compact in (False, True):
+            analyzer = FuturesStrategyAnalyzer()
+            analyzer.feature_cache = None
+            analyzer.compact_memory = compact
+            analyzer.load_data('sample_futures_data_new.csv', {})
+            analyzer.create_features()
+            analyzer.create_target()
+            results[compact] = analyzer
+
+    full, compact = results[False], results[True]
+    pd.testing.assert_frame_equal(compact.features, full.features, check_dtype=False,
+                                  check_categorical=False, rtol=1e-5, obj="压缩模式的特征")
+
+    assert np.shares_memory(compact.features['rsi'].to_numpy(), compact.target['rsi'].to_numpy()), "目标变量表复制了特征列"
+
+    report = compact.memory_report()
+    print(f"✅ 压缩模式正确，实际占用 {report.loc['total', 'actual_bytes']:,} 字节，"
+          f"节省 {report.loc['total', 'saved_bytes']:,} 字节")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 内存压缩测试")
+    print("=" * 60)
+
+    tests = [test_compact_dtypes, test_report_counts_shared_columns_once, test_analyzer_compact_pipeline]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+测试模型工厂
+"""
+
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import MODEL_CONFIG
+from model_factory import MODEL_TYPES, THREAD_PARAMS, LabelEncodedClassifier, build_model, resolve_n_jobs
+
+
+def unwrap(model):
+    """取出被标签编码包装的模型"""
+    return model.estimator if isinstance(model, LabelEncodedClassifier) else model
+
+
+def test_config_params_applied():
+    """测试模型参数来自 MODEL_CONFIG，且可以被覆盖"""
+    print("🧪 测试配置参数...")
+
+    for model_type in MODEL_TYPES:
+        params = unwrap(build_model(model_type)).get_params()
+        wrong = {key: value for key, value in MODEL_CONFIG[model_type].items() if params.get(key) != value}
+        assert not wrong, f"{model_type} 参数与配置不一致: {wrong}"
+
+    model = unwrap(build_model('xgboost', params={'max_depth': 6}))
+    assert model.get_params()['max_depth'] == 6 and model.get_params()['tree_method'] == 'hist', "参数覆盖或直方图设置不正确"
+
+    print("✅ 模型参数来自配置")
+
+
+def test_thread_mapping():
+    """测试统一的并行度映射到各库的线程参数"""
+    print("\n🧪 测试线程参数映射...")
+
+    threads = resolve_n_jobs(1)
+    for model_type in MODEL_TYPES:
+        param = THREAD_PARAMS[model_type]
+        if param:
+            assert unwrap(build_model(model_type, n_jobs=1)).get_params()[param] == threads, \
+                f"{model_type} 的 {param} 未设置"
+
+    cpu_count = os.cpu_count() or 1
+    assert resolve_n_jobs(-1) == cpu_count and resolve_n_jobs(10 ** 6) == cpu_count and resolve_n_jobs(-10 ** 6) == 1, \
+        "并行度换算不正确"
+
+    print("✅ 线程参数映射正确")
+
+
+def test_unknown_model():
+    """测试未知模型类型报错"""
+    print("\n🧪 测试未知模型类型...")
+
+    try:
+        build_model('svm')
+    except ValueError:
+        print("✅ 未知模型类型已报错")
+    else:
+        raise AssertionError("未知模型类型未报错")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 模型工厂测试")
+    print("=" * 60)
+
+    tests = [test_config_params_applied, test_thread_mapping, test_unknown_model]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+测试模型库
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+import shutil
+import tempfile
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sklearn.preprocessing import StandardScaler
+
+from model_factory import MODEL_TYPES, build_model
+from model_registry import ModelRegistry, config_hash
+
+FEATURES = ['f1', 'f2', 'f3']
+
+
+def create_test_data(n=300, seed=6):
+    """创建可由特征预测的三分类样本"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 3))
+    y = np.where(X[:, 0] > 0.4, 1, np.where(X[:, 0] < -0.4, -1, 0))
+    return X, y
+
+
+def test_round_trip_all_models():
+    """测试六种模型保存后加载的预测一致"""
+    print("🧪 测试保存和加载...")
+
+    X, y = create_test_data()
+    root = tempfile.mkdtemp()
+    try:
+        registry = ModelRegistry(root)
+        for model_type in MODEL_TYPES:
+            scaler = StandardScaler().fit(X)
+            model = build_model(model_type, n_jobs=1).fit(scaler.transform(X), y)
+            version = registry.save(model, scaler, model_type, FEATURES, metrics={'accuracy': 0.5})
+
+            loaded, loaded_scaler, meta = registry.load(version)
+            expected = model.predict_proba(scaler.transform(X))
+            actual = loaded.predict_proba(loaded_scaler.transform(X))
+            assert np.allclose(expected, actual), f"{model_type} 加载后概率不一致"
+            assert list(np.asarray(loaded.classes_).ravel()) == [-1, 0, 1], f"{model_type} 加载后类别不正确"
+            predictions = np.asarray(loaded.predict(loaded_scaler.transform(X))).ravel()
+            assert np.array_equal(predictions, np.asarray(model.predict(scaler.transform(X))).ravel()), \
+                f"{model_type} 加载后预测不一致"
+            assert meta['feature_columns'] == FEATURES and meta['config_hash'] == config_hash(model_type, FEATURES), \
+                f"{model_type} 元数据不正确"
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print("✅ 六种模型保存和加载一致")
+
+
+def test_versions():
+    """测试版本号递增、最新版本和删除"""
+    print("\n🧪 测试版本管理...")
+
+    X, y = create_test_data()
+    root = tempfile.mkdtemp()
+    try:
+        registry = ModelRegistry(root, compress=0)
+        assert registry.latest_version() is None and registry.load() is None, "空模型库应没有版本"
+
+        scaler = StandardScaler().fit(X)
+        for _ in range(3):
+            registry.save(build_model('random_forest', n_jobs=1).fit(scaler.transform(X), y), scaler,
+                          'random_forest', FEATURES)
+        os.makedirs(os.path.join(root, '.tmp-unfinished'))
+
+        assert [meta['version'] for meta in registry.versions()] == [1, 2, 3] and registry.latest_version() == 3, \
+            "版本号不正确"
+
+        _, _, meta = registry.load()
+        assert meta['version'] == 3, "默认应加载最新版本"
+
+        registry.delete(3)
+        assert registry.latest_version() == 2, "删除版本后最新版本不正确"
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print("✅ 版本管理正确")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 模型库测试")
+    print("=" * 60)
+
+    tests = [test_round_trip_all_models, test_versions]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+测试多模型并行训练
+"""
+
+import warnings
+import numpy as np
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import xgboost as xgb
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from model_factory import LabelEncodedClassifier, set_thread_budget
+from model_training import train_all_models
+
+
+def create_test_data(rows=600, seed=2):
+    """创建标签为 -1/0/1 的样本"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, 4))
+    y = np.where(X[:, 0] > 0.5, 1, np.where(X[:, 0] < -0.5, -1, 0))
+    return X, y
+
+
+def test_label_encoded_classifier():
+    """测试 -1/0/1 标签经编码后可用于 XGBoost，预测结果还原为原标签"""
+    print("🧪 测试标签编码...")
+
+    X, y = create_test_data()
+    model = LabelEncodedClassifier(xgb.XGBClassifier(n_estimators=20, max_depth=2)).fit(X, y)
+    predictions = model.predict(X)
+    assert set(np.unique(predictions)) <= {-1, 0, 1} and (predictions == y).mean() >= 0.9, \
+        f"预测标签不正确: {np.unique(predictions)}"
+
+    print("✅ 标签编码正确")
+
+
+def test_thread_budget():
+    """测试线程参数设置到嵌套模型上"""
+    print("\n🧪 测试线程预算...")
+
+    model = set_thread_budget(LabelEncodedClassifier(xgb.XGBClassifier()), 3, 'xgboost')
+    forest = set_thread_budget(RandomForestClassifier(), 2, 'random_forest')
+    assert model.get_params()['estimator__n_jobs'] == 3 and forest.n_jobs == 2, "线程参数未设置"
+
+    # 没有线程参数的模型类型不设置 n_jobs（LogisticRegression 的 n_jobs 已弃用）
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        logistic = set_thread_budget(LogisticRegression(), 2, 'logistic_regression')
+        logistic.fit(np.arange(20.0).reshape(-1, 1), np.arange(20) % 2)
+    assert logistic.n_jobs is None, "不应设置 LogisticRegression 的线程参数"
+
+    print("✅ 线程预算设置正确")
+
+
+def test_leaderboard():
+    """测试排行榜包含全部模型的指标，失败的模型记录错误"""
+    print("\n🧪 测试多模型排行榜...")
+
+    X, y = create_test_data()
+    estimators = {
+        'logistic_regression': LogisticRegression(max_iter=1000),
+        'random_forest': RandomForestClassifier(n_estimators=20, random_state=0),
+        'xgboost': LabelEncodedClassifier(xgb.XGBClassifier(n_estimators=20, max_depth=2)),
+        'broken': LogisticRegression(C=-1.0)
+    }
+    leaderboard, models = train_all_models(estimators, X[:450], y[:450], X[450:], y[450:], n_jobs=2)
+
+    expected = {'accuracy', 'fit_time', 'batch_predict_time', 'single_predict_ms', 'threads'}
+    assert set(leaderboard.index) == set(estimators) and expected <= set(leaderboard.columns), \
+        f"排行榜格式不正确: {list(leaderboard.columns)}"
+    assert set(models) == {'logistic_regression', 'random_forest', 'xgboost'} and leaderboard.index[-1] == 'broken', \
+        "失败的模型处理不正确"
+    assert leaderboard['accuracy'].dropna().is_monotonic_decreasing and leaderboard['accuracy'].max() >= 0.8, \
+        f"排行榜排序或准确率不正确:\n{leaderboard}"
+
+    print(f"✅ 排行榜正确:\n{leaderboard[['accuracy', 'fit_time', 'single_predict_ms']]}")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 多模型训练测试")
+    print("=" * 60)
+
+    tests = [test_label_encoded_classifier, test_thread_budget, test_leaderboard]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
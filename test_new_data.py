@@ -38,7 +38,7 @@ def test_new_data_structure():
         print(f"✅ 可选列: {existing_optional}")
         
         # 测试数据加载功能
-        from app import FuturesStrategyAnalyzer
+        from strategy_analyzer import FuturesStrategyAnalyzer
         
         analyzer = FuturesStrategyAnalyzer()
         
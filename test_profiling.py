@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+测试阶段性能记录
+"""
+
+import json
+import logging
+import shutil
+import tempfile
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from profiling import StageProfiler, hot_spots, logger
+from test_incremental_features import create_test_data
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(record.getMessage())
+
+
+def test_analyzer_stages_recorded():
+    """测试分析器各阶段的耗时、行数、失败状态和 JSON 日志"""
+    print("🧪 测试阶段记录...")
+
+    from strategy_analyzer import FuturesStrategyAnalyzer
+
+    capture = _Capture()
+    logger.addHandler(capture)
+    logger.setLevel(logging.INFO)
+    try:
+        analyzer = FuturesStrategyAnalyzer()
+        analyzer.feature_cache = None
+        analyzer.create_target()
+        analyzer.data = create_test_data()
+        analyzer.create_features()
+        analyzer.create_target()
+    finally:
+        logger.removeHandler(capture)
+
+    records = analyzer.profiler.records
+    assert [record['stage'] for record in records] == ['create_target', 'create_features', 'create_target'], \
+        f"阶段记录不正确: {[record['stage'] for record in records]}"
+    failed, features, target = records
+    assert not failed['ok'] and '请先创建特征' in failed['message'], "失败的阶段应记录为失败"
+    assert (features['rows_in'], features['rows_out']) == (len(analyzer.data), len(analyzer.features)) and \
+        (target['rows_in'], target['rows_out']) == (len(analyzer.features), len(analyzer.target)), "输入输出行数不正确"
+    assert all(record['wall_ms'] >= 0 and record['cpu_ms'] >= 0 and record['peak_rss_mb'] for record in records), \
+        "缺少耗时或内存"
+
+    logged = [json.loads(line) for line in capture.lines]
+    assert [entry['stage'] for entry in logged] == [record['stage'] for record in records], "每次调用应写一行 JSON 日志"
+
+    summary = analyzer.profiler.summary()
+    assert summary.loc['create_target', 'calls'] == 2, "汇总表不正确"
+
+    print("✅ 阶段记录正确")
+
+
+def test_tracemalloc_and_cprofile():
+    """测试 tracemalloc 内存统计、cProfile 结果只作用于最外层阶段"""
+    print("\n🧪 测试内存分配和 cProfile...")
+
+    profile_dir = tempfile.mkdtemp()
+    try:
+        profiler = StageProfiler(enabled=True, trace_memory=True, profile_dir=profile_dir)
+        with profiler.measure('outer'):
+            with profiler.measure('inner'):
+                block = bytearray(8 * 1024 * 1024)
+            del block
+
+        inner, outer = profiler.records
+        assert outer['alloc_peak_mb'] >= 8 and 'alloc_peak_mb' not in inner and inner['depth'] == 1, \
+            f"内存分配统计不正确: {outer.get('alloc_peak_mb')}"
+        assert 'profile' not in inner and os.path.exists(outer['profile']) and \
+            'function calls' in hot_spots(outer['profile']), "cProfile 结果不正确"
+
+        try:
+            with profiler.measure('broken'):
+                raise RuntimeError("测试异常")
+        except RuntimeError:
+            pass
+        assert not profiler.records[-1]['ok'] and 'RuntimeError' in profiler.records[-1]['message'], "抛出异常的阶段应记录为失败"
+    finally:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+    print("✅ 内存分配和 cProfile 正确")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 阶段性能记录测试")
+    print("=" * 60)
+
+    tests = [test_analyzer_stages_recorded, test_tracemalloc_and_cprofile]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+测试组合风险引擎
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backtest import simulate_trades
+from risk_engine import _daily_rows, position_weights, simulate_portfolio
+
+
+def create_test_data(days=150, contracts=6, seed=5):
+    """创建多合约K线和随机信号（部分合约晚上市）"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    calendar = pd.bdate_range('2023-01-02', periods=days)
+    for i in range(contracts):
+        start = 0 if i % 2 == 0 else 20
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, days - start)))
+        frames.append(pd.DataFrame({
+            'date': calendar[start:],
+            'contract': f'C{i}',
+            'open': close,
+            'high': close * (1 + np.abs(rng.normal(0, 0.01, days - start))),
+            'low': close * (1 - np.abs(rng.normal(0, 0.01, days - start))),
+            'close': close,
+            'atr': close * 0.02
+        }))
+    df = pd.concat(frames).sort_values(['date', 'contract'], kind='mergesort').reset_index(drop=True)
+    return df, rng.integers(-1, 2, len(df))
+
+
+def reference_portfolio(df, signals, holding_days, max_position_size, max_daily_loss, max_drawdown,
+                        risk_per_trade):
+    """逐日循环的参考实现，返回每日组合收益"""
+    trades = simulate_trades(df, signals, holding_days)
+    weight = position_weights(trades, holding_days, max_position_size, risk_per_trade)
+    all_dates = np.unique(df['date'].to_numpy())
+    row_trade, row_day, row_return = _daily_rows(df, trades, all_dates)
+    entry_day = np.searchsorted(all_dates, trades['entry_date'].to_numpy())
+    exit_day = np.searchsorted(all_dates, trades['exit_date'].to_numpy())
+
+    active = np.ones(len(trades), dtype=bool)
+    last_day = exit_day.copy()
+    equity, peak = 1.0, 1.0
+    daily = np.zeros(len(all_dates))
+    for day in range(len(all_dates)):
+        on_day = (row_day == day) & active[row_trade] & (row_day <= last_day[row_trade])
+        daily[day] = (row_return[on_day] * weight[row_trade[on_day]]).sum()
+        equity *= 1 + daily[day]
+        peak = max(peak, equity)
+        if equity / peak - 1 < -max_drawdown:
+            open_now = active & (entry_day < day) & (last_day > day)
+            last_day[open_now] = day
+            active[entry_day >= day] = False
+            daily[day + 1:] = 0
+            break
+        if daily[day] < -max_daily_loss:
+            open_now = active & (entry_day < day) & (last_day > day)
+            last_day[open_now] = day
+            active[entry_day == day] = False
+    return daily
+
+
+def test_no_limits_matches_backtest():
+    """测试不触发风控时逐日结算的收益与回测的逐笔收益一致"""
+    print("🧪 测试无风控时与回测一致...")
+
+    df, signals = create_test_data()
+    result = simulate_portfolio(df, signals, holding_days=5, max_daily_loss=1.0, max_drawdown=1.0)
+    trades = simulate_trades(df, signals, 5)
+
+    assert result['events'].empty and not result['stats']['blocked_trades'], "不应触发风控"
+    assert np.allclose(result['trades']['return'], trades['return']), "逐日结算的交易收益与回测不一致"
+    assert result['trades']['weight'].max() <= 0.1 / 5 + 1e-12, "单笔仓位超过限制"
+
+    print("✅ 无风控时与回测一致")
+
+
+def test_limits_match_reference():
+    """测试日亏损和回撤限制与逐日循环一致"""
+    print("\n🧪 测试风控限制...")
+
+    df, signals = create_test_data()
+    for max_daily_loss, max_drawdown in [(0.002, 1.0), (1.0, 0.01), (0.003, 0.02)]:
+        result = simulate_portfolio(df, signals, holding_days=5, max_position_size=0.2, max_daily_loss=max_daily_loss,
+                                    max_drawdown=max_drawdown, risk_per_trade=0.02, initial_capital=1.0)
+        expected = reference_portfolio(df, signals, 5, 0.2, max_daily_loss, max_drawdown, 0.02)
+        assert np.allclose(result['equity']['daily_return'].to_numpy(), expected), \
+            f"每日收益与逐日循环不一致（日亏损 {max_daily_loss}，回撤 {max_drawdown}）"
+        assert len(result['events']), "应触发风控事件"
+
+    print("✅ 风控限制与逐日循环一致")
+
+
+def test_drawdown_halts_trading():
+    """测试触及最大回撤后平仓并停止交易"""
+    print("\n🧪 测试最大回撤停止交易...")
+
+    df, signals = create_test_data()
+    result = simulate_portfolio(df, signals, holding_days=5, max_daily_loss=1.0, max_drawdown=0.01)
+    equity, stats = result['equity'], result['stats']
+    assert stats['halted'], "应触及最大回撤"
+
+    halt_date = result['events'].iloc[-1]['date']
+    after = equity[equity.index > halt_date]
+    assert (after['open_positions'] == 0).all() and (after['daily_return'] == 0).all(), "停止交易后仍有持仓或收益"
+    assert (result['trades'].loc[~result['trades']['blocked'], 'entry_date'] < halt_date).all(), "停止交易后仍有开仓"
+
+    print("✅ 最大回撤停止交易正确")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 组合风险引擎测试")
+    print("=" * 60)
+
+    tests = [test_no_limits_matches_backtest, test_limits_match_reference, test_drawdown_halts_trading]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
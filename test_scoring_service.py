@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+测试实时打分服务
+"""
+
+import pandas as pd
+import numpy as np
+import http.client
+import json
+import threading
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_factory import build_model
+from scoring_service import ScoringService, make_server, single_row_predictor
+from test_incremental_features import create_test_data
+
+
+def train_analyzer(history, model_type='logistic_regression'):
+    """在历史数据上创建特征并训练模型"""
+    from strategy_analyzer import FuturesStrategyAnalyzer
+
+    analyzer = FuturesStrategyAnalyzer()
+    analyzer.feature_cache = None
+    analyzer.data = history
+    analyzer.create_features()
+    analyzer.create_target()
+    analyzer.train_model(model_type)
+    return analyzer
+
+
+def test_single_row_predictor():
+    """测试单行预测快速路径与 predict_proba 一致"""
+    print("🧪 测试单行预测快速路径...")
+
+    rng = np.random.default_rng(9)
+    X = rng.normal(size=(400, 5))
+    y = np.where(X[:, 0] > 0.4, 1, np.where(X[:, 0] < -0.4, -1, 0))
+    for model_type in ['random_forest', 'lightgbm', 'logistic_regression']:
+        model = build_model(model_type, n_jobs=1).fit(X, y)
+        predict = single_row_predictor(model)
+        for i in range(20):
+            assert np.allclose(predict(X[i:i + 1]), model.predict_proba(X[i:i + 1])), f"{model_type} 快速路径概率不一致"
+
+    print("✅ 单行预测快速路径一致")
+
+
+def test_service_matches_predict_strategy():
+    """测试逐根打分结果与对全量特征调用 predict_strategy 一致"""
+    print("\n🧪 测试服务打分结果...")
+
+    data = create_test_data()
+    dates = np.sort(data['date'].unique())
+    history = data[data['date'] < dates[-5]].reset_index(drop=True)
+    analyzer = train_analyzer(history, 'random_forest')
+    service = ScoringService(analyzer)
+
+    reference = train_analyzer(history, 'random_forest')
+    reference.data = data
+    reference.create_features()
+    features = reference.features.set_index(['contract', 'date'])
+
+    for bar in data[data['date'] >= dates[-5]].to_dict('records'):
+        result = service.score(bar)
+        if not result['ready']:
+            continue
+        _, expected = analyzer.predict_strategy(features.loc[[(bar['contract'], bar['date'])]])
+        assert result['action'] == expected['action'] and \
+            np.allclose(result['probabilities'], expected['probabilities']) and \
+            np.isclose(result['current_price'], expected['current_price']), \
+            f"{bar['contract']} {bar['date']:%Y-%m-%d} 打分结果与 predict_strategy 不一致"
+
+    print("✅ 服务打分与 predict_strategy 一致")
+
+
+def test_http_round_trip():
+    """测试 HTTP 接口：打分、健康检查、错误请求"""
+    print("\n🧪 测试 HTTP 接口...")
+
+    data = create_test_data()
+    dates = np.sort(data['date'].unique())
+    analyzer = train_analyzer(data[data['date'] < dates[-1]].reset_index(drop=True))
+    server = make_server(ScoringService(analyzer), host='127.0.0.1', port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection(*server.server_address[:2])
+        bars = data[data['date'] == dates[-1]].assign(date=lambda df: df['date'].dt.strftime('%Y-%m-%d'))
+        for bar in bars.to_dict('records'):
+            conn.request('POST', '/score', json.dumps(bar))
+            response = conn.getresponse()
+            result = json.loads(response.read())
+            assert response.status == 200 and result['contract'] == bar['contract'] and 'ready' in result, \
+                f"打分请求失败: {result}"
+
+        # 重复发送同一根K线应被拒绝
+        conn.request('POST', '/score', json.dumps(bar))
+        response = conn.getresponse()
+        rejected = json.loads(response.read())
+        conn.request('GET', '/health')
+        health = json.loads(conn.getresponse().read())
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response.status == 400 and 'error' in rejected, "过期日期应返回400"
+    assert health['scored'] == len(bars) and health['contracts'] == data['contract'].nunique(), f"健康检查不正确: {health}"
+
+    print("✅ HTTP 接口正确")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 实时打分服务测试")
+    print("=" * 60)
+
+    tests = [test_single_row_predictor, test_service_matches_predict_strategy, test_http_round_trip]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
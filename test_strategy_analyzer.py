@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+测试分析核心：延迟导入、目标变量、历史信号缓存
+"""
+
+import subprocess
+import numpy as np
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_imports import heavy_imports
+from test_incremental_features import create_test_data
+
+
+def test_core_imports_are_lightweight():
+    """测试分析核心和命令行入口不导入 Streamlit、scikit-learn、模型库和绘图库"""
+    print("🧪 测试延迟导入...")
+
+    for module in ['strategy_analyzer', 'scoring_service', 'convert_data']:
+        heavy = heavy_imports(module)
+        assert not heavy, f"导入 {module} 时导入了: {', '.join(heavy)}"
+
+    print("✅ 分析核心不导入重型库")
+
+
+def test_training_imports_on_demand():
+    """测试特征工程不导入 scikit-learn，训练时才导入，训练后可以正常预测"""
+    print("\n🧪 测试按需导入...")
+
+    script = """
+import sys
+from strategy_analyzer import FuturesStrategyAnalyzer
+from test_incremental_features import create_test_data
+
+analyzer = FuturesStrategyAnalyzer()
+analyzer.feature_cache = None
+analyzer.data = create_test_data()
+analyzer.create_features()
+analyzer.create_target()
+print('sklearn' in sys.modules)
+print(analyzer.train_model('logistic_regression')[0])
+print(analyzer.predict_strategy(analyzer.target)[0])
+"""
+    result = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True)
+    assert result.stdout.split()[-3:] == ['False', 'True', 'True'], \
+        f"运行结果不正确: {result.stdout.split()[-3:]} {result.stderr[-300:]}"
+
+    print("✅ 训练时按需导入")
+
+
+def test_target_excludes_unknown_horizon():
+    """测试没有未来收益的K线不参与训练：每个合约去掉最后 lookforward_days 行"""
+    print("\n🧪 测试目标变量的预测区间...")
+
+    from strategy_analyzer import FuturesStrategyAnalyzer
+
+    analyzer = FuturesStrategyAnalyzer()
+    analyzer.feature_cache = None
+    analyzer.data = create_test_data()
+    analyzer.create_features()
+    success, message = analyzer.create_target(lookforward_days=5)
+    assert success, message
+
+    training, _ = analyzer._training_frame()
+    features = analyzer.features
+    assert training['future_return'].notna().all(), "训练数据中有没有未来收益的行"
+    feature_rows = features.groupby('contract', observed=True).size()
+    training_rows = training.groupby('contract', observed=True).size()
+    assert (training_rows == feature_rows - 5).all(), \
+        f"每个合约应去掉最后 5 行: {(feature_rows - training_rows).to_dict()}"
+    last_dates = training.groupby('contract', observed=True)['date'].max()
+    assert (last_dates < features.groupby('contract', observed=True)['date'].max()).all()
+
+    # 历史信号（回测、风险模拟）同样不含这些行
+    success, message = analyzer.train_model('logistic_regression')
+    assert success, message
+    signal_rows, signals = analyzer._historical_signals()
+    assert len(signal_rows) == len(training) == len(signals)
+
+    print("✅ 没有未来收益的K线不参与训练")
+
+
+def test_signal_cache_invalidation():
+    """测试历史信号缓存：同一模型重复使用，重新训练或重建目标变量后重新预测"""
+    print("\n🧪 测试历史信号缓存...")
+
+    from strategy_analyzer import FuturesStrategyAnalyzer
+
+    analyzer = FuturesStrategyAnalyzer()
+    analyzer.feature_cache = None
+    analyzer._pending_model_version = None
+    analyzer.data = create_test_data()
+    analyzer.create_features()
+    analyzer.create_target(lookforward_days=5)
+    analyzer.train_model('logistic_regression')
+
+    rows, signals = analyzer._historical_signals()
+    assert analyzer._historical_signals()[1] is signals, "同一模型应使用缓存的信号"
+
+    # 替换模型后立即释放缓存（旧模型的 id 可能被新对象复用，不能作为缓存键）
+    success, message = analyzer.train_model('random_forest')
+    assert success, message
+    assert analyzer._signal_cache is None, "重新训练后应丢弃缓存的信号"
+    _, retrained = analyzer._historical_signals()
+    expected = analyzer.model.predict(analyzer.feature_transform.transform(rows))
+    assert retrained is not signals and np.array_equal(retrained, expected), "重新训练后应使用新模型的信号"
+
+    analyzer.create_target(lookforward_days=3)
+    rows, _ = analyzer._historical_signals()
+    assert len(rows) == len(analyzer._training_frame()[0]), "重建目标变量后应重新预测"
+
+    print("✅ 历史信号缓存正确失效")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 分析核心测试")
+    print("=" * 60)
+
+    tests = [test_core_imports_are_lightweight, test_training_imports_on_demand, test_target_excludes_unknown_horizon,
+             test_signal_cache_invalidation]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+测试批量策略信号
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from feature_transform import FeatureTransform
+from strategy_signals import batch_signals, latest_bars
+
+FEATURES = ['f1', 'f2']
+
+
+def create_test_data(days=60, contracts=5, seed=4):
+    """创建多合约K线、特征和训练好的模型"""
+    rng = np.random.default_rng(seed)
+    n = days * contracts
+    df = pd.DataFrame({
+        'date': np.repeat(pd.bdate_range('2023-01-02', periods=days), contracts),
+        'contract': np.tile([f'C{i}' for i in range(contracts)], days),
+        'close': 100 + rng.normal(0, 5, n),
+        'atr': np.abs(rng.normal(2, 0.5, n)),
+        'f1': rng.normal(size=n),
+        'f2': rng.normal(size=n)
+    })
+    df.loc[3, 'atr'] = np.nan
+    target = np.where(df['f1'] > 0.4, 1, np.where(df['f1'] < -0.4, -1, 0))
+    scaler = StandardScaler().fit(df[FEATURES])
+    model = LogisticRegression(max_iter=1000).fit(scaler.transform(df[FEATURES]), target)
+    return df, model, scaler
+
+
+def scalar_signal(model, scaler, row):
+    """与原 predict_strategy 相同的单行标量计算"""
+    X = scaler.transform(row[FEATURES])
+    prediction = model.predict(X)[0]
+    probabilities = model.predict_proba(X)[0]
+    price = row['close'].iloc[0]
+    atr = row['atr'].iloc[0] if pd.notna(row['atr'].iloc[0]) else price * 0.02
+    if prediction == 1:
+        stop_loss, take_profit = price - atr * 2, price + atr * 3
+    elif prediction == -1:
+        stop_loss, take_profit = price + atr * 2, price - atr * 3
+    else:
+        stop_loss, take_profit = None, None
+    ratio = 0
+    if stop_loss is not None:
+        risk = abs(price - stop_loss)
+        ratio = abs(take_profit - price) / risk if risk > 0 else 0
+    return prediction, stop_loss, take_profit, max(probabilities) * 100, ratio
+
+
+def test_matches_scalar():
+    """测试批量结果与逐行标量计算一致"""
+    print("🧪 测试与逐行计算一致...")
+
+    df, model, scaler = create_test_data()
+    signals = batch_signals(model, FeatureTransform(FEATURES, scaler), df)
+    assert len(signals) == len(df), "行数不一致"
+
+    for i in range(len(df)):
+        prediction, stop_loss, take_profit, success_rate, ratio = scalar_signal(model, scaler, df.iloc[i:i + 1])
+        row = signals.iloc[i]
+        assert row['prediction'] == prediction and np.isclose(row['success_rate'], success_rate), f"第 {i} 行预测不一致"
+        if stop_loss is None:
+            assert pd.isna(row['stop_loss']) and pd.isna(row['take_profit']) and row['action'] == '持有', \
+                f"第 {i} 行持有信号不应有止损止盈"
+        else:
+            assert np.isclose(row['stop_loss'], stop_loss) and np.isclose(row['take_profit'], take_profit) and \
+                np.isclose(row['profit_loss_ratio'], ratio), f"第 {i} 行止损止盈不一致"
+
+    print("✅ 与逐行计算一致")
+
+
+def test_latest_bars():
+    """测试每个合约取最新K线"""
+    print("\n🧪 测试最新K线...")
+
+    df, model, scaler = create_test_data()
+    shuffled = df.sample(frac=1, random_state=0)
+    latest = latest_bars(shuffled)
+    assert list(latest['contract']) == sorted(df['contract'].unique()) and (latest['date'] == df['date'].max()).all(), \
+        "最新K线不正确"
+
+    signals = batch_signals(model, FeatureTransform(FEATURES, scaler), latest)
+    assert np.allclose(signals[['prob_-1', 'prob_0', 'prob_1']].sum(axis=1), 1), "概率列不正确"
+
+    print("✅ 最新K线正确")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 批量策略信号测试")
+    print("=" * 60)
+
+    tests = [test_matches_scalar, test_latest_bars]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+测试模拟行情生成器
+"""
+
+import numpy as np
+import shutil
+import tempfile
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_loader import read_market_data
+from synthetic_data import generate_futures_data, trading_days, write_data
+
+
+def test_generated_bars():
+    """测试交易日历、种子可重现、价格关系和前结算价"""
+    print("🧪 测试模拟行情...")
+
+    dates = trading_days('2024-01-05', '2024-01-16')
+    assert [str(date) for date in dates] == ['2024-01-05', '2024-01-08', '2024-01-09', '2024-01-10', '2024-01-11',
+                                             '2024-01-12', '2024-01-15', '2024-01-16'], f"交易日历不正确: {dates}"
+    assert len(trading_days('2024-01-06', days=10)) == 10 and \
+        str(trading_days('2024-01-06', days=1)[0]) == '2024-01-08', "交易日历不正确"
+
+    df = generate_futures_data(50, days=300, seed=7, extended=True)
+    assert df.equals(generate_futures_data(50, days=300, seed=7, extended=True)) and \
+        not df.equals(generate_futures_data(50, days=300, seed=8, extended=True)), "相同种子应生成相同数据，不同种子不同"
+    assert len(df) == 15000 and df['contract'].nunique() == 50 and \
+        df.sort_values(['date', 'contract'], kind='mergesort').index.equals(df.index), "行数、合约数或排序不正确"
+    assert ((df['high'] >= df[['open', 'close']].max(axis=1)) & (df['low'] <= df[['open', 'close']].min(axis=1))
+            & (df['low'] > 0)).all(), "开高低收价格关系不正确"
+
+    by_contract = df.groupby('contract', observed=True)
+    previous = by_contract['settle'].shift(1)
+    assert np.allclose(df['pre_settle'][previous.notna()], previous.dropna(), atol=0.051), "前结算价应为上一交易日的结算价"
+    assert (df['contract'].astype(str).str.replace(r'\d+$', '', regex=True) == df['variety'].astype(str)).all(), \
+        "品种与合约代码不一致"
+
+    # 对数收益率的波动率接近参数
+    volatility = np.log(df['close']).groupby(df['contract'], observed=True).diff().std()
+    assert abs(volatility - 0.02) <= 0.002, f"波动率不正确: {volatility:.4f}"
+
+    print("✅ 模拟行情正确")
+
+
+def test_schemas_load():
+    """测试英文、中文两种列名格式写出后都能被数据读取识别，示例数据生成函数保持原有格式"""
+    print("\n🧪 测试列名格式...")
+
+    from sample_data import generate_sample_futures_data
+    from sample_data_new import generate_sample_futures_data_new
+
+    root = tempfile.mkdtemp()
+    try:
+        english = generate_futures_data(['IF2401', 'IC2401'], '2024-01-01', '2024-06-30', seed=1)
+        chinese = generate_futures_data(['IF2401', 'IC2401'], '2024-01-01', '2024-06-30', seed=1, schema='chinese')
+        assert list(english.columns) == ['date', 'contract', 'open', 'high', 'low', 'close', 'volume',
+                                         'open_interest'], "英文列名不正确"
+        assert list(chinese.columns[:2]) == ['合约', '交易日'] and len(chinese.columns) == 12, "中文列名不正确"
+
+        for name, df in [('english.csv', english), ('chinese.csv', chinese), ('chinese.parquet', chinese)]:
+            path = os.path.join(root, name)
+            write_data(df, path)
+            loaded, _ = read_market_data(path, max_rows=0)
+            # 两种格式的第 6 列都是收盘价
+            assert len(loaded) == len(df) and np.allclose(np.sort(loaded['close']), np.sort(df.iloc[:, 5])), \
+                f"{name} 读取结果不正确"
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    sample = generate_sample_futures_data(seed=1)
+    sample_new = generate_sample_futures_data_new(seed=1)
+    assert sample.shape == (6258, 8) and sample['date'].max() == '2023-12-29', "示例数据格式不正确"
+    assert sample_new.shape == (6258, 12) and sorted(sample_new['品种'].unique()) == ['IC', 'IF', 'IH'], "示例数据格式不正确"
+
+    print("✅ 列名格式正确")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 模拟行情生成器测试")
+    print("=" * 60)
+
+    tests = [test_generated_bars, test_schemas_load]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
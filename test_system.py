@@ -46,7 +46,7 @@ def test_analyzer_class():
     print("\n🧪 测试分析器类...")
     
     try:
-        from app import FuturesStrategyAnalyzer
+        from strategy_analyzer import FuturesStrategyAnalyzer
         
         # 创建分析器实例
         analyzer = FuturesStrategyAnalyzer()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+测试界面缓存
+"""
+
+import pandas as pd
+import numpy as np
+import io
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from feature_cache import file_fingerprint
+from test_incremental_features import create_test_data
+
+
+def create_upload(df):
+    """模拟上传的CSV文件"""
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def create_analyzer():
+    from strategy_analyzer import FuturesStrategyAnalyzer
+
+    analyzer = FuturesStrategyAnalyzer()
+    analyzer.feature_cache = None
+    return analyzer
+
+
+def test_stage_keys():
+    """测试各阶段的键：相同输入相同，文件内容或参数变化时不同"""
+    print("🧪 测试阶段缓存键...")
+
+    data = create_test_data()
+    upload = create_upload(data)
+    analyzer = create_analyzer()
+    analyzer.load_data(upload, {})
+    analyzer.create_features()
+    analyzer.create_target(5, 0.02, -0.01)
+
+    assert analyzer.data_key == analyzer.source_key(file_fingerprint(upload), {}), "load_data 设置的数据键与 source_key 不一致"
+
+    changed = data.copy()
+    changed.loc[0, 'close'] += 1
+    other = create_analyzer()
+    other.load_data(create_upload(changed), {})
+    assert other.data_key != analyzer.data_key and other.features_key() != analyzer.features_key(), "文件内容变化时键应变化"
+
+    assert analyzer.target_key() == analyzer.target_key(5, 0.02, -0.01), "目标变量键不正确"
+    assert analyzer.target_key(5, 0.03, -0.01) != analyzer.target_key(), "目标变量键不正确"
+
+    # 直接赋值的数据按内容计算哈希
+    direct, copied = create_analyzer(), create_analyzer()
+    direct.data = analyzer.data
+    copied.data = analyzer.data.copy()
+    assert direct.features_key() is not None and direct.features_key() == copied.features_key(), "直接赋值的数据应按内容生成键"
+
+    print("✅ 阶段缓存键正确")
+
+
+def test_run_stage_restores_results():
+    """测试命中缓存时恢复阶段结果，失败的阶段不缓存"""
+    print("\n🧪 测试阶段缓存...")
+
+    import ui_cache
+
+    upload = create_upload(create_test_data())
+    key = create_analyzer().source_key(file_fingerprint(upload), {'tag': 'test_run_stage'})
+    first = create_analyzer()
+    second = create_analyzer()
+    results = []
+    for analyzer in (first, second):
+        results.append(ui_cache.run_stage(analyzer, 'load', key, analyzer.load_data, upload, {}))
+        results.append(ui_cache.run_stage(analyzer, 'features', analyzer.features_key(), analyzer.create_features))
+
+    assert all(success for success, _ in results) and '来自缓存' not in results[1][1] and '来自缓存' in results[3][1], \
+        f"缓存命中情况不正确: {results}"
+    assert second.data is first.data and second.features is first.features and second.feature_state is None, \
+        "命中缓存时应共享阶段结果并清空增量状态"
+
+    empty = create_analyzer()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        return False, "请先加载数据"
+
+    for _ in range(2):
+        success, message = ui_cache.run_stage(empty, 'features', 'failing-stage', failing)
+    assert not success and len(calls) == 2, "失败的阶段不应被缓存"
+
+    print("✅ 阶段缓存正确")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 界面缓存测试")
+    print("=" * 60)
+
+    tests = [test_stage_keys, test_run_stage_restores_results]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -79,7 +79,7 @@ def test_direct_loading():
     print("\n🧪 测试直接加载...")
     
     try:
-        from app import FuturesStrategyAnalyzer
+        from strategy_analyzer import FuturesStrategyAnalyzer
         
         analyzer = FuturesStrategyAnalyzer()
         
@@ -73,7 +73,7 @@ def test_user_format():
         print("✅ 所有必要列都存在")
         
         # 测试数据加载
-        from app import FuturesStrategyAnalyzer
+        from strategy_analyzer import FuturesStrategyAnalyzer
         
         analyzer = FuturesStrategyAnalyzer()
         success, message = analyzer.load_data('user_format_data.csv', column_mapping)
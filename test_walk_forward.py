@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+测试时间序列前推验证
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sklearn.linear_model import LogisticRegression
+
+from walk_forward import time_series_folds, time_ordered_split, walk_forward_evaluate
+
+
+def create_test_data(days=200, contracts=3, seed=1):
+    """创建多合约按日期交错排列的样本"""
+    rng = np.random.default_rng(seed)
+    dates = np.repeat(pd.bdate_range('2022-01-03', periods=days), contracts)
+    X = rng.normal(size=(len(dates), 3))
+    return pd.DataFrame({
+        'date': dates,
+        'contract': np.tile([f'C{i}' for i in range(contracts)], days),
+        'f1': X[:, 0], 'f2': X[:, 1], 'f3': X[:, 2],
+        'target': np.where(X[:, 0] > 0.5, 1, np.where(X[:, 0] < -0.5, -1, 0))
+    })
+
+
+def test_folds_are_time_ordered_with_gap():
+    """测试各折训练期早于测试期、留出间隔、同一日期不跨越两侧"""
+    print("🧪 测试扩展窗口的折...")
+
+    df = create_test_data()
+    dates = df['date'].to_numpy()
+    unique_dates = np.unique(dates)
+    gap = 5
+
+    folds = time_series_folds(dates, n_splits=4, gap=gap)
+    assert len(folds) == 4, f"折数不正确: {len(folds)}"
+
+    for train_idx, test_idx in folds:
+        train_last = np.searchsorted(unique_dates, dates[train_idx].max())
+        test_first = np.searchsorted(unique_dates, dates[test_idx].min())
+        assert test_first - train_last - 1 == gap, f"训练期与测试期之间的间隔不是 {gap} 个交易日"
+        assert dates[train_idx].min() == unique_dates[0], "扩展窗口应从最早日期开始"
+        assert len(train_idx) % 3 == 0 and len(test_idx) % 3 == 0, "同一日期的合约被分到了不同的集合"
+
+    print("✅ 扩展窗口的折正确")
+
+
+def test_rolling_window():
+    """测试滚动窗口的训练期长度固定"""
+    print("\n🧪 测试滚动窗口...")
+
+    df = create_test_data()
+    folds = time_series_folds(df['date'].to_numpy(), n_splits=4, mode='rolling', train_window=60)
+    lengths = [len(np.unique(df['date'].to_numpy()[train_idx])) for train_idx, _ in folds]
+    # 第一折之前的数据不足一个窗口
+    assert lengths == [40, 60, 60, 60], f"滚动窗口长度不正确: {lengths}"
+
+    try:
+        time_series_folds(df['date'].to_numpy(), mode='rolling')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("滚动窗口缺少长度时未报错")
+
+    print("✅ 滚动窗口正确")
+
+
+def test_time_ordered_split():
+    """测试按时间切分的测试集位于最后且留出间隔"""
+    print("\n🧪 测试按时间切分...")
+
+    df = create_test_data()
+    dates = df['date'].to_numpy()
+    train_idx, test_idx = time_ordered_split(dates, test_size=0.2, gap=5)
+    unique_dates = np.unique(dates)
+
+    assert len(np.unique(dates[test_idx])) == 40 and dates[test_idx].max() == unique_dates[-1], \
+        "测试集不是最后 20% 的交易日"
+    gap = np.searchsorted(unique_dates, dates[test_idx].min()) - np.searchsorted(unique_dates, dates[train_idx].max())
+    assert gap == 6, "训练集与测试集之间的间隔不正确"
+
+    print("✅ 按时间切分正确")
+
+
+def test_walk_forward_evaluate_parallel():
+    """测试并行前推验证返回每折指标，且与串行结果一致"""
+    print("\n🧪 测试并行前推验证...")
+
+    df = create_test_data()
+    features = ['f1', 'f2', 'f3']
+    estimator = LogisticRegression(max_iter=1000)
+
+    parallel = walk_forward_evaluate(df, features, estimator, n_splits=3, gap=5, n_jobs=2)
+    serial = walk_forward_evaluate(df, features, estimator, n_splits=3, gap=5, n_jobs=1)
+
+    assert list(parallel.index) == [1, 2, 3] and {'accuracy', 'f1_macro', 'fit_time'} <= set(parallel.columns), \
+        f"结果格式不正确: {list(parallel.columns)}"
+    assert np.allclose(parallel['accuracy'], serial['accuracy']) and parallel['accuracy'].min() >= 0.8, \
+        f"各折准确率不正确: {list(parallel['accuracy'])}"
+
+    print(f"✅ 前推验证正确，各折准确率: {[round(a, 3) for a in parallel['accuracy']]}")
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 前推验证测试")
+    print("=" * 60)
+
+    tests = [
+        test_folds_are_time_ordered_with_gap,
+        test_rolling_window,
+        test_time_ordered_split,
+        test_walk_forward_evaluate_parallel
+    ]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 测试结果: {passed}/{len(tests)} 通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+命令行超参数搜索：读取行情数据，创建特征和目标变量后搜索指定模型的超参数，
+打印试验结果，可选把最佳参数保存为JSON（可直接作为 MODEL_CONFIG 中该模型的参数）。
+中断后使用相同参数重新运行，已完成的试验从缓存读取。
+"""
+
+import argparse
+import json
+import time
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import SEARCH_CONFIG, TARGET_CONFIG
+from hyperparameter_search import SEARCH_METHODS
+from model_factory import MODEL_TYPES
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="模型超参数搜索")
+    parser.add_argument('source', help="行情数据文件（CSV / Parquet / Feather）或内存映射数据集目录")
+    parser.add_argument('--model', choices=MODEL_TYPES, default='random_forest', help="模型类型")
+    parser.add_argument('--method', choices=SEARCH_METHODS, default=SEARCH_CONFIG['method'], help="搜索方式")
+    parser.add_argument('--trials', type=int, default=SEARCH_CONFIG['n_trials'], help="参数组合数")
+    parser.add_argument('--splits', type=int, default=SEARCH_CONFIG['n_splits'], help="交叉验证折数")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="并行进程数（-1 为全部CPU核）")
+    parser.add_argument('--lookforward', type=int, default=TARGET_CONFIG['default_lookforward_days'],
+                        help="目标变量的预测天数")
+    parser.add_argument('--output', help="保存最佳参数的JSON文件")
+    args = parser.parse_args()
+
+    from strategy_analyzer import FuturesStrategyAnalyzer
+    from market_store import is_market_store
+    from profiling import setup_logging
+
+    setup_logging()
+    analyzer = FuturesStrategyAnalyzer()
+    if is_market_store(args.source):
+        success, message = analyzer.open_store(args.source)
+    else:
+        success, message = analyzer.load_data(args.source, {})
+    if success:
+        success, message = analyzer.create_features()
+    if success:
+        success, message = analyzer.create_target(lookforward_days=args.lookforward,
+                                                  profit_threshold=TARGET_CONFIG['default_profit_threshold'],
+                                                  loss_threshold=TARGET_CONFIG['default_loss_threshold'])
+    if not success:
+        print(f"❌ {message}")
+        sys.exit(1)
+
+    def progress(done, total):
+        print(f"\r⏳ 已完成 {done}/{total} 次试验", end='', flush=True)
+
+    start = time.perf_counter()
+    success, message = analyzer.tune_model(args.model, method=args.method, n_trials=args.trials,
+                                           n_splits=args.splits, n_jobs=args.n_jobs, progress=progress)
+    print()
+    if not success:
+        print(f"❌ {message}")
+        sys.exit(1)
+
+    print(f"✅ {message}，用时 {time.perf_counter() - start:.1f} 秒")
+    columns = ['trial', 'bracket', 'rung', 'fraction', 'score', 'f1_macro', 'best_iteration', 'fit_time', 'cached']
+    print(analyzer.search_results[columns].head(20).to_string(index=False))
+    print(f"\n🏆 最佳参数: {json.dumps(analyzer.best_params, ensure_ascii=False)}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({args.model: analyzer.best_params}, f, ensure_ascii=False, indent=2)
+        print(f"💾 已保存到 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+界面缓存
+
+Streamlit 每次交互都会从头执行 app.py，拖动滑块也会重新计算数据概览、统计表和图表。
+这里把分析器的各阶段（读取数据、创建特征、创建目标变量、训练模型）和界面上的派生结果
+缓存起来，以文件内容哈希和参数生成的键（分析器的 data_key、features_key()、target_key()）为键，
+输入不变的重新运行直接从缓存渲染。过期时间为 PERFORMANCE_CONFIG['cache_ttl'] 秒。
+
+- 阶段结果（大的 DataFrame、模型）用 st.cache_resource，各会话共享同一个对象而不复制，
+  分析器只会替换而不会原地修改这些对象
+- 统计表、图表等较小的派生结果用 st.cache_data
+- 阶段失败时不缓存，下次重新执行
+"""
+
+import io
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from config import PERFORMANCE_CONFIG
+from data_loader import preview_market_file
+from feature_cache import file_fingerprint, make_stage_key
+
+TTL = PERFORMANCE_CONFIG['cache_ttl'] or None
+
+# 各阶段方法设置的分析器属性（命中缓存时恢复这些属性）
+STAGE_ATTRIBUTES = {
+    'load': ['data', 'data_key', 'store'],
+    'select': ['data', 'data_key', 'features', 'target'],
+    'features': ['features'],
+    'target': ['target', 'lookforward_days', 'target_params'],
+    'model': ['model', 'feature_transform', 'model_info'],
+}
+
+# 会被原地更新的状态不在会话间共享，命中缓存时清空（需要时重新初始化）
+STAGE_RESETS = {
+    'select': ['feature_state'],
+    'features': ['feature_state'],
+}
+
+
+class _StageFailed(Exception):
+    """阶段方法返回失败（异常不会被缓存）"""
+
+
+@st.cache_resource(ttl=TTL, max_entries=16, show_spinner=False)
+def _cached_stage(stage, key, _analyzer, _method, _args, _computed):
+    success, message = _method(*_args)
+    if not success:
+        raise _StageFailed(message)
+    _computed.append(stage)
+    return message, {name: getattr(_analyzer, name) for name in STAGE_ATTRIBUTES[stage]}
+
+
+def run_stage(analyzer, stage, key, method, *args):
+    """
+    带缓存地执行分析器的阶段方法，返回 (bool, message)
+
+    key 为 None 时（无法确定输入的键）直接执行；命中缓存时把缓存的结果设置到分析器上。
+    """
+    if key is None:
+        return method(*args)
+
+    computed = []
+    try:
+        message, attributes = _cached_stage(stage, key, analyzer, method, args, computed)
+    except _StageFailed as e:
+        return False, str(e)
+    if computed:
+        return True, message
+
+    for name, value in attributes.items():
+        # 字典会被原地修改（如保存模型时写入版本号），每个会话使用自己的副本
+        setattr(analyzer, name, dict(value) if isinstance(value, dict) else value)
+    for name in STAGE_RESETS.get(stage, []):
+        setattr(analyzer, name, None)
+    return True, f"{message}（来自缓存）"
+
+
+def model_key(analyzer, model_type, test_size):
+    """按时间切分训练单个模型的缓存键"""
+    target_key = analyzer.target_key()
+    return make_stage_key('model', target_key, model_type, test_size) if target_key is not None else None
+
+
+def uploaded_file_key(uploaded_file):
+    """上传文件的内容哈希（同一个上传文件只计算一次）"""
+    file_id = getattr(uploaded_file, 'file_id', None)
+    if file_id is None:
+        return file_fingerprint(uploaded_file)
+    fingerprints = st.session_state.setdefault('file_fingerprints', {})
+    if file_id not in fingerprints:
+        fingerprints[file_id] = file_fingerprint(uploaded_file)
+    return fingerprints[file_id]
+
+
+@st.cache_data(ttl=TTL, max_entries=32, show_spinner=False)
+def file_preview(file_key, _file):
+    """文件的前几行（显示列名和列映射）"""
+    return preview_market_file(_file)
+
+
+@st.cache_data(ttl=TTL, max_entries=16, show_spinner=False)
+def data_overview(data_key, _data):
+    """数据概览：行数、合约数、日期范围、完整性、前10行和统计信息"""
+    return {
+        'rows': len(_data),
+        'contracts': _data['contract'].nunique(),
+        'start_date': _data['date'].min(),
+        'end_date': _data['date'].max(),
+        'completeness': 1 - _data.isnull().sum().sum() / (len(_data) * len(_data.columns)),
+        'head': _data.head(10),
+        'describe': _data.describe()
+    }
+
+
+def _price_chart(chart_data):
+    fig = go.Figure()
+    for contract, contract_data in chart_data.groupby('contract', sort=False, observed=True):
+        fig.add_trace(go.Scatter(
+            x=contract_data['date'],
+            y=contract_data['close'],
+            mode='lines',
+            name=contract
+        ))
+
+    fig.update_layout(
+        title="收盘价走势",
+        xaxis_title="日期",
+        yaxis_title="价格",
+        height=500
+    )
+    return fig
+
+
+@st.cache_data(ttl=TTL, max_entries=16, show_spinner=False)
+def price_chart(data_key, _data, max_contracts=5):
+    """前几个合约的收盘价走势图"""
+    contracts = _data['contract'].unique()[:max_contracts]
+    return _price_chart(_data.loc[_data['contract'].isin(contracts), ['date', 'contract', 'close']])
+
+
+@st.cache_data(ttl=TTL, max_entries=16, show_spinner=False)
+def store_price_chart(store_key, contracts, start_date, end_date, _store):
+    """数据集中所选合约和日期范围的收盘价走势图（只调入收盘价）"""
+    return _price_chart(_store.load(list(contracts), start_date, end_date, columns=['close']))
+
+
+@st.cache_data(ttl=TTL, max_entries=16, show_spinner=False)
+def feature_overview(features_key, _features):
+    """特征统计信息和相关性热力图（PNG）"""
+    # matplotlib 和 seaborn 导入较慢，只在第一次绘制热力图时导入
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    correlation_matrix = _features.select_dtypes(include=[np.number]).corr()
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, ax=ax)
+    ax.set_title("特征相关性热力图")
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight')
+    plt.close(fig)
+    return {'describe': _features.describe(), 'heatmap': buffer.getvalue()}
+
+
+@st.cache_data(ttl=TTL, max_entries=16, show_spinner=False)
+def target_counts(target_key, _target):
+    """目标变量各类别的样本数（按类别排序，不含没有未来收益的行）"""
+    return _target.loc[_target['future_return'].notna(), 'target'].value_counts().sort_index()
+
+
+@st.cache_data(ttl=TTL, max_entries=16, show_spinner=False)
+def memory_usage(keys, _analyzer):
+    """数据、特征、目标变量表的内存占用（keys 为各表的键）"""
+    return _analyzer.memory_report()
@@ -0,0 +1,122 @@
+"""
+时间序列前推验证（walk-forward）
+
+按交易日把样本切分为 N 个时间上依次向后的折：每折用之前的数据训练、之后的数据测试，
+训练窗口可以是扩展窗口（从最早日期开始）或滚动窗口（固定长度）。
+训练集与测试集之间留出 gap 个交易日（通常等于目标变量的 lookforward_days），
+避免训练样本的标签用到测试期的价格。同一交易日的所有合约总是在同一侧。
+各折相互独立，用 joblib 在多个进程中并行训练。
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+from model_factory import set_thread_budget
+
+
+def time_series_folds(dates, n_splits=5, mode='expanding', train_window=None, gap=0):
+    """
+    按交易日生成前推验证的折
+
+    dates 为每行的日期；train_window 为滚动窗口的交易日数（mode='rolling' 时必填）。
+    返回 [(训练行号, 测试行号)]，行号按原顺序。
+    """
+    if mode not in ('expanding', 'rolling'):
+        raise ValueError(f"不支持的窗口类型: {mode}")
+    if mode == 'rolling' and not train_window:
+        raise ValueError("滚动窗口需要指定 train_window")
+
+    unique_dates, day = np.unique(np.asarray(dates), return_inverse=True)
+    splitter = TimeSeriesSplit(
+        n_splits=n_splits,
+        gap=gap,
+        max_train_size=train_window if mode == 'rolling' else None
+    )
+
+    folds = []
+    for train_days, test_days in splitter.split(unique_dates):
+        train_mask = np.zeros(len(unique_dates), dtype=bool)
+        train_mask[train_days] = True
+        test_mask = np.zeros(len(unique_dates), dtype=bool)
+        test_mask[test_days] = True
+        folds.append((np.flatnonzero(train_mask[day]), np.flatnonzero(test_mask[day])))
+    return folds
+
+
+def time_ordered_split(dates, test_size=0.2, gap=0):
+    """按时间顺序切分训练集和测试集：最后 test_size 比例的交易日作为测试集"""
+    unique_dates, day = np.unique(np.asarray(dates), return_inverse=True)
+    n_test = max(1, int(round(len(unique_dates) * test_size)))
+    train_end = len(unique_dates) - n_test - gap
+    if train_end <= 0:
+        raise ValueError("数据的交易日太少，无法按时间顺序切分")
+    return np.flatnonzero(day < train_end), np.flatnonzero(day >= len(unique_dates) - n_test)
+
+
+def fit_and_score(estimator, X_train, y_train, X_test, y_test):
+    """在训练集上标准化并训练，返回 (模型, 标准化器, 指标)"""
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    model = clone(estimator)
+    start = time.perf_counter()
+    model.fit(X_train_scaled, y_train)
+    fit_time = time.perf_counter() - start
+
+    y_pred = np.asarray(model.predict(X_test_scaled)).ravel()
+    metrics = {
+        'accuracy': accuracy_score(y_test, y_pred),
+        'f1_macro': f1_score(y_test, y_pred, average='macro', zero_division=0),
+        'fit_time': fit_time
+    }
+    return model, scaler, metrics
+
+
+def _run_fold(fold, estimator, model_type, threads, X, y, dates, train_idx, test_idx):
+    with threadpool_limits(limits=threads):
+        estimator = set_thread_budget(clone(estimator), threads, model_type)
+        _, _, metrics = fit_and_score(estimator, X[train_idx], y[train_idx], X[test_idx], y[test_idx])
+    return {
+        'fold': fold,
+        'train_start': dates[train_idx].min(),
+        'train_end': dates[train_idx].max(),
+        'test_start': dates[test_idx].min(),
+        'test_end': dates[test_idx].max(),
+        'n_train': len(train_idx),
+        'n_test': len(test_idx),
+        **metrics
+    }
+
+
+def walk_forward_evaluate(df, feature_columns, estimator, n_splits=5, mode='expanding',
+                          train_window=None, gap=0, n_jobs=-1, target_column='target', model_type=None):
+    """
+    对 estimator 做前推验证，返回每折指标的DataFrame
+
+    每折克隆一个未训练的 estimator，标准化只在该折的训练集上拟合。
+    n_jobs 为并行进程数（-1 为全部CPU核），CPU核在同时计算的折之间平均分配；
+    给出 model_type 时每折的模型线程参数也按分到的CPU核数设置。
+    """
+    X = df[feature_columns].to_numpy(dtype=np.float64)
+    y = df[target_column].to_numpy()
+    dates = df['date'].to_numpy()
+
+    folds = time_series_folds(dates, n_splits, mode, train_window, gap)
+    cpu_count = os.cpu_count() or 1
+    workers = min(len(folds), cpu_count if n_jobs in (None, -1) else n_jobs)
+    threads = max(1, cpu_count // workers)
+    results = Parallel(n_jobs=workers)(
+        delayed(_run_fold)(fold, estimator, model_type, threads, X, y, dates, train_idx, test_idx)
+        for fold, (train_idx, test_idx) in enumerate(folds, start=1)
+    )
+    return pd.DataFrame(results).set_index('fold')